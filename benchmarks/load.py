@@ -0,0 +1,220 @@
+"""Load test for the vidu-mcp tools against the local mock API.
+
+Starts ``benchmarks/mock_api.py`` in a subprocess, points the server at it
+and drives the MCP tools concurrently through an in-memory client session.
+Each job submits a video with ``wait=False`` and then collects it with
+``wait_for_task``. The report covers:
+
+- submit latency of the generate tool call
+- result latency: from the moment the mock finished the task until the tool
+  returned it, which is the delay added by polling
+- API requests per completed video
+- peak memory of the process running the server
+
+With ``--callbacks`` the server receives task completions through its
+callback receiver instead of polling for them.
+
+Options that do not belong to the driver are passed on to the mock:
+
+    python benchmarks/load.py --jobs 200 --concurrency 50 --generation-time 10 --error-rate 0.02
+    python benchmarks/load.py --jobs 50 --images 10 --image-bytes 2000000 --json report.json
+    python benchmarks/load.py --jobs 200 --callbacks --callback-loss 0.05
+"""
+import argparse
+import asyncio
+import collections
+import json
+import logging
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def start_mock(port: int, mock_args: list) -> subprocess.Popen:
+    """Start the mock API and wait until it answers."""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "benchmarks", "mock_api.py"), "--port", str(port), *mock_args],
+    )
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            mock_stats(port)
+            return process
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError("mock API exited during startup")
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("mock API did not start")
+
+
+def mock_stats(port: int) -> dict:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stats", timeout=5) as response:
+        return json.loads(response.read())
+
+
+def make_images(count: int, size: int, directory: str) -> list:
+    """Write random JPEG-named files to exercise image encoding."""
+    paths = []
+    for index in range(count):
+        path = os.path.join(directory, f"image-{index}.jpg")
+        with open(path, "wb") as f:
+            f.write(b"\xff\xd8\xff" + os.urandom(max(size - 3, 0)))
+        paths.append(path)
+    return paths
+
+
+def summarize(values: list) -> dict:
+    if not values:
+        return {}
+    ordered = sorted(values)
+    return {
+        "p50": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1],
+        "mean": statistics.fmean(ordered),
+    }
+
+
+async def run_jobs(args, images: list) -> list:
+    from mcp.shared.memory import create_connected_server_and_client_session
+    import vidu_mcp.server as server
+
+    # the server logs every request at INFO, which would drown the report
+    logging.getLogger().setLevel(logging.WARNING)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    results = []
+
+    async with create_connected_server_and_client_session(server.mcp._mcp_server) as session:
+        async def job(index: int) -> None:
+            async with semaphore:
+                record = {"index": index}
+                if images:
+                    tool, arguments = "generate_img_to_video", {"image": images[index % len(images)], "prompt": "load test"}
+                else:
+                    tool, arguments = "generate_text_to_video", {"prompt": f"load test {index}"}
+                arguments["wait"] = False
+
+                start = time.perf_counter()
+                response = await session.call_tool(tool, arguments)
+                record["submit_latency"] = time.perf_counter() - start
+                text = response.content[0].text
+                if not text.startswith("{"):
+                    record["error"] = text
+                    results.append(record)
+                    return
+                record["task_id"] = json.loads(text)["task_id"]
+
+                response = await session.call_tool("wait_for_task", {"task_id": record["task_id"]})
+                record["returned_at"] = time.time()
+                text = response.content[0].text
+                if text.startswith("{") and json.loads(text).get("video_url"):
+                    record["status"] = "success"
+                else:
+                    record["error"] = text
+                results.append(record)
+
+        await asyncio.gather(*(job(index) for index in range(args.jobs)))
+    return results
+
+
+def report(results: list, stats: dict, wall: float, peak_traced: int) -> dict:
+    completed_at = stats["completed_at"]
+    succeeded = [r for r in results if r.get("status") == "success"]
+    result_latencies = [
+        r["returned_at"] - completed_at[r["task_id"]] for r in succeeded if r["task_id"] in completed_at
+    ]
+    requests = stats["counts"]["submit"] + stats["counts"]["status"]
+    return {
+        "jobs": len(results),
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "wall_seconds": wall,
+        "submit_latency": summarize([r["submit_latency"] for r in results]),
+        "result_latency": summarize(result_latencies),
+        "errors": dict(collections.Counter(r["error"].splitlines()[0][:120] for r in results if "error" in r)),
+        "requests": stats["counts"],
+        "requests_per_video": requests / len(succeeded) if succeeded else None,
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024),
+        "peak_traced_bytes": peak_traced or None,
+    }
+
+
+def print_report(data: dict) -> None:
+    print(f"jobs: {data['jobs']}  succeeded: {data['succeeded']}  failed: {data['failed']}  wall: {data['wall_seconds']:.1f} s")
+    for name in ("submit_latency", "result_latency"):
+        values = data[name]
+        if values:
+            print(f"{name}: p50 {values['p50'] * 1000:.0f} ms  p95 {values['p95'] * 1000:.0f} ms  max {values['max'] * 1000:.0f} ms")
+    for error, count in data["errors"].items():
+        print(f"  {count} x {error}")
+    print(f"api requests: {data['requests']}")
+    if data["requests_per_video"] is not None:
+        print(f"requests per completed video: {data['requests_per_video']:.2f}")
+    print(f"peak rss: {data['peak_rss_bytes'] / 2 ** 20:.1f} MiB")
+    if data["peak_traced_bytes"]:
+        print(f"peak python allocations: {data['peak_traced_bytes'] / 2 ** 20:.1f} MiB")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=100, help="videos to generate")
+    parser.add_argument("--concurrency", type=int, default=20, help="jobs in flight at once")
+    parser.add_argument("--images", type=int, default=0, help="use img2video with this many distinct local images")
+    parser.add_argument("--image-bytes", type=int, default=1024 * 1024, help="size of each generated image")
+    parser.add_argument("--port", type=int, default=8765, help="port of the mock API")
+    parser.add_argument("--callbacks", action="store_true", help="receive completions by callback instead of polling")
+    parser.add_argument("--callback-port", type=int, default=8766, help="port of the callback receiver")
+    parser.add_argument("--tracemalloc", action="store_true", help="also trace peak Python allocations (slower)")
+    parser.add_argument("--json", help="write the report to this file")
+    args, mock_args = parser.parse_known_args()
+
+    workdir = tempfile.mkdtemp(prefix="vidu-load-")
+    os.environ.update({
+        "VIDU_API_KEY": "load-test",
+        "VIDU_API_HOST": f"http://127.0.0.1:{args.port}",
+        "VIDU_JOURNAL_PATH": os.path.join(workdir, "tasks.jsonl"),
+        "VIDU_DEDUP": "false",
+        "FASTMCP_LOG_LEVEL": "WARNING",
+    })
+    if args.callbacks:
+        os.environ.update({
+            "VIDU_CALLBACK_URL": f"http://127.0.0.1:{args.callback_port}/vidu/callback",
+            "VIDU_CALLBACK_PORT": str(args.callback_port),
+        })
+    images = make_images(args.images, args.image_bytes, workdir) if args.images else []
+
+    mock = start_mock(args.port, mock_args)
+    try:
+        if args.tracemalloc:
+            tracemalloc.start()
+        start = time.perf_counter()
+        results = asyncio.run(run_jobs(args, images))
+        wall = time.perf_counter() - start
+        peak_traced = tracemalloc.get_traced_memory()[1] if args.tracemalloc else 0
+        data = report(results, mock_stats(args.port), wall, peak_traced)
+    finally:
+        mock.terminate()
+        mock.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_report(data)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+    return 0 if data["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
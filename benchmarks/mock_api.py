@@ -0,0 +1,198 @@
+"""Local stand-in for the Vidu API, used by the load test.
+
+Serves the generation endpoints (``POST /ent/v2/<name>``) and the task
+status endpoint (``GET /ent/v2/tasks/{task_id}/creations``). Tasks move
+from ``queueing`` to ``processing`` to a terminal state after a configurable
+generation time. Transient errors, failed tasks and throttling can be
+injected. A submit with a ``callback_url`` gets the final status posted to
+that URL once the task finishes, unless the callback is dropped to
+exercise the polling fallback. ``GET /_stats`` reports request counts and
+when each task completed, so the driver can measure how long results take
+to arrive:
+
+    python benchmarks/mock_api.py --port 8765 --generation-time 10 --error-rate 0.05
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import threading
+import time
+from typing import Optional
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+
+class Throttle:
+    """Token bucket deciding which requests are answered with 429."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._tokens = max(rate, 1.0)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        if self.rate <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(max(self.rate, 1.0), self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class MockViduAPI:
+    """State of the mock API: tasks, injected faults and request counters."""
+
+    def __init__(
+            self,
+            generation_time: float = 10.0,
+            jitter: float = 0.2,
+            error_rate: float = 0.0,
+            failure_rate: float = 0.0,
+            submit_rate: float = 0.0,
+            status_rate: float = 0.0,
+            latency: float = 0.0,
+            callback_loss: float = 0.0,
+    ):
+        """Initialize the mock.
+
+        Args:
+            generation_time: Mean seconds a task takes to finish
+            jitter: Random spread of the generation time, as a fraction
+            error_rate: Fraction of requests answered with HTTP 503
+            failure_rate: Fraction of tasks that end in the failed state
+            submit_rate: Accepted submits per second, the rest get 429; 0 for unlimited
+            status_rate: Accepted status requests per second, the rest get 429; 0 for unlimited
+            latency: Seconds added to every response
+            callback_loss: Fraction of callbacks that are never sent
+        """
+        self.generation_time = generation_time
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.failure_rate = failure_rate
+        self.latency = latency
+        self.callback_loss = callback_loss
+        self.submit_throttle = Throttle(submit_rate)
+        self.status_throttle = Throttle(status_rate)
+        self.tasks = {}
+        self.counts = {"submit": 0, "status": 0, "errors": 0, "throttled": 0, "callbacks": 0, "callback_errors": 0}
+        self._ids = itertools.count(1)
+        self._callbacks = set()
+
+    def app(self) -> Starlette:
+        return Starlette(routes=[
+            Route("/ent/v2/tasks/{task_id}/creations", self.status, methods=["GET"]),
+            Route("/ent/v2/{endpoint}", self.submit, methods=["POST"]),
+            Route("/_stats", self.stats, methods=["GET"]),
+        ])
+
+    async def _fault(self, kind: str, throttle: Throttle) -> Optional[JSONResponse]:
+        self.counts[kind] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if not throttle.allow():
+            self.counts["throttled"] += 1
+            return JSONResponse({"message": "too many requests"}, status_code=429, headers={"Retry-After": "1"})
+        if random.random() < self.error_rate:
+            self.counts["errors"] += 1
+            return JSONResponse({"message": "service unavailable"}, status_code=503)
+        return None
+
+    async def submit(self, request: Request) -> JSONResponse:
+        fault = await self._fault("submit", self.submit_throttle)
+        if fault is not None:
+            return fault
+        body = await request.json()
+        task_id = str(next(self._ids))
+        now = time.time()
+        duration = self.generation_time * random.uniform(1 - self.jitter, 1 + self.jitter)
+        self.tasks[task_id] = {
+            "submitted_at": now,
+            "completed_at": now + duration,
+            "state": "failed" if random.random() < self.failure_rate else "success",
+        }
+        if body.get("callback_url") and random.random() >= self.callback_loss:
+            callback = asyncio.get_running_loop().create_task(self._callback(task_id, body["callback_url"], duration))
+            self._callbacks.add(callback)
+            callback.add_done_callback(self._callbacks.discard)
+        return JSONResponse({"task_id": task_id, "state": "created", "model": body.get("model")})
+
+    async def status(self, request: Request) -> JSONResponse:
+        fault = await self._fault("status", self.status_throttle)
+        if fault is not None:
+            return fault
+        task_id = request.path_params["task_id"]
+        if task_id not in self.tasks:
+            return JSONResponse({"code": 404, "message": "task not found", "metadata": {"trace_id": task_id}})
+        return JSONResponse(self._status_body(task_id))
+
+    def _status_body(self, task_id: str) -> dict:
+        task = self.tasks[task_id]
+        now = time.time()
+        if now < task["completed_at"]:
+            halfway = (task["submitted_at"] + task["completed_at"]) / 2
+            return {"id": task_id, "state": "queueing" if now < halfway else "processing", "creations": []}
+        if task["state"] == "failed":
+            return {"id": task_id, "state": "failed", "err_code": "ModelFailed", "creations": []}
+        return {
+            "id": task_id,
+            "state": "success",
+            "creations": [{"id": task_id, "url": f"https://mock.invalid/{task_id}.mp4"}],
+        }
+
+    async def _callback(self, task_id: str, url: str, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self.counts["callbacks"] += 1
+        try:
+            async with httpx.AsyncClient(timeout=10) as client:
+                response = await client.post(url, json=self._status_body(task_id))
+                response.raise_for_status()
+        except httpx.HTTPError:
+            self.counts["callback_errors"] += 1
+
+    async def stats(self, request: Request) -> JSONResponse:
+        return JSONResponse({
+            "counts": self.counts,
+            "completed_at": {task_id: task["completed_at"] for task_id, task in self.tasks.items()},
+        })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--generation-time", type=float, default=10.0, help="mean seconds per task")
+    parser.add_argument("--jitter", type=float, default=0.2, help="spread of the generation time")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of tasks that fail")
+    parser.add_argument("--submit-rate", type=float, default=0.0, help="submits per second before 429, 0 for unlimited")
+    parser.add_argument("--status-rate", type=float, default=0.0, help="status requests per second before 429, 0 for unlimited")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--callback-loss", type=float, default=0.0, help="fraction of callbacks that are never sent")
+    args = parser.parse_args()
+
+    api = MockViduAPI(
+        generation_time=args.generation_time,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        failure_rate=args.failure_rate,
+        submit_rate=args.submit_rate,
+        status_rate=args.status_rate,
+        latency=args.latency,
+        callback_loss=args.callback_loss,
+    )
+    uvicorn.run(api.app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
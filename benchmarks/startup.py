@@ -0,0 +1,98 @@
+"""Cold start benchmark for the vidu-mcp stdio server.
+
+Measures, in fresh interpreters, how long ``import vidu_mcp.server`` takes
+and how long a spawned server needs to answer the MCP ``initialize``
+request. Exits non-zero when the median handshake time exceeds the budget,
+so it can gate CI:
+
+    python benchmarks/startup.py --runs 5 --budget-ms 1500
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-03-26",
+        "capabilities": {},
+        "clientInfo": {"name": "startup-benchmark", "version": "0"},
+    },
+}
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env.setdefault("VIDU_API_KEY", "benchmark")
+    env.setdefault("VIDU_API_HOST", "http://127.0.0.1:9")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    return env
+
+
+def measure_import() -> float:
+    """Return milliseconds spent importing vidu_mcp.server in a fresh interpreter."""
+    code = (
+        "import time; start = time.perf_counter(); import vidu_mcp.server; "
+        "print((time.perf_counter() - start) * 1000)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", code],
+        env=_env(), capture_output=True, text=True, check=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_handshake() -> float:
+    """Return milliseconds from spawning the server to its initialize response."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-W", "ignore", "-c", "from vidu_mcp.server import main; main()"],
+        env=_env(), stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    try:
+        process.stdin.write(json.dumps(INITIALIZE) + "\n")
+        process.stdin.flush()
+        for line in process.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                # the entry point prints a banner before serving
+                continue
+            if message.get("id") == 1:
+                return (time.perf_counter() - start) * 1000
+        raise RuntimeError("server exited before answering initialize")
+    finally:
+        process.kill()
+        process.wait()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="measurements per metric")
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="maximum median handshake time")
+    args = parser.parse_args()
+
+    imports = [measure_import() for _ in range(args.runs)]
+    handshakes = [measure_handshake() for _ in range(args.runs)]
+    import_ms = statistics.median(imports)
+    handshake_ms = statistics.median(handshakes)
+
+    print(f"import vidu_mcp.server: median {import_ms:.0f} ms (min {min(imports):.0f}, max {max(imports):.0f})")
+    print(f"initialize handshake:  median {handshake_ms:.0f} ms (min {min(handshakes):.0f}, max {max(handshakes):.0f})")
+    if handshake_ms > args.budget_ms:
+        print(f"FAIL: handshake exceeds budget of {args.budget_ms:.0f} ms")
+        return 1
+    print(f"OK: within budget of {args.budget_ms:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Peak memory of submits with large local images, inlined versus streamed.
+
+Runs each mode in a fresh process against the local mock API
+(``benchmarks/mock_api.py``). A process prepares the images, submits
+``--concurrency`` img2video-sized payloads at once and reports how far its
+peak RSS grew above the baseline measured after imports, per submit. The
+image cache is disabled so every submit pays for its own encoding:
+
+    python benchmarks/upload.py --images 3 --image-bytes 20000000 --concurrency 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from load import make_images, start_mock  # noqa: E402
+
+MODES = ("inline", "stream")
+
+
+def peak_rss() -> int:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+async def submit_all(args, images: list) -> None:
+    from vidu_mcp import util
+    from vidu_mcp.client import AsyncViduAPIClient
+
+    util.image_cache.max_bytes = 0
+    client = AsyncViduAPIClient("upload-test", f"http://127.0.0.1:{args.port}")
+
+    async def submit() -> None:
+        prepared = await util.del_input_images_async(images, stream=args.child == "stream")
+        await client.post("/ent/v2/reference2video", json={"model": "vidu2.0", "images": prepared, "prompt": "upload"})
+
+    try:
+        await asyncio.gather(*(submit() for _ in range(args.concurrency)))
+    finally:
+        await client.aclose()
+
+
+def run_child(args) -> None:
+    import vidu_mcp.body  # noqa: F401
+    import vidu_mcp.client  # noqa: F401
+
+    images = json.loads(args.paths)
+    baseline = peak_rss()
+    if args.tracemalloc:
+        tracemalloc.start()
+    asyncio.run(submit_all(args, images))
+    print(json.dumps({
+        "mode": args.child,
+        "peak_rss_growth_bytes": peak_rss() - baseline,
+        "peak_traced_bytes": tracemalloc.get_traced_memory()[1] if args.tracemalloc else None,
+    }))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=3, help="images per submit")
+    parser.add_argument("--image-bytes", type=int, default=20 * 1000 * 1000, help="size of each image")
+    parser.add_argument("--concurrency", type=int, default=4, help="submits in flight at once")
+    parser.add_argument("--port", type=int, default=8765, help="port of the mock API")
+    parser.add_argument("--tracemalloc", action="store_true", help="also trace peak Python allocations")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--paths", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return 0
+
+    workdir = tempfile.mkdtemp(prefix="vidu-upload-")
+    mock = start_mock(args.port, ["--generation-time", "1"])
+    results = []
+    try:
+        images = make_images(args.images, args.image_bytes, workdir)
+        for mode in MODES:
+            command = [
+                sys.executable, os.path.abspath(__file__), "--child", mode, "--paths", json.dumps(images),
+                "--concurrency", str(args.concurrency), "--port", str(args.port),
+            ]
+            if args.tracemalloc:
+                command.append("--tracemalloc")
+            output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+    finally:
+        mock.terminate()
+        mock.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    payload_bytes = args.images * args.image_bytes
+    print(f"{args.concurrency} concurrent submits of {args.images} x {args.image_bytes / 2 ** 20:.1f} MiB images")
+    for result in results:
+        line = (f"{result['mode']:>6}: peak rss +{result['peak_rss_growth_bytes'] / 2 ** 20:.1f} MiB, "
+                f"{result['peak_rss_growth_bytes'] / args.concurrency / payload_bytes:.2f} x image bytes per submit")
+        if result["peak_traced_bytes"]:
+            line += f", peak python allocations {result['peak_traced_bytes'] / 2 ** 20:.1f} MiB"
+        print(line)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
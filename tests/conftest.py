@@ -0,0 +1,35 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class FakeStatusClient:
+    """Stands in for the client pool: answers status requests from a script."""
+
+    def __init__(self, responses: Optional[Dict[str, List[Any]]] = None, delay: float = 0.0):
+        # task_id -> responses returned in turn, the last one repeats; exceptions are raised
+        self.responses = responses or {}
+        self.delay = delay
+        self.calls: List[str] = []
+
+    async def get(self, endpoint: str, key_id: Optional[str] = None) -> Dict[str, Any]:
+        task_id = endpoint.split("/")[4]
+        self.calls.append(task_id)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        queue = self.responses.get(task_id) or [{"state": "processing"}]
+        response = queue.pop(0) if len(queue) > 1 else queue[0]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def fake_client():
+    return FakeStatusClient
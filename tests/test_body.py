@@ -0,0 +1,62 @@
+import base64
+import hashlib
+import json
+
+import pytest
+
+from vidu_mcp.body import CHUNK_SIZE, FileImage, JSONBody, request_kwargs
+
+PNG = b"\x89PNG\r\n\x1a\n"
+
+
+def image_file(tmp_path, size, name="image.png"):
+    path = tmp_path / name
+    path.write_bytes(PNG + bytes(range(256)) * (size // 256) + b"\x07" * (size % 256))
+    return path
+
+
+def inlined(path):
+    data = path.read_bytes()
+    return "data:image/png;base64," + base64.b64encode(data).decode("ascii")
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, CHUNK_SIZE - 8, CHUNK_SIZE, 3 * CHUNK_SIZE + 5])
+def test_body_matches_json_dumps(tmp_path, size):
+    path = image_file(tmp_path, size)
+    payload = {
+        "model": "viduq1",
+        "images": [FileImage(str(path)), "https://example.com/b.png"],
+        "prompt": "a \"quoted\" prompt, ünïcödé and 表情  ",
+        "seed": 0,
+        "bgm": False,
+        "nested": {"list": [1, 2.5, None], "image": FileImage(str(path))},
+    }
+    expected = dict(payload, images=[inlined(path), "https://example.com/b.png"],
+                    nested={"list": [1, 2.5, None], "image": inlined(path)})
+
+    body = JSONBody(payload)
+    data = b"".join(body.chunks())
+    assert data == json.dumps(expected, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    assert body.length == len(data)
+    assert body.headers["Content-Length"] == str(len(data))
+    # a retried request sends the same body again
+    assert b"".join(body.chunks()) == data
+
+
+def test_digest_equals_hash_of_the_data_url(tmp_path):
+    path = image_file(tmp_path, CHUNK_SIZE + 1)
+    assert FileImage(str(path)).digest() == hashlib.sha256(inlined(path).encode("ascii")).hexdigest()
+
+
+def test_payload_without_files_is_sent_as_json():
+    kwargs = {"json": {"prompt": "hi"}}
+    assert request_kwargs(kwargs) is kwargs
+
+
+def test_payload_with_files_is_streamed(tmp_path):
+    path = image_file(tmp_path, 10)
+    kwargs = request_kwargs({"json": {"images": [FileImage(str(path))]}, "headers": {"X-Test": "1"}})
+    assert "json" not in kwargs
+    assert isinstance(kwargs["content"], JSONBody)
+    assert kwargs["headers"]["X-Test"] == "1"
+    assert kwargs["headers"]["Content-Type"] == "application/json"
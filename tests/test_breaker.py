@@ -0,0 +1,104 @@
+import pytest
+
+from vidu_mcp import breaker as breaker_module
+from vidu_mcp.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from vidu_mcp.exceptions import ViduAuthError, ViduCircuitOpenError, ViduRequestError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(breaker_module.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def outage():
+    error = ViduRequestError("Request failed: 503")
+    error.code = 503
+    return error
+
+
+def fail(breaker, error):
+    with pytest.raises(type(error)):
+        with breaker.call():
+            raise error
+
+
+def succeed(breaker):
+    with breaker.call():
+        pass
+
+
+def test_opens_after_consecutive_outages(clock):
+    breaker = CircuitBreaker("key", "status", failure_threshold=3, recovery_time=10)
+    for _ in range(2):
+        fail(breaker, outage())
+    assert breaker.state == CLOSED
+    fail(breaker, outage())
+    assert breaker.state == OPEN
+
+    with pytest.raises(ViduCircuitOpenError) as raised:
+        succeed(breaker)
+    assert raised.value.retry_after == pytest.approx(10)
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker("key", "status", failure_threshold=2)
+    fail(breaker, outage())
+    succeed(breaker)
+    fail(breaker, outage())
+    assert breaker.state == CLOSED
+
+
+def test_request_errors_do_not_count_as_outages(clock):
+    breaker = CircuitBreaker("key", "submit", failure_threshold=1)
+    rejected = ViduRequestError("Request failed: 400")
+    rejected.code = 400
+    fail(breaker, rejected)
+    fail(breaker, ViduAuthError("Authentication failed"))
+    assert breaker.state == CLOSED
+
+
+def test_half_open_lets_one_probe_through_and_closes_on_success(clock):
+    breaker = CircuitBreaker("key", "status", failure_threshold=1, recovery_time=5)
+    fail(breaker, outage())
+    clock.now += 5
+
+    probe = breaker.call()
+    probe.__enter__()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(ViduCircuitOpenError):
+        succeed(breaker)
+    probe.__exit__(None, None, None)
+
+    assert breaker.state == CLOSED
+    succeed(breaker)
+
+
+def test_failed_probe_opens_again(clock):
+    breaker = CircuitBreaker("key", "status", failure_threshold=1, recovery_time=5)
+    fail(breaker, outage())
+    clock.now += 5
+    fail(breaker, outage())
+    assert breaker.state == OPEN
+
+    clock.now += 4
+    with pytest.raises(ViduCircuitOpenError):
+        succeed(breaker)
+
+
+def test_slow_responses_open_the_breaker(clock):
+    breaker = CircuitBreaker("key", "status", slow_call_threshold=2.0, min_latency_samples=3)
+    breaker.observe_latency(5.0)
+    breaker.observe_latency(5.0)
+    assert breaker.state == CLOSED
+    breaker.observe_latency(5.0)
+    assert breaker.state == OPEN
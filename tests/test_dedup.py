@@ -0,0 +1,111 @@
+import asyncio
+import base64
+
+import pytest
+
+from vidu_mcp.body import FileImage
+from vidu_mcp.dedup import RequestDeduplicator, request_key
+
+pytestmark = pytest.mark.anyio
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+SUCCESS = {"state": "success", "creations": [{"url": "https://example.com/video.mp4"}]}
+
+
+async def test_identical_request_attaches_to_the_task_in_flight():
+    deduplicator = RequestDeduplicator(enabled=True)
+    submits = []
+    release = asyncio.Event()
+
+    async def submit(bind):
+        submits.append(1)
+        await release.wait()
+        bind("t1")
+        return "t1"
+
+    first = asyncio.ensure_future(deduplicator.submit("key", submit))
+    second = asyncio.ensure_future(deduplicator.submit("key", submit))
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(first, second) == ["t1", "t1"]
+    assert len(submits) == 1
+
+
+async def test_failed_submit_is_not_reused():
+    deduplicator = RequestDeduplicator(enabled=True)
+
+    async def failing(bind):
+        raise RuntimeError("rejected")
+
+    async def working(bind):
+        bind("t2")
+        return "t2"
+
+    with pytest.raises(RuntimeError):
+        await deduplicator.submit("key", failing)
+    assert await deduplicator.submit("key", working) == "t2"
+
+
+async def test_successful_result_is_stored_until_the_ttl():
+    deduplicator = RequestDeduplicator(enabled=True, ttl=3600)
+
+    async def submit(bind):
+        bind("t1")
+        return "t1"
+
+    await deduplicator.submit("key", submit)
+    assert deduplicator.lookup("key") is None
+
+    deduplicator.record("t1", SUCCESS, None)
+    assert deduplicator.lookup("key") == {"task_id": "t1", "video_url": "https://example.com/video.mp4"}
+
+    deduplicator.ttl = -1
+    assert deduplicator.lookup("key") is None
+
+
+async def test_failed_task_is_not_stored():
+    deduplicator = RequestDeduplicator(enabled=True)
+
+    async def submit(bind):
+        bind("t1")
+        return "t1"
+
+    await deduplicator.submit("key", submit)
+    deduplicator.record("t1", {"state": "failed", "err_code": "ModelFailed"}, None)
+    assert deduplicator.lookup("key") is None
+
+
+async def test_task_finished_before_submit_returns_is_released():
+    deduplicator = RequestDeduplicator(enabled=True)
+
+    async def finished_early(bind):
+        bind("t1")
+        # an early callback finishes the task while it is submitted
+        deduplicator.record("t1", {"state": "failed", "err_code": "ModelFailed"}, None)
+        return "t1"
+
+    async def resubmit(bind):
+        bind("t2")
+        return "t2"
+
+    assert await deduplicator.submit("key", finished_early) == "t1"
+    assert await deduplicator.submit("key", resubmit) == "t2"
+
+
+def test_streamed_file_has_the_key_of_its_data_url(tmp_path):
+    path = tmp_path / "image.png"
+    path.write_bytes(PNG)
+    data_url = "data:image/png;base64," + base64.b64encode(PNG).decode("ascii")
+
+    inline = request_key("/ent/v2/img2video", {"images": [data_url], "seed": 1})
+    streamed = request_key("/ent/v2/img2video", {"images": [FileImage(str(path))], "seed": 1})
+    assert inline == streamed
+
+
+def test_key_without_content_changes_with_the_file(tmp_path):
+    path = tmp_path / "image.png"
+    path.write_bytes(PNG)
+    before = request_key("/ent/v2/img2video", {"images": [FileImage(str(path))]}, by_content=False)
+    path.write_bytes(PNG + b"\x01")
+    after = request_key("/ent/v2/img2video", {"images": [FileImage(str(path))]}, by_content=False)
+    assert before != after
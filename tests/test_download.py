@@ -0,0 +1,49 @@
+import asyncio
+import os
+
+import httpx
+import pytest
+
+from vidu_mcp.download import VideoDownloader
+
+pytestmark = pytest.mark.anyio
+
+VIDEO = os.urandom(3 * 1024 * 1024 + 123)
+
+
+def serve(request):
+    # a file server supporting single byte ranges
+    header = request.headers.get("Range")
+    if not header:
+        return httpx.Response(200, content=VIDEO)
+    start, end = (int(part) for part in header.removeprefix("bytes=").split("-"))
+    end = min(end, len(VIDEO) - 1)
+    return httpx.Response(206, content=VIDEO[start:end + 1],
+                          headers={"Content-Range": f"bytes {start}-{end}/{len(VIDEO)}"})
+
+
+def downloader(**kwargs):
+    downloader = VideoDownloader(chunk_size=64 * 1024, **kwargs)
+    downloader.client = httpx.AsyncClient(transport=httpx.MockTransport(serve))
+    return downloader
+
+
+async def test_download_in_segments(tmp_path):
+    path = await downloader(segment_size=1024 * 1024).download("https://example.com/v.mp4", str(tmp_path), "t1.mp4")
+    assert open(path, "rb").read() == VIDEO
+    assert os.listdir(tmp_path) == ["t1.mp4"]
+
+
+async def test_download_resumes_a_part_file(tmp_path):
+    (tmp_path / "t1.mp4.part").write_bytes(VIDEO[:1000])
+    path = await downloader(max_segments=1).download("https://example.com/v.mp4", str(tmp_path), "t1.mp4")
+    assert open(path, "rb").read() == VIDEO
+
+
+async def test_concurrent_downloads_of_one_target(tmp_path):
+    instance = downloader(segment_size=1024 * 1024)
+    paths = await asyncio.gather(*(
+        instance.download("https://example.com/v.mp4", str(tmp_path), "t1.mp4") for _ in range(3)
+    ))
+    assert len(set(paths)) == 1
+    assert open(paths[0], "rb").read() == VIDEO
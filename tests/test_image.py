@@ -0,0 +1,35 @@
+import io
+
+import pytest
+
+from vidu_mcp.image import ImagePreprocessor
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def jpeg(width, height, orientation=None):
+    exif = Image.Exif()
+    if orientation is not None:
+        exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "red").save(buffer, format="JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+def test_large_image_is_downscaled():
+    output, mime = ImagePreprocessor(enabled=True).process(jpeg(4000, 3000), "720p")
+    assert mime == "image/jpeg"
+    assert Image.open(io.BytesIO(output)).size == (960, 720)
+
+
+def test_orientation_is_applied_before_resizing():
+    # stored landscape, shown portrait
+    output, _ = ImagePreprocessor(enabled=True).process(jpeg(4000, 3000, orientation=6), "720p")
+    with Image.open(io.BytesIO(output)) as img:
+        assert img.size == (720, 960)
+        assert img.getexif().get(0x0112, 1) == 1
+
+
+def test_small_image_passes_through():
+    data = jpeg(640, 360)
+    assert ImagePreprocessor(enabled=True).process(data, "720p") == (data, "image/jpeg")
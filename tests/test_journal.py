@@ -0,0 +1,133 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from vidu_mcp.journal import TaskJournal, has_unfinished, instance_id, owner_alive
+
+SUCCESS = {"state": "success", "creations": [{"url": "https://example.com/video.mp4"}]}
+
+
+@pytest.fixture
+def dead_owner():
+    # the PID of a process that has exited
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return f"{process.pid}-0123456789ab"
+
+
+@pytest.fixture
+def live_owner():
+    return f"{os.getppid()}-0123456789ab"
+
+
+def lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def write_entries(path, *entries):
+    now = time.time()
+    with open(path, "a", encoding="utf-8") as f:
+        for entry in entries:
+            entry = {"endpoint": "/ent/v2/text2video", "created_at": now, "updated_at": now, **entry}
+            f.write(json.dumps(entry) + "\n")
+
+
+def test_owner_alive(dead_owner, live_owner):
+    assert owner_alive(instance_id())
+    assert owner_alive(live_owner)
+    assert not owner_alive(dead_owner)
+    assert not owner_alive(None)
+    # an earlier process that had this PID
+    assert not owner_alive(f"{os.getpid()}-0123456789ab")
+
+
+def test_entries_survive_a_restart(tmp_path):
+    path = str(tmp_path / "tasks.jsonl")
+    journal = TaskJournal(path)
+    journal.record_submitted("t1", "/ent/v2/text2video", "hash", model="viduq1")
+    journal.record_submitted("t2", "/ent/v2/text2video", "hash")
+    journal.record("t1", SUCCESS, None)
+    assert journal.get("t1")["state"] == "success"
+    journal.flush()
+
+    reopened = TaskJournal(path)
+    assert reopened.get("t1")["video_url"] == "https://example.com/video.mp4"
+    assert reopened.get("t2")["state"] == "submitted"
+    assert reopened.get("t2")["owner"] == instance_id()
+
+
+def test_final_state_is_not_overwritten(tmp_path):
+    journal = TaskJournal(str(tmp_path / "tasks.jsonl"))
+    journal.record_submitted("t1", "/ent/v2/text2video", "hash")
+    journal.record("t1", SUCCESS, None)
+    journal.record("t1", None, RuntimeError("late poll error"))
+    assert journal.get("t1")["state"] == "success"
+
+
+def test_only_tasks_of_exited_owners_are_claimed(tmp_path, dead_owner, live_owner):
+    path = str(tmp_path / "tasks.jsonl")
+    write_entries(
+        path,
+        {"task_id": "orphan", "state": "submitted", "owner": dead_owner},
+        {"task_id": "busy", "state": "processing", "owner": live_owner},
+        {"task_id": "done", "state": "success", "owner": dead_owner},
+    )
+    assert has_unfinished(path)
+
+    journal = TaskJournal(path)
+    claimed = journal.unfinished()
+    assert [entry["task_id"] for entry in claimed] == ["orphan"]
+    assert claimed[0]["owner"] == instance_id()
+    # claimed by this process now, another one takes nothing
+    assert TaskJournal(path).unfinished() == []
+    assert not has_unfinished(path)
+
+
+def test_compaction_keeps_the_tasks_of_other_processes(tmp_path, live_owner):
+    path = str(tmp_path / "tasks.jsonl")
+    first = TaskJournal(path)
+    first.record_submitted("a1", "/ent/v2/text2video", "hash")
+    first.flush()
+    # another process appends after this one loaded the file
+    write_entries(path, {"task_id": "b1", "state": "submitted", "owner": live_owner})
+
+    first.compact()
+    assert {entry["task_id"] for entry in lines(path)} == {"a1", "b1"}
+    assert first.get("b1")["owner"] == live_owner
+
+
+def test_writes_follow_a_file_compacted_by_another_process(tmp_path):
+    path = str(tmp_path / "tasks.jsonl")
+    first = TaskJournal(path)
+    second = TaskJournal(path)
+    first.record_submitted("a1", "/ent/v2/text2video", "hash")
+    first.flush()
+    second.compact()
+
+    first.record("a1", SUCCESS, None)
+    first.flush()
+    assert lines(path)[-1]["state"] == "success"
+    assert TaskJournal(path).get("a1")["state"] == "success"
+
+
+def test_compaction_drops_old_finished_tasks_and_torn_lines(tmp_path, dead_owner):
+    path = str(tmp_path / "tasks.jsonl")
+    old = time.time() - 3600
+    write_entries(
+        path,
+        {"task_id": "old", "state": "success", "owner": dead_owner, "updated_at": old},
+        {"task_id": "old-unfinished", "state": "submitted", "owner": dead_owner, "updated_at": old},
+        {"task_id": "new", "state": "failed", "owner": dead_owner},
+    )
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"task_id": "torn", "sta')
+
+    journal = TaskJournal(path, retention=60)
+    journal.flush()
+    assert [entry["task_id"] for entry in lines(path)] == ["old-unfinished", "new"]
+    assert journal.get("old") is None
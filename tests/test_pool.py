@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from vidu_mcp.exceptions import ViduAuthError, ViduConnectionError, ViduRateLimitError, ViduRequestError
+from vidu_mcp.pool import ClientPool, PoolMember
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeSubmitClient:
+    """Answers submits from a script: task ids are returned, exceptions raised."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.posts = 0
+
+    async def post(self, endpoint, **kwargs):
+        self.posts += 1
+        response = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        if isinstance(response, Exception):
+            raise response
+        return {"task_id": response}
+
+    async def get(self, endpoint, **kwargs):
+        return {"state": "processing"}
+
+
+def request_error(code, message="rejected"):
+    error = ViduRequestError(message)
+    error.code = code
+    return error
+
+
+def pool_of(*clients, **kwargs):
+    return ClientPool([PoolMember(key_id=f"k{index}", client=client, **kwargs) for index, client in enumerate(clients)])
+
+
+def in_flight(pool):
+    return [member.in_flight for member in pool.members]
+
+
+async def test_tasks_go_to_the_least_busy_key():
+    pool = pool_of(FakeSubmitClient("t1", "t3"), FakeSubmitClient("t2"))
+    assert [(await pool.submit("/e"))[1] for _ in range(3)] == ["k0", "k1", "k0"]
+    assert in_flight(pool) == [2, 1]
+    assert pool.key_for("t2") == "k1"
+
+
+@pytest.mark.parametrize("error", [
+    ViduAuthError("invalid key"),
+    ViduRateLimitError("throttled"),
+    ViduConnectionError("connection refused"),
+    request_error(403, "insufficient credits"),
+])
+async def test_key_failures_fail_over_and_free_the_slot(error):
+    pool = pool_of(FakeSubmitClient(error), FakeSubmitClient("t1"))
+    assert await pool.submit("/e") == ({"task_id": "t1"}, "k1")
+    assert in_flight(pool) == [0, 1]
+
+
+async def test_auth_failure_disables_the_key():
+    first = FakeSubmitClient(ViduAuthError("invalid key"))
+    pool = pool_of(first, FakeSubmitClient("t1", "t2"))
+    await pool.submit("/e")
+    await pool.submit("/e")
+    assert first.posts == 1
+    assert pool.members[0].disabled
+
+
+async def test_request_errors_are_not_retried_on_other_keys():
+    second = FakeSubmitClient("t1")
+    pool = pool_of(FakeSubmitClient(request_error(400, "invalid prompt")), second)
+    with pytest.raises(ViduRequestError):
+        await pool.submit("/e")
+    assert second.posts == 0
+    assert in_flight(pool) == [0, 0]
+
+
+async def test_last_error_is_raised_when_every_key_fails():
+    pool = pool_of(FakeSubmitClient(ViduConnectionError("down")), FakeSubmitClient(ViduAuthError("invalid key")))
+    with pytest.raises(ViduAuthError):
+        await pool.submit("/e")
+    assert in_flight(pool) == [0, 0]
+
+
+async def test_full_keys_wait_for_a_finished_task():
+    pool = pool_of(FakeSubmitClient("t1", "t2"), max_in_flight=1)
+    await pool.submit("/e")
+    waiting = asyncio.ensure_future(pool.submit("/e"))
+    await asyncio.sleep(0.02)
+    assert not waiting.done()
+
+    pool.release("t1", {"state": "success"}, None)
+    assert await asyncio.wait_for(waiting, 1) == ({"task_id": "t2"}, "k0")
+    assert in_flight(pool) == [1]
+
+
+async def test_adopted_tasks_hold_a_slot_until_released():
+    pool = pool_of(FakeSubmitClient("t1"))
+    pool.adopt("old", "k0")
+    pool.adopt("old", "k0")
+    assert in_flight(pool) == [1]
+    assert pool.key_for("old") == "k0"
+    pool.release("old", None, ViduRequestError("gave up"))
+    assert in_flight(pool) == [0]
+    assert pool.key_for("old") is None
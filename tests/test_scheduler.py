@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+
+from vidu_mcp.exceptions import ViduValidationError
+from vidu_mcp.scheduler import SubmissionScheduler
+
+pytestmark = pytest.mark.anyio
+
+
+async def queue(scheduler, client, priority, order, name):
+    await scheduler.acquire(client, priority)
+    order.append(name)
+
+
+async def fill(scheduler, count):
+    for index in range(count):
+        await scheduler.acquire("busy")
+        scheduler.bind(f"running-{index}")
+
+
+async def test_submits_beyond_the_limit_wait():
+    scheduler = SubmissionScheduler(max_in_flight=1)
+    await fill(scheduler, 1)
+    waiter = asyncio.ensure_future(scheduler.acquire("a"))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    assert scheduler.stats()["queued"]["normal"] == 1
+
+    scheduler.release("running-0", {"state": "success"}, None)
+    await waiter
+    assert scheduler.in_flight == 1
+
+
+async def test_higher_priorities_are_served_first():
+    scheduler = SubmissionScheduler(max_in_flight=1)
+    await fill(scheduler, 1)
+    order = []
+    waiters = [
+        asyncio.ensure_future(queue(scheduler, "a", "low", order, "low")),
+        asyncio.ensure_future(queue(scheduler, "b", "normal", order, "normal")),
+        asyncio.ensure_future(queue(scheduler, "c", "high", order, "high")),
+    ]
+    await asyncio.sleep(0)
+
+    for index in range(3):
+        scheduler.release(f"running-{index}", {"state": "success"}, None)
+        await asyncio.sleep(0)
+        scheduler.bind(f"running-{index + 1}")
+    await asyncio.gather(*waiters)
+    assert order == ["high", "normal", "low"]
+
+
+async def test_clients_of_one_priority_take_turns():
+    scheduler = SubmissionScheduler(max_in_flight=1)
+    await fill(scheduler, 1)
+    order = []
+    waiters = [asyncio.ensure_future(queue(scheduler, "a", "normal", order, f"a{index}")) for index in range(3)]
+    waiters.append(asyncio.ensure_future(queue(scheduler, "b", "normal", order, "b0")))
+    await asyncio.sleep(0)
+
+    for index in range(4):
+        scheduler.release(f"running-{index}", {"state": "success"}, None)
+        await asyncio.sleep(0)
+        scheduler.bind(f"running-{index + 1}")
+    await asyncio.gather(*waiters)
+    assert order == ["a0", "b0", "a1", "a2"]
+
+
+async def test_cancelled_waiter_leaves_the_queue():
+    scheduler = SubmissionScheduler(max_in_flight=1)
+    await fill(scheduler, 1)
+    cancelled = asyncio.ensure_future(scheduler.acquire("a"))
+    later = asyncio.ensure_future(scheduler.acquire("b"))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    assert scheduler.queued == 1
+
+    scheduler.release("running-0", {"state": "success"}, None)
+    await later
+    assert scheduler.in_flight == 1
+    assert scheduler.queued == 0
+
+
+async def test_abort_frees_the_slot_for_the_next_submit():
+    scheduler = SubmissionScheduler(max_in_flight=1)
+    await scheduler.acquire("a")
+    waiter = asyncio.ensure_future(scheduler.acquire("b"))
+    await asyncio.sleep(0)
+
+    scheduler.abort()
+    await waiter
+    assert scheduler.in_flight == 1
+
+
+async def test_unknown_priority_is_rejected():
+    with pytest.raises(ViduValidationError):
+        await SubmissionScheduler(max_in_flight=1).acquire("a", "urgent")
+
+
+class SharedSlots:
+    def __init__(self, limit_used=0):
+        self.used = limit_used
+        self.slots = set()
+
+    def reserve_slot(self, limit):
+        if self.used + len(self.slots) >= limit:
+            return None
+        slot = f"slot-{len(self.slots)}-{self.used}"
+        self.slots.add(slot)
+        return slot
+
+    async def reserve_slot_async(self, limit):
+        return self.reserve_slot(limit)
+
+    def bind_slot(self, slot, task_id):
+        pass
+
+    def release_slot(self, slot):
+        self.slots.discard(slot)
+
+
+async def test_shared_slots_held_elsewhere_are_waited_for():
+    shared = SharedSlots(limit_used=1)
+    scheduler = SubmissionScheduler(max_in_flight=1, shared=shared, poll_interval=0.01)
+    waiter = asyncio.ensure_future(scheduler.acquire("a"))
+    await asyncio.sleep(0.03)
+    assert not waiter.done()
+
+    # another process finished its task
+    shared.used = 0
+    slot = await asyncio.wait_for(waiter, 1)
+    assert slot in shared.slots
+    scheduler.abort(slot)
+    assert not shared.slots
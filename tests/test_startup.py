@@ -0,0 +1,33 @@
+import importlib.util
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HANDSHAKE_BUDGET_MS = 1500.0
+
+
+def load_benchmark():
+    spec = importlib.util.spec_from_file_location("startup_benchmark", os.path.join(ROOT, "benchmarks", "startup.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_importing_the_server_defers_heavy_modules():
+    benchmark = load_benchmark()
+    code = (
+        "import sys, vidu_mcp.server; "
+        "print(','.join(name for name in ('requests', 'sqlite3', 'PIL') if name in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", code],
+        env=benchmark._env(), capture_output=True, text=True, check=True,
+    ).stdout
+    assert output.strip().splitlines()[-1:] in ([], [""])
+
+
+def test_handshake_is_within_budget():
+    benchmark = load_benchmark()
+    # the best of a few runs, a single slow spawn on a busy machine is noise
+    assert min(benchmark.measure_handshake() for _ in range(3)) <= HANDSHAKE_BUDGET_MS
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from vidu_mcp import status as status_module
+from vidu_mcp.exceptions import ViduRequestError
+from vidu_mcp.status import TaskStatusCache
+
+pytestmark = pytest.mark.anyio
+
+SUCCESS = {"state": "success", "creations": [{"url": "https://example.com/video.mp4"}]}
+
+
+class Journal:
+    def __init__(self, entries=None):
+        self.entries = entries or {}
+
+    def get(self, task_id):
+        return self.entries.get(task_id)
+
+    async def get_async(self, task_id):
+        return self.get(task_id)
+
+    async def recent_async(self, limit=50):
+        return list(self.entries.values())[:limit]
+
+
+async def no_key(task_id):
+    return None
+
+
+def cache_for(client, journal=None, **kwargs):
+    return TaskStatusCache(client, journal or Journal(), no_key, **kwargs)
+
+
+async def test_concurrent_misses_share_one_request(fake_client):
+    client = fake_client({"t1": [{"state": "processing"}]}, delay=0.05)
+    cache = cache_for(client)
+    results = await asyncio.gather(*(cache.get("t1") for _ in range(10)))
+    assert all(result == {"state": "processing"} for result in results)
+    assert client.calls == ["t1"]
+
+
+async def test_unfinished_state_expires(fake_client, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(status_module.time, "monotonic", lambda: now[0])
+    client = fake_client({"t1": [{"state": "processing"}, SUCCESS]})
+    cache = cache_for(client, ttl=5)
+
+    assert (await cache.get("t1"))["state"] == "processing"
+    now[0] += 4
+    assert (await cache.get("t1"))["state"] == "processing"
+    assert client.calls == ["t1"]
+
+    now[0] += 2
+    assert await cache.get("t1") == SUCCESS
+    now[0] += 10 ** 6
+    assert await cache.get("t1") == SUCCESS
+    assert client.calls == ["t1", "t1"]
+
+
+async def test_tracker_updates_fill_the_cache(fake_client):
+    client = fake_client()
+    cache = cache_for(client)
+    cache.update("t1", SUCCESS)
+    # a late poll result must not replace the final state
+    cache.update("t1", {"state": "processing"})
+    assert await cache.get("t1") == SUCCESS
+    assert client.calls == []
+
+
+async def test_finished_task_of_the_journal_is_answered_locally(fake_client):
+    client = fake_client()
+    journal = Journal({"t1": {"task_id": "t1", "state": "success", "video_url": "https://example.com/video.mp4"}})
+    cache = cache_for(client, journal)
+    assert (await cache.get("t1"))["creations"][0]["url"] == "https://example.com/video.mp4"
+    assert client.calls == []
+
+
+async def test_failed_request_reaches_every_reader_and_is_not_cached(fake_client):
+    client = fake_client({"t1": [ViduRequestError("Request failed: timeout"), {"state": "processing"}]}, delay=0.01)
+    cache = cache_for(client)
+    results = await asyncio.gather(cache.get("t1"), cache.get("t1"), return_exceptions=True)
+    assert all(isinstance(result, ViduRequestError) for result in results)
+    assert await cache.get("t1") == {"state": "processing"}
+    assert client.calls == ["t1", "t1"]
+
+
+async def test_cancelled_reader_does_not_cancel_the_others(fake_client):
+    client = fake_client({"t1": [SUCCESS]}, delay=0.05)
+    cache = cache_for(client)
+    cancelled = asyncio.ensure_future(cache.get("t1"))
+    other = asyncio.ensure_future(cache.get("t1"))
+    await asyncio.sleep(0.01)
+    cancelled.cancel()
+    assert await other == SUCCESS
+
+
+async def test_listing_uses_the_latest_known_state(fake_client):
+    journal = Journal({"t1": {"task_id": "t1", "model": "viduq1", "state": "submitted", "created_at": 1.0}})
+    cache = cache_for(fake_client(), journal)
+    cache.update("t1", SUCCESS)
+    assert await cache.recent() == [{
+        "task_id": "t1", "model": "viduq1", "status": "success", "created_at": 1.0,
+        "video_url": "https://example.com/video.mp4",
+    }]
@@ -0,0 +1,134 @@
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+import pytest
+
+from vidu_mcp.journal import instance_id
+from vidu_mcp.store import TaskStore, has_orphaned
+
+pytestmark = pytest.mark.anyio
+
+SUCCESS = {"state": "success", "creations": [{"url": "https://example.com/video.mp4"}]}
+
+
+@pytest.fixture
+def dead_owner():
+    # the PID of a process that has exited
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return f"{process.pid}-0123456789ab"
+
+
+@pytest.fixture
+def live_owner():
+    return f"{os.getppid()}-0123456789ab"
+
+
+def insert(path, task_id, state, owner):
+    # a row written by another process
+    now = time.time()
+    entry = {"task_id": task_id, "endpoint": "/ent/v2/text2video", "state": state, "created_at": now, "updated_at": now}
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "INSERT INTO tasks (task_id, entry, state, owner, updated_at) VALUES (?, ?, ?, ?, ?)",
+        (task_id, json.dumps(entry), state, owner, now),
+    )
+    conn.commit()
+    conn.close()
+
+
+async def test_workers_see_each_others_tasks(tmp_path):
+    path = str(tmp_path / "tasks.db")
+    first = TaskStore(path)
+    second = TaskStore(path)
+    first.record_submitted("t1", "/ent/v2/text2video", "hash", key_id="key-2")
+    first.flush()
+
+    assert (await second.get_async("t1"))["key_id"] == "key-2"
+    second.record("t1", SUCCESS, None)
+    second.flush()
+    # a late error of the polling worker does not undo the result
+    first.record("t1", None, RuntimeError("late poll error"))
+    first.flush()
+    assert first.get("t1")["state"] == "success"
+    assert [entry["task_id"] for entry in await first.recent_async()] == ["t1"]
+
+
+async def test_only_tasks_of_exited_owners_are_claimed(tmp_path, dead_owner, live_owner):
+    path = str(tmp_path / "tasks.db")
+    store = TaskStore(path)
+    store.flush()
+    insert(path, "orphan", "submitted", dead_owner)
+    insert(path, "busy", "processing", live_owner)
+    insert(path, "done", "success", dead_owner)
+    assert has_orphaned(path)
+
+    claimed = await store.unfinished_async()
+    assert [entry["task_id"] for entry in claimed] == ["orphan"]
+    assert await TaskStore(path).unfinished_async() == []
+    assert not has_orphaned(path)
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT owner FROM tasks WHERE task_id = 'orphan'").fetchone()[0] == instance_id()
+    conn.close()
+
+
+async def test_slots_are_limited_across_workers(tmp_path):
+    path = str(tmp_path / "tasks.db")
+    first = TaskStore(path)
+    second = TaskStore(path)
+    slot = await first.reserve_slot_async(2)
+    assert slot is not None
+    assert await second.reserve_slot_async(2) is not None
+    assert await first.reserve_slot_async(2) is None
+
+    # a bound slot is then held by the unfinished task
+    first.bind_slot(slot, "t1")
+    first.record_submitted("t1", "/ent/v2/text2video", "hash")
+    first.flush()
+    assert await second.reserve_slot_async(2) is None
+    first.record("t1", SUCCESS, None)
+    first.flush()
+    assert await second.reserve_slot_async(2) is not None
+
+
+async def test_released_slots_and_slots_of_exited_workers_are_freed(tmp_path, dead_owner):
+    path = str(tmp_path / "tasks.db")
+    store = TaskStore(path)
+    slot = await store.reserve_slot_async(1)
+    store.release_slot(slot)
+    slot = await store.reserve_slot_async(1)
+    assert slot is not None
+
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE slots SET owner = ? WHERE slot_id = ?", (dead_owner, slot))
+    conn.commit()
+    conn.close()
+    assert await store.reserve_slot_async(1) is not None
+
+
+async def test_compaction_drops_old_finished_tasks(tmp_path, dead_owner):
+    path = str(tmp_path / "tasks.db")
+    store = TaskStore(path, retention=60)
+    store.flush()
+    insert(path, "old", "success", dead_owner)
+    insert(path, "old-unfinished", "submitted", dead_owner)
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE tasks SET updated_at = ?", (time.time() - 3600,))
+    conn.commit()
+    conn.close()
+
+    store.compact()
+    assert await store.get_async("old") is None
+    assert await store.get_async("old-unfinished") is not None
+
+
+def test_disabled_store_records_nothing():
+    store = TaskStore(None)
+    store.record_submitted("t1", "/ent/v2/text2video", "hash")
+    assert not store.enabled
+    assert store.get("t1") is None
+    assert store.reserve_slot(1) is not None
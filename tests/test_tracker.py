@@ -0,0 +1,148 @@
+import asyncio
+import time
+
+import pytest
+
+from vidu_mcp.exceptions import ViduCircuitOpenError, ViduConnectionError, ViduRateLimitError, ViduRequestError
+from vidu_mcp.tracker import TaskTracker
+
+pytestmark = pytest.mark.anyio
+
+SUCCESS = {"state": "success", "creations": [{"url": "https://example.com/video.mp4"}]}
+
+
+def tracker_for(client, **kwargs):
+    kwargs.setdefault("min_interval", 0.01)
+    kwargs.setdefault("max_interval", 0.02)
+    kwargs.setdefault("jitter", 0.0)
+    return TaskTracker(client, **kwargs)
+
+
+async def test_polls_until_a_final_state(fake_client):
+    client = fake_client({"t1": [{"state": "queueing"}, {"state": "processing"}, SUCCESS]})
+    tracker = tracker_for(client)
+    finished = []
+    tracker.add_listener(lambda task_id, response, error: finished.append((task_id, response, error)))
+
+    result = await asyncio.wait_for(tracker.track("t1", model="unknown"), 2)
+    assert result == SUCCESS
+    assert client.calls == ["t1", "t1", "t1"]
+    assert finished == [("t1", SUCCESS, None)]
+    assert tracker.pending == 0
+
+
+async def test_waiters_share_one_poll(fake_client):
+    client = fake_client({"t1": [SUCCESS]})
+    tracker = tracker_for(client)
+    results = await asyncio.wait_for(asyncio.gather(tracker.wait("t1"), tracker.wait("t1")), 2)
+    assert results == [SUCCESS, SUCCESS]
+    assert client.calls == ["t1"]
+
+
+async def test_first_check_waits_min_interval(fake_client):
+    client = fake_client({"t1": [SUCCESS]})
+    tracker = tracker_for(client, min_interval=0.1)
+    started = time.monotonic()
+    await asyncio.wait_for(tracker.track("t1"), 2)
+    assert time.monotonic() - started >= 0.1
+
+
+async def test_slow_poll_does_not_delay_other_tasks(fake_client):
+    class SlowForOne(fake_client):
+        async def get(self, endpoint, key_id=None):
+            if "/slow/" in endpoint:
+                await asyncio.sleep(1)
+            return await super().get(endpoint, key_id)
+
+    client = SlowForOne({"slow": [SUCCESS], "fast": [SUCCESS]})
+    tracker = tracker_for(client)
+    slow = tracker.track("slow")
+    await asyncio.sleep(0.05)
+    started = time.monotonic()
+    await asyncio.wait_for(tracker.track("fast"), 2)
+    assert time.monotonic() - started < 0.5
+    await asyncio.wait_for(slow, 2)
+
+
+async def test_callback_resolves_without_polling(fake_client):
+    client = fake_client()
+    tracker = tracker_for(client, callback_interval=60)
+    future = tracker.track("t1", callback=True)
+    await asyncio.sleep(0.05)
+    assert client.calls == []
+
+    assert tracker.resolve("t1", SUCCESS)
+    assert await future == SUCCESS
+    assert not tracker.resolve("t1", SUCCESS)
+
+
+async def test_update_listeners_see_every_status(fake_client):
+    client = fake_client({"t1": [{"state": "processing"}, SUCCESS]})
+    tracker = tracker_for(client)
+    states = []
+    tracker.add_update_listener(lambda task_id, response: states.append(response["state"]))
+    await asyncio.wait_for(tracker.track("t1"), 2)
+    assert states == ["processing", "success"]
+
+
+def request_error(code):
+    error = ViduRequestError(f"Request failed with code {code}")
+    error.code = code
+    return error
+
+
+async def test_repeated_errors_fail_the_task(fake_client):
+    client = fake_client({"t1": [request_error(404)]})
+    tracker = tracker_for(client, max_errors=2)
+    with pytest.raises(ViduRequestError):
+        await asyncio.wait_for(tracker.track("t1"), 2)
+    assert client.calls == ["t1", "t1"]
+
+
+async def test_open_circuit_does_not_count_as_an_error(fake_client):
+    open_error = ViduCircuitOpenError("Request failed: the Vidu API is failing")
+    open_error.retry_after = 0.01
+    client = fake_client({"t1": [open_error, open_error, open_error, SUCCESS]})
+    tracker = tracker_for(client, max_errors=2)
+    assert await asyncio.wait_for(tracker.track("t1"), 2) == SUCCESS
+
+
+async def test_outages_do_not_fail_the_task(fake_client):
+    outages = [ViduConnectionError("Request failed: connection refused"), request_error(503),
+               ViduRateLimitError("Rate limited")]
+    client = fake_client({"t1": outages * 2 + [SUCCESS]})
+    tracker = tracker_for(client, max_errors=2)
+    finished = []
+    tracker.add_listener(lambda task_id, response, error: finished.append(error))
+    assert await asyncio.wait_for(tracker.track("t1"), 2) == SUCCESS
+    assert len(client.calls) == 7
+    assert finished == [None]
+
+
+async def test_callback_recorded_by_another_worker_resolves_the_task(fake_client):
+    class Store:
+        entries = {}
+
+        async def get_async(self, task_id):
+            return self.entries.get(task_id)
+
+    client = fake_client()
+    tracker = tracker_for(client, callback_interval=60, store=Store(), store_interval=0.02)
+    future = tracker.track("t1", callback=True)
+    await asyncio.sleep(0.05)
+    Store.entries["t1"] = {"task_id": "t1", "state": "success", "video_url": "https://example.com/video.mp4"}
+    result = await asyncio.wait_for(future, 2)
+    assert result["state"] == "success"
+    assert result["creations"] == [{"url": "https://example.com/video.mp4"}]
+    assert client.calls == []
+
+
+async def test_callback_tasks_with_a_store_are_still_polled(fake_client):
+    client = fake_client({"t1": [{"state": "processing"}, SUCCESS]})
+    class EmptyStore:
+        async def get_async(self, task_id):
+            return None
+
+    tracker = tracker_for(client, callback_interval=0.1, store=EmptyStore(), store_interval=0.02)
+    assert await asyncio.wait_for(tracker.track("t1", callback=True), 2) == SUCCESS
+    assert client.calls == ["t1", "t1"]
@@ -0,0 +1,69 @@
+import pytest
+
+from vidu_mcp import util
+from vidu_mcp.exceptions import ViduValidationError
+
+
+@pytest.fixture
+def serving(monkeypatch):
+    monkeypatch.setenv("VIDU_SERVE_TRANSPORT", "streamable-http")
+    monkeypatch.delenv("VIDU_DOWNLOAD_DIR", raising=False)
+    monkeypatch.delenv("VIDU_IMAGE_DIR", raising=False)
+
+
+def test_download_dir_is_free_in_stdio_mode(monkeypatch, tmp_path):
+    monkeypatch.delenv("VIDU_SERVE_TRANSPORT", raising=False)
+    monkeypatch.delenv("VIDU_DOWNLOAD_DIR", raising=False)
+    assert util.resolve_download_dir(str(tmp_path)) == str(tmp_path)
+    assert util.resolve_download_dir() is None
+
+
+def test_download_dir_is_confined_when_serving(serving, monkeypatch, tmp_path):
+    with pytest.raises(ViduValidationError):
+        util.resolve_download_dir(str(tmp_path))
+
+    monkeypatch.setenv("VIDU_DOWNLOAD_DIR", str(tmp_path))
+    assert util.resolve_download_dir() == str(tmp_path)
+    assert util.resolve_download_dir("videos") == str(tmp_path / "videos")
+    for escape in ("..", "/etc", "videos/../../etc"):
+        with pytest.raises(ViduValidationError):
+            util.resolve_download_dir(escape)
+
+
+def test_symlinks_cannot_leave_the_root(serving, monkeypatch, tmp_path):
+    root = tmp_path / "root"
+    root.mkdir()
+    (root / "out").symlink_to(tmp_path)
+    monkeypatch.setenv("VIDU_DOWNLOAD_DIR", str(root))
+    with pytest.raises(ViduValidationError):
+        util.resolve_download_dir("out")
+
+
+def test_local_images_need_an_image_dir_when_serving(serving, monkeypatch, tmp_path):
+    image = tmp_path / "image.png"
+    image.write_bytes(b"\x89PNG\r\n\x1a\n")
+    with pytest.raises(ViduValidationError):
+        util.del_input_image(str(image), stream=True)
+
+    monkeypatch.setenv("VIDU_IMAGE_DIR", str(tmp_path))
+    assert util.del_input_image("image.png", stream=True).path == str(image)
+    with pytest.raises(ViduValidationError):
+        util.del_input_image("/etc/passwd", stream=True)
+    # remote images are not local paths
+    assert util.del_input_image("https://example.com/image.png") == "https://example.com/image.png"
+
+
+def test_streamed_images_are_inspected_once_per_file_version(tmp_path):
+    path = tmp_path / "a.png"
+    path.write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 100)
+    cache = util.ImageCache()
+
+    first = cache.get_file(str(path))
+    digest = first.digest()
+    assert cache.get_file(str(path)) is first
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    path.write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x01" * 200)
+    changed = cache.get_file(str(path))
+    assert changed is not first
+    assert changed.digest() != digest
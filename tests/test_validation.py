@@ -0,0 +1,62 @@
+import pytest
+
+from vidu_mcp.exceptions import ViduValidationError
+from vidu_mcp.validation import (
+    ENDPOINTS,
+    MAX_PROMPT_LENGTH,
+    describe_duration,
+    describe_model,
+    describe_resolution,
+    validate_request,
+)
+
+
+@pytest.mark.parametrize("name, params, expected", [
+    ("text2video", {"prompt": "a cat"}, ("viduq1", 5, "1080p")),
+    ("text2video", {"prompt": "a cat", "model": "vidu1.5"}, ("vidu1.5", 4, "360p")),
+    ("text2video", {"prompt": "a cat", "model": "vidu1.5", "duration": 8}, ("vidu1.5", 8, "720p")),
+    ("img2video", {"images": ["a.png"], "model": "vidu2.0", "resolution": "1080p"}, ("vidu2.0", 4, "1080p")),
+    ("reference2video", {"prompt": "a cat", "images": ["a.png", "b.png"]}, ("vidu2.0", 4, "720p")),
+    ("start-end2video", {"images": ["a.png", "b.png"], "model": "viduq1-classic"}, ("viduq1-classic", 5, "1080p")),
+])
+def test_defaults_are_resolved_per_model_and_duration(name, params, expected):
+    resolved = validate_request(name, **{"model": None, "duration": None, "resolution": None, **params})
+    assert (resolved["model"], resolved["duration"], resolved["resolution"]) == expected
+
+
+@pytest.mark.parametrize("name, params, message", [
+    ("text2video", {"prompt": ""}, "prompt is required"),
+    ("text2video", {"prompt": "x" * (MAX_PROMPT_LENGTH + 1)}, "maximum"),
+    ("text2video", {"prompt": "a cat", "model": "vidu2.0"}, "model vidu2.0 is not supported"),
+    ("text2video", {"prompt": "a cat", "duration": 8}, "duration 8s is not supported by viduq1"),
+    ("text2video", {"prompt": "a cat", "model": "vidu1.5", "duration": 8, "resolution": "1080p"}, "at 8s"),
+    ("text2video", {"prompt": "a cat", "aspect_ratio": "4:3"}, "aspect_ratio 4:3"),
+    ("text2video", {"prompt": "a cat", "style": "noir"}, "style noir"),
+    ("img2video", {"images": []}, "images is required"),
+    ("img2video", {"images": ["a.png", "b.png"]}, "accepts 1 images, got 2"),
+    ("reference2video", {"prompt": "a cat", "images": ["a"] * 4}, "accepts 1 to 3 images"),
+    ("img2video", {"images": ["a.png"], "movement_amplitude": "huge"}, "movement_amplitude huge"),
+    ("img2video", {"images": ["a.png"], "model": "viduq1", "bgm": True}, "bgm is only supported for 4s"),
+    ("template2video", {"images": ["a.png"], "template": "hug", "area": "japan"}, "only supported by template"),
+    ("template2video", {"images": ["a.png"], "template": "beast_companion", "beast": "cat"}, "beast cat"),
+])
+def test_unsupported_parameters_are_rejected(name, params, message):
+    with pytest.raises(ViduValidationError, match=message):
+        validate_request(name, **params)
+
+
+def test_template_options_and_bgm_at_supported_settings():
+    validate_request("template2video", images=["a.png"] * 5, template="exotic_princess", area="japan")
+    validate_request("template2video", images=["a.png"], template="hug", area="auto")
+    validate_request("img2video", images=["a.png"], model="vidu2.0", duration=4, bgm=True)
+
+
+def test_descriptions_follow_the_table():
+    assert '"viduq1" being the default' in describe_model("text2video")
+    assert all(f'"{model}"' in describe_model("start-end2video") for model in ENDPOINTS["start-end2video"].models)
+    duration = describe_duration("img2video", "    ")
+    # models with the same durations share a line
+    assert "- vidu2.0 and vidu1.5: default 4s, available: 4, 8" in duration
+    resolution = describe_resolution("text2video", "    ")
+    assert "- vidu1.5 (8s): default 720p, available: 720p" in resolution
+    assert "\n    - viduq1 (5s)" in resolution
@@ -0,0 +1,160 @@
+"""Streaming JSON request bodies for payloads with large local images.
+
+Local images are inlined as base64 data-URLs. Building that text for a
+large image costs several full copies of it: the file bytes, the base64
+bytes, the decoded string, and the serialized request body. A payload
+holding ``FileImage`` values is instead written in chunks: the JSON around
+the images is serialized once, and each image is base64 encoded piece by
+piece straight from a memory-mapped file while the request is uploaded.
+The length of the body is known up front, so it is sent with a
+Content-Length header rather than chunked transfer encoding.
+"""
+import base64
+import hashlib
+import json
+import mmap
+import os
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
+
+from vidu_mcp.image import detect_image_mime
+
+# a multiple of 3, so every chunk encodes to base64 without padding
+CHUNK_SIZE = 3 * 64 * 1024
+
+class FileImage:
+    """Local image file, sent as a base64 data-URL without loading it whole."""
+
+    def __init__(self, path: str):
+        """Inspect the file; its content is only read when the body is sent.
+
+        Args:
+            path: Path of an existing local image file
+        """
+        self.path = os.path.abspath(path)
+        stat = os.stat(self.path)
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        with open(self.path, "rb") as f:
+            self.mime = detect_image_mime(f.read(16))
+        self.prefix = f"data:{self.mime};base64,".encode("ascii")
+        self._digest: Optional[str] = None
+
+    @property
+    def encoded_length(self) -> int:
+        """Length of the data-URL in bytes."""
+        return len(self.prefix) + 4 * ((self.size + 2) // 3)
+
+    def chunks(self) -> Iterator[bytes]:
+        """Yield the data-URL in pieces of about 256 KiB."""
+        yield self.prefix
+        if not self.size:
+            return
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), self.size, access=mmap.ACCESS_READ) as mapped:
+            for offset in range(0, self.size, CHUNK_SIZE):
+                yield base64.b64encode(mapped[offset:offset + CHUNK_SIZE])
+
+    def digest(self) -> str:
+        """Return the SHA-256 of the data-URL, equal to hashing the inlined text.
+
+        Computed on first use; the image cache keeps FileImage objects per
+        path, size and mtime, so a repeated image is hashed once.
+        """
+        if self._digest is None:
+            hasher = hashlib.sha256()
+            for chunk in self.chunks():
+                hasher.update(chunk)
+            self._digest = hasher.hexdigest()
+        return self._digest
+
+    def __repr__(self) -> str:
+        return f"FileImage({self.path!r})"
+
+
+def has_file_images(value: Any) -> bool:
+    """Whether a payload holds any FileImage."""
+    if isinstance(value, FileImage):
+        return True
+    if isinstance(value, dict):
+        return any(has_file_images(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(has_file_images(item) for item in value)
+    return False
+
+
+def _dumps(value: Any) -> bytes:
+    # the same compact form httpx uses for json= bodies
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+
+def _parts(value: Any) -> Iterator[Union[bytes, FileImage]]:
+    if isinstance(value, FileImage):
+        yield b'"'
+        yield value
+        yield b'"'
+    elif isinstance(value, dict):
+        yield b"{"
+        for index, (key, item) in enumerate(value.items()):
+            yield (b"," if index else b"") + _dumps(str(key)) + b":"
+            yield from _parts(item)
+        yield b"}"
+    elif isinstance(value, (list, tuple)):
+        yield b"["
+        for index, item in enumerate(value):
+            if index:
+                yield b","
+            yield from _parts(item)
+        yield b"]"
+    else:
+        yield _dumps(value)
+
+
+class JSONBody:
+    """JSON request body streamed in chunks, with its length known up front.
+
+    The body can be iterated several times, so a retried request sends it
+    again from the start.
+    """
+
+    def __init__(self, payload: Dict[str, Any]):
+        """Serialize everything except the images.
+
+        Args:
+            payload: Request payload, images given as FileImage
+        """
+        self._parts: List[Union[bytes, FileImage]] = []
+        for part in _parts(payload):
+            if isinstance(part, bytes) and self._parts and isinstance(self._parts[-1], bytes):
+                self._parts[-1] += part
+            else:
+                self._parts.append(part)
+        self.length = sum(len(part) if isinstance(part, bytes) else part.encoded_length for part in self._parts)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """Headers describing the body."""
+        return {"Content-Type": "application/json", "Content-Length": str(self.length)}
+
+    def chunks(self) -> Iterator[bytes]:
+        """Yield the body in pieces."""
+        for part in self._parts:
+            if isinstance(part, bytes):
+                yield part
+            else:
+                yield from part.chunks()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        # no __iter__, httpx would otherwise treat the body as a sync stream
+        for chunk in self.chunks():
+            yield chunk
+
+
+def request_kwargs(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace a json= payload holding FileImage values by a streamed body."""
+    payload = kwargs.get("json")
+    if payload is None or not has_file_images(payload):
+        return kwargs
+    body = JSONBody(payload)
+    kwargs = {key: value for key, value in kwargs.items() if key != "json"}
+    kwargs["content"] = body
+    kwargs["headers"] = {**(kwargs.get("headers") or {}), **body.headers}
+    return kwargs
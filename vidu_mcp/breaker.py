@@ -0,0 +1,182 @@
+"""Circuit breaker failing requests fast while the Vidu API is degraded."""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from vidu_mcp import metrics
+from vidu_mcp.exceptions import ViduAuthError, ViduCircuitOpenError, ViduRateLimitError, ViduRequestError
+
+logger = logging.getLogger("vidu-mcp")
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+# values of the state gauge
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+def is_outage(e: Exception) -> bool:
+    """Whether an error points at an unhealthy API rather than at the request."""
+    if isinstance(e, (ViduAuthError, ViduRateLimitError)):
+        return False
+    if isinstance(e, ViduRequestError):
+        # no response at all, an unreadable one, or a server error
+        return e.code is None or (isinstance(e.code, int) and e.code >= 500)
+    return False
+
+
+class CircuitBreaker:
+    """Stop sending requests to an API that keeps failing or slows down.
+
+    The breaker opens after ``failure_threshold`` consecutive outages, or
+    when the moving average of the response time exceeds
+    ``slow_call_threshold``. While open, requests fail at once with
+    ViduCircuitOpenError. After ``recovery_time`` a limited number of
+    probes are let through; a successful probe closes the breaker, a failed
+    one opens it again. Errors caused by the request itself, such as
+    rejected parameters, count as a healthy API.
+    """
+
+    def __init__(
+            self,
+            key_id: str,
+            path: str,
+            failure_threshold: int = 5,
+            slow_call_threshold: float = 30.0,
+            recovery_time: float = 30.0,
+            probes: int = 1,
+            latency_smoothing: float = 0.2,
+            min_latency_samples: int = 5,
+    ):
+        """Initialize the breaker.
+
+        Args:
+            key_id: API key the breaker belongs to, used as metric label
+            path: Request class the breaker guards, submit or status
+            failure_threshold: Consecutive outages that open the breaker, 0 to ignore failures
+            slow_call_threshold: Average response seconds that open the breaker, 0 to ignore latency
+            recovery_time: Seconds the breaker stays open before probing
+            probes: Requests let through at once while probing
+            latency_smoothing: Weight of the newest response time in the moving average
+            min_latency_samples: Responses needed before latency can open the breaker
+        """
+        self.key_id = key_id
+        self.path = path
+        self.failure_threshold = failure_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.recovery_time = recovery_time
+        self.probes = probes
+        self.latency_smoothing = latency_smoothing
+        self.min_latency_samples = min_latency_samples
+        self.state = CLOSED
+        self.failures = 0
+        self.latency = 0.0
+        self._latency_samples = 0
+        self._opened_at = 0.0
+        self._probing = 0
+        self._lock = threading.Lock()
+        self._set_gauge()
+
+    @contextmanager
+    def call(self) -> Iterator[None]:
+        """Guard one API call, including its retries.
+
+        Raises:
+            ViduCircuitOpenError: If the breaker is open
+        """
+        probe = self._admit()
+        try:
+            yield
+        except Exception as e:
+            if is_outage(e):
+                self._on_failure(probe)
+            else:
+                self._on_success(probe)
+            raise
+        except BaseException:
+            # cancelled, no verdict on the API
+            if probe:
+                with self._lock:
+                    self._probing -= 1
+            raise
+        self._on_success(probe)
+
+    def observe_latency(self, seconds: float) -> None:
+        """Feed the response time of one HTTP request into the moving average."""
+        if self.slow_call_threshold <= 0:
+            return
+        with self._lock:
+            self._latency_samples += 1
+            if self._latency_samples == 1:
+                self.latency = seconds
+            else:
+                self.latency += self.latency_smoothing * (seconds - self.latency)
+            if (
+                    self.state == CLOSED
+                    and self._latency_samples >= self.min_latency_samples
+                    and self.latency > self.slow_call_threshold
+            ):
+                self._open("latency")
+
+    def _admit(self) -> bool:
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self._opened_at + self.recovery_time - time.monotonic()
+                if remaining > 0:
+                    raise self._open_error(remaining)
+                self.state = HALF_OPEN
+                self._set_gauge()
+            if self.state == HALF_OPEN:
+                if self._probing >= self.probes:
+                    raise self._open_error(0.0)
+                self._probing += 1
+                return True
+            return False
+
+    def _on_success(self, probe: bool) -> None:
+        with self._lock:
+            self.failures = 0
+            if probe:
+                self._probing -= 1
+                if self.state == HALF_OPEN:
+                    logger.info(f"Vidu API {self.path} requests of {self.key_id} recovered, closing the circuit")
+                    self.state = CLOSED
+                    self._latency_samples = 0
+                    self._set_gauge()
+
+    def _on_failure(self, probe: bool) -> None:
+        with self._lock:
+            self.failures += 1
+            if probe:
+                self._probing -= 1
+                if self.state == HALF_OPEN:
+                    self._open("probe")
+            elif self.state == CLOSED and 0 < self.failure_threshold <= self.failures:
+                self._open("failures")
+
+    def _open(self, reason: str) -> None:
+        # called with the lock held
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._set_gauge()
+        metrics.circuit_opened.inc(key_id=self.key_id, path=self.path, reason=reason)
+        logger.warning(
+            f"Vidu API {self.path} requests of {self.key_id} are failing ({reason}), "
+            f"rejecting them for {self.recovery_time:.0f}s"
+        )
+
+    def _open_error(self, remaining: float) -> ViduCircuitOpenError:
+        metrics.circuit_rejected.inc(key_id=self.key_id, path=self.path)
+        if remaining > 0:
+            message = f"{self.path} requests are paused for {remaining:.0f} more seconds"
+        else:
+            message = f"{self.path} requests are paused while a probe checks whether it recovered"
+        error = ViduCircuitOpenError(f"Request failed: the Vidu API is failing, {message}")
+        error.retry_after = max(remaining, 1.0)
+        return error
+
+    def _set_gauge(self) -> None:
+        metrics.circuit_state.set(_STATE_VALUES[self.state], key_id=self.key_id, path=self.path)
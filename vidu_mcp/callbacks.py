@@ -0,0 +1,193 @@
+"""Receiver for task completion callbacks of the Vidu API.
+
+Every submit carries a ``callback_url`` that points at this receiver. The
+URL holds a random nonce and its HMAC signature, so only URLs this server
+handed out are accepted, and the nonce is bound to the task it was
+submitted with, so a callback cannot finish any other task. Accepted
+statuses resolve the tracker right away; the tracker keeps polling at a
+long fallback interval in case a callback never arrives.
+"""
+import asyncio
+import hashlib
+import hmac
+import logging
+import secrets
+import socket
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+from vidu_mcp import metrics
+from vidu_mcp.const import CALLBACK_PATH, TERMINAL_STATES
+
+logger = logging.getLogger("vidu-mcp")
+
+# callbacks that arrive before their submit returned, kept until the task_id is known
+MAX_EARLY_CALLBACKS = 1000
+
+
+class CallbackReceiver:
+    """Verify completion callbacks and hand them to the task tracker.
+
+    In stdio mode the receiver runs its own small HTTP server, started on
+    the first submit. Under ``vidu-mcp serve`` the callbacks reach the MCP
+    HTTP app instead, and with several workers a callback for a task polled
+    by another worker is written to the shared task store, where the tracker
+    of that worker finds it within seconds.
+    """
+
+    def __init__(
+            self,
+            tracker,
+            journal,
+            public_url: str,
+            secret: Optional[str] = None,
+            host: str = "127.0.0.1",
+            port: int = 8766,
+            embedded: bool = True,
+    ):
+        """Initialize the receiver.
+
+        Args:
+            tracker: Task tracker resolved by the callbacks
+            journal: Task journal or store, keeps the nonce of every task
+            public_url: URL under which the API reaches the receiver
+            secret: Key signing the callback URLs, random per process when empty
+            host: Interface the embedded server listens on
+            port: Port the embedded server listens on
+            embedded: Whether to run an own HTTP server, False when the MCP HTTP app routes the callbacks
+        """
+        self.tracker = tracker
+        self.journal = journal
+        self.public_url = public_url
+        self.host = host
+        self.port = port
+        self.embedded = embedded
+        self._secret = (secret or secrets.token_hex(32)).encode("utf-8")
+        self._nonces: Dict[str, str] = {}
+        self._early: "OrderedDict[str, Tuple[str, Dict[str, Any]]]" = OrderedDict()
+        self._server = None
+        self._server_task: Optional[asyncio.Task] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._failed = False
+
+    async def new_callback(self) -> Optional[Tuple[str, str]]:
+        """Return a fresh callback URL and its nonce, or None if callbacks are unavailable."""
+        if self.embedded and not await self._ensure_server():
+            return None
+        nonce = secrets.token_urlsafe(16)
+        separator = "&" if "?" in self.public_url else "?"
+        return f"{self.public_url}{separator}{urlencode({'nonce': nonce, 'sig': self._sign(nonce)})}", nonce
+
+    def submitted(self, task_id: str, nonce: str) -> None:
+        """Bind a nonce to the task submitted with it, and apply a callback that came first."""
+        self._nonces[task_id] = nonce
+        early = self._early.pop(task_id, None)
+        if early is not None and hmac.compare_digest(early[0], nonce):
+            self._deliver(task_id, early[1])
+
+    def forget(self, task_id: str, status_response: Optional[Dict[str, Any]], exception: Optional[Exception]) -> None:
+        """Tracker listener: drop the nonce of a finished task."""
+        self._nonces.pop(task_id, None)
+
+    async def handle(self, request):
+        """Starlette endpoint receiving the callbacks."""
+        from starlette.responses import JSONResponse
+
+        nonce = request.query_params.get("nonce", "")
+        if not nonce or not hmac.compare_digest(request.query_params.get("sig", ""), self._sign(nonce)):
+            return self._reject("invalid signature", 403)
+        try:
+            body = await request.json()
+        except ValueError:
+            return self._reject("invalid JSON body", 400)
+        if not isinstance(body, dict):
+            return self._reject("invalid JSON body", 400)
+        task_id = str(body.get("id") or body.get("task_id") or "")
+        if not task_id:
+            return self._reject("missing task id", 400)
+
+        expected = self._nonces.get(task_id)
+        if expected is None:
+            entry = await self.journal.get_async(task_id)
+            expected = entry.get("callback_nonce") if entry else None
+        if expected is None:
+            # the submit has not returned yet
+            self._early[task_id] = (nonce, body)
+            while len(self._early) > MAX_EARLY_CALLBACKS:
+                self._early.popitem(last=False)
+            metrics.callbacks_received.inc(outcome="early")
+            return JSONResponse({"status": "accepted"})
+        if not hmac.compare_digest(expected, nonce):
+            return self._reject(f"callback URL does not belong to task {task_id}", 403)
+
+        self._deliver(task_id, body)
+        return JSONResponse({"status": "accepted"})
+
+    async def aclose(self) -> None:
+        """Stop the embedded server."""
+        if self._server is not None:
+            self._server.should_exit = True
+            await self._server_task
+            self._server = None
+
+    def _sign(self, nonce: str) -> str:
+        return hmac.new(self._secret, nonce.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    def _deliver(self, task_id: str, body: Dict[str, Any]) -> None:
+        metrics.callbacks_received.inc(outcome="accepted")
+        if self.tracker.resolve(task_id, body):
+            return
+        # polled by another worker or already finished here, keep the final state in the shared store;
+        # a task finished before keeps its state
+        if body.get("state") in TERMINAL_STATES:
+            self.journal.record(task_id, body, None)
+
+    @staticmethod
+    def _reject(message: str, status_code: int):
+        from starlette.responses import JSONResponse
+
+        metrics.callbacks_received.inc(outcome="rejected")
+        logger.warning(f"Rejected task callback: {message}")
+        return JSONResponse({"error": message}, status_code=status_code)
+
+    async def _ensure_server(self) -> bool:
+        if self._server is not None:
+            return True
+        if self._failed:
+            return False
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._server is None and not self._failed:
+                await self._start_server()
+        return self._server is not None
+
+    async def _start_server(self) -> None:
+        import uvicorn
+        from starlette.applications import Starlette
+        from starlette.routing import Route
+
+        class EmbeddedServer(uvicorn.Server):
+            def capture_signals(self):
+                # the MCP server owns the signal handlers of the process
+                return nullcontext()
+
+        try:
+            # bound here, uvicorn would exit the process when the port is taken
+            sock = socket.create_server(
+                (self.host, self.port), family=socket.AF_INET6 if ":" in self.host else socket.AF_INET
+            )
+        except OSError as e:
+            self._failed = True
+            logger.error(f"Cannot listen for task callbacks on {self.host}:{self.port}, polling instead: {str(e)}")
+            return
+
+        app = Starlette(routes=[Route(CALLBACK_PATH, self.handle, methods=["POST"])])
+        server = EmbeddedServer(uvicorn.Config(app, log_level="warning", lifespan="off"))
+        task = asyncio.get_running_loop().create_task(server.serve(sockets=[sock]))
+        while not server.started and not task.done():
+            await asyncio.sleep(0.01)
+        self._server, self._server_task = server, task
+        logger.info(f"Listening for task callbacks on {self.host}:{self.port}")
@@ -1,18 +1,136 @@
 """Vidu API client base class."""
+import asyncio
+import importlib.util
+import logging
+import time
+
+import httpx
 import requests
-from typing import Any, Dict
-from vidu_mcp.exceptions import ViduAuthError, ViduRequestError
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from typing import Any, Dict, Optional
+from vidu_mcp import metrics
+from vidu_mcp.body import request_kwargs
+from vidu_mcp.breaker import CircuitBreaker
+from vidu_mcp.exceptions import ViduAuthError, ViduConnectionError, ViduRateLimitError, ViduRequestError
+from vidu_mcp.ratelimit import (
+    RETRIABLE_STATUS_CODES,
+    RequestStats,
+    RetryPolicy,
+    STATUS,
+    SUBMIT,
+    TokenBucket,
+    endpoint_class,
+    parse_retry_after,
+)
+
+logger = logging.getLogger("vidu-mcp")
+
+
+def _check_response_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Raise the matching Vidu error if the response carries an API error code.
+
+    Args:
+        data: Decoded JSON response body
+
+    Returns:
+        The response data unchanged
+
+    Raises:
+        ViduAuthError: If authentication fails
+        ViduRequestError: If the API reports any other error
+    """
+    if data.get("code") is not None:
+        trace_id = data.get('metadata', {}).get('trace_id')
+        match data.get("code"):
+            case 401:
+                error = ViduAuthError(
+                    f"API Error: {data.get('message')}, please check your API key and API host."
+                    f"Trace-Id: {trace_id}"
+                )
+            case _:
+                error = ViduRequestError(
+                    f"API Error: {data.get('message')}"
+                    f"Trace-Id: {trace_id}"
+                )
+        error.trace_id = trace_id
+        error.code = data.get("code")
+        raise error
+
+    return data
+
+
+def _should_retry_status(method: str, status_code: int) -> bool:
+    # a throttled submit was not accepted, any other failed submit may have created a task
+    if status_code == 429:
+        return True
+    return method.upper() == "GET" and status_code in RETRIABLE_STATUS_CODES
+
+
+def _should_retry_exception(method: str, e: Exception) -> bool:
+    if method.upper() == "GET":
+        return isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout, httpx.TransportError))
+    # a failed connect never reached the API, so even a submit can be retried
+    if isinstance(e, (requests.exceptions.ConnectTimeout, httpx.ConnectError, httpx.ConnectTimeout)):
+        return True
+    reason = getattr(e.args[0], "reason", None) if e.args else None
+    return isinstance(e, requests.exceptions.ConnectionError) and isinstance(reason, NewConnectionError)
+
+
+def _request_error(e: Exception) -> ViduRequestError:
+    # a submit that never reached the API can safely be sent elsewhere
+    error_class = ViduConnectionError if _should_retry_exception("POST", e) else ViduRequestError
+    error = error_class(f"Request failed: {str(e)}")
+    response = getattr(e, "response", None)
+    if response is not None:
+        error.code = response.status_code
+    return error
+
+
+def _rate_limit_error(retry_after: Optional[float]) -> ViduRateLimitError:
+    error = ViduRateLimitError(
+        f"Request failed: rate limited by the Vidu API, retry after {retry_after if retry_after is not None else 'a while'} seconds"
+    )
+    error.retry_after = retry_after
+    error.code = 429
+    return error
 
 
 class ViduAPIClient:
-    """Base client for making requests to Vidu API."""
+    """Base client for making requests to Vidu API.
 
-    def __init__(self, api_key: str, api_host: str):
+    Headers are set per request and never on the shared session, so one
+    instance can be used from several threads at once.
+    """
+
+    def __init__(
+            self,
+            api_key: str,
+            api_host: str,
+            pool_connections: int = 10,
+            pool_maxsize: int = 20,
+            keep_alive: bool = True,
+            connect_timeout: float = 10.0,
+            read_timeout: float = 60.0,
+            submit_rate: float = 0.0,
+            status_rate: float = 0.0,
+            retry_policy: Optional[RetryPolicy] = None,
+            breakers: Optional[Dict[str, CircuitBreaker]] = None,
+    ):
         """Initialize the API client.
 
         Args:
             api_key: The API key for authentication
             api_host: The API host URL
+            pool_connections: Number of hosts to keep connection pools for
+            pool_maxsize: Maximum connections kept per host, match the number of worker threads
+            keep_alive: Reuse connections between requests
+            connect_timeout: Seconds to wait for a connection
+            read_timeout: Seconds to wait for response data
+            submit_rate: Maximum generation submits per second, 0 for unlimited
+            status_rate: Maximum status requests per second, 0 for unlimited
+            retry_policy: Backoff policy for retriable failures
+            breakers: Circuit breaker per request class, submit and status; one per class by default
         """
         self.api_key = api_key
         self.api_host = api_host
@@ -20,6 +138,16 @@ class ViduAPIClient:
         self.session.headers.update({
             'Authorization': f'Token {api_key}',
         })
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.timeout = (connect_timeout, read_timeout)
+        self.limiters = {SUBMIT: TokenBucket(submit_rate), STATUS: TokenBucket(status_rate)}
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breakers = breakers or {path: CircuitBreaker(api_host, path) for path in (SUBMIT, STATUS)}
+        self.stats = RequestStats()
 
     def _make_request(
             self,
@@ -39,45 +167,74 @@ class ViduAPIClient:
 
         Raises:
             ViduAuthError: If authentication fails
+            ViduRateLimitError: If the API keeps rate limiting the request
+            ViduCircuitOpenError: If the API keeps failing and the request is not sent
             ViduRequestError: If the request fails
         """
+        with metrics.track_call(method, endpoint), self.breakers[endpoint_class(method)].call():
+            return self._send(method, endpoint, **kwargs)
+
+    def _send(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
         url = f"{self.api_host}{endpoint}"
 
-        # Set Content-Type based on whether files are being uploaded
+        # Set Content-Type per request based on whether files are being uploaded,
+        # for multipart/form-data requests sets it with the correct boundary
         files = kwargs.get('files')
+        headers = dict(kwargs.pop('headers', None) or {})
         if not files:
-            self.session.headers['Content-Type'] = 'application/json'
-        else:
-            # Remove Content-Type header for multipart/form-data
-            # requests library will set it automatically with the correct boundary
-            self.session.headers.pop('Content-Type', None)
-
-        try:
-            response = self.session.request(method, url, **kwargs)
-
-            # Check for other HTTP errors
-            response.raise_for_status()
-
-            data = response.json()
-
-            # Check API-specific error codes
-            if data.get("code") is not None:
-                match data.get("code"):
-                    case 401:
-                        raise ViduAuthError(
-                            f"API Error: {data.get('message')}, please check your API key and API host."
-                            f"Trace-Id: {data.get('metadata', {}).get('trace_id')}"
-                        )
-                    case _:
-                        raise ViduRequestError(
-                            f"API Error: {data.get('message')}"
-                            f"Trace-Id: {data.get('metadata', {}).get('trace_id')}"
-                        )
-
-            return data
-
-        except requests.exceptions.RequestException as e:
-            raise ViduRequestError(f"Request failed: {str(e)}")
+            headers.setdefault('Content-Type', 'application/json')
+        kwargs.setdefault('timeout', self.timeout)
+
+        path = endpoint_class(method)
+        limiter = self.limiters[path]
+        breaker = self.breakers[path]
+        # uploaded file objects are consumed by the first attempt
+        max_retries = 0 if files else self.retry_policy.max_retries
+        attempt = 0
+        while True:
+            wait = limiter.reserve()
+            if wait > 0:
+                self.stats.add("throttled", path=path)
+                time.sleep(wait)
+
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, headers=headers, **kwargs)
+            except requests.exceptions.RequestException as e:
+                if _should_retry_exception(method, e) and attempt < max_retries:
+                    self.stats.add("retried", path=path)
+                    time.sleep(self.retry_policy.delay(attempt))
+                    attempt += 1
+                    continue
+                raise _request_error(e)
+            metrics.observe_response(method, endpoint, response.status_code, time.monotonic() - started)
+            breaker.observe_latency(time.monotonic() - started)
+
+            if response.status_code in RETRIABLE_STATUS_CODES:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                delay = self.retry_policy.delay(attempt, retry_after)
+                if response.status_code == 429:
+                    self.stats.add("rate_limited", path=path)
+                    # hold back every request of this class, the retry then waits in the limiter
+                    limiter.pause(delay)
+                if _should_retry_status(method, response.status_code) and attempt < max_retries:
+                    self.stats.add("retried", path=path)
+                    if response.status_code != 429 or limiter.rate <= 0:
+                        time.sleep(delay)
+                    attempt += 1
+                    continue
+                if response.status_code == 429:
+                    raise _rate_limit_error(retry_after)
+
+            try:
+                # Check for other HTTP errors
+                response.raise_for_status()
+
+                # Check API-specific error codes
+                return _check_response_data(response.json())
+
+            except requests.exceptions.RequestException as e:
+                raise _request_error(e)
 
     def get(self, endpoint: str, **kwargs) -> Dict[str, Any]:
         """Make a GET request."""
@@ -85,4 +242,160 @@ class ViduAPIClient:
 
     def post(self, endpoint: str, **kwargs) -> Dict[str, Any]:
         """Make a POST request."""
-        return self._make_request("POST", endpoint, **kwargs)
\ No newline at end of file
+        return self._make_request("POST", endpoint, **kwargs)
+
+
+class AsyncViduAPIClient:
+    """Async client for making requests to Vidu API.
+
+    A single instance keeps a pooled ``httpx.AsyncClient`` so concurrent tool
+    calls share keep-alive connections instead of opening a socket per call.
+    """
+
+    def __init__(
+            self,
+            api_key: str,
+            api_host: str,
+            max_connections: int = 100,
+            max_keepalive_connections: int = 20,
+            keepalive_expiry: float = 30.0,
+            keep_alive: bool = True,
+            connect_timeout: float = 10.0,
+            read_timeout: float = 60.0,
+            http2: bool = False,
+            submit_rate: float = 0.0,
+            status_rate: float = 0.0,
+            retry_policy: Optional[RetryPolicy] = None,
+            breakers: Optional[Dict[str, CircuitBreaker]] = None,
+    ):
+        """Initialize the API client.
+
+        Args:
+            api_key: The API key for authentication
+            api_host: The API host URL
+            max_connections: Maximum number of concurrent connections
+            max_keepalive_connections: Maximum number of idle keep-alive connections
+            keepalive_expiry: Seconds an idle connection is kept open
+            keep_alive: Reuse connections between requests
+            connect_timeout: Seconds to wait for a connection
+            read_timeout: Seconds to wait for response data
+            http2: Use HTTP/2 when the optional ``h2`` package is installed
+            submit_rate: Maximum generation submits per second, 0 for unlimited
+            status_rate: Maximum status requests per second, 0 for unlimited
+            retry_policy: Backoff policy for retriable failures
+            breakers: Circuit breaker per request class, submit and status; one per class by default
+        """
+        self.api_key = api_key
+        self.api_host = api_host
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed, falling back to HTTP/1.1")
+            http2 = False
+        self.client = httpx.AsyncClient(
+            headers={
+                'Authorization': f'Token {api_key}',
+            },
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections if keep_alive else 0,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            http2=http2,
+        )
+        self.limiters = {SUBMIT: TokenBucket(submit_rate), STATUS: TokenBucket(status_rate)}
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breakers = breakers or {path: CircuitBreaker(api_host, path) for path in (SUBMIT, STATUS)}
+        self.stats = RequestStats()
+
+    async def _make_request(
+            self,
+            method: str,
+            endpoint: str,
+            **kwargs
+    ) -> Dict[str, Any]:
+        """Make an HTTP request to the Vidu API.
+
+        Args:
+            method: HTTP method (GET, POST, etc.)
+            endpoint: API endpoint path
+            **kwargs: Additional arguments to pass to httpx
+
+        Returns:
+            API response data as dictionary
+
+        Raises:
+            ViduAuthError: If authentication fails
+            ViduRateLimitError: If the API keeps rate limiting the request
+            ViduCircuitOpenError: If the API keeps failing and the request is not sent
+            ViduRequestError: If the request fails
+        """
+        with metrics.track_call(method, endpoint), self.breakers[endpoint_class(method)].call():
+            return await self._send(method, endpoint, **kwargs)
+
+    async def _send(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
+        url = f"{self.api_host}{endpoint}"
+
+        path = endpoint_class(method)
+        limiter = self.limiters[path]
+        breaker = self.breakers[path]
+        max_retries = 0 if kwargs.get('files') else self.retry_policy.max_retries
+        attempt = 0
+        while True:
+            wait = limiter.reserve()
+            if wait > 0:
+                self.stats.add("throttled", path=path)
+                await asyncio.sleep(wait)
+
+            started = time.monotonic()
+            try:
+                # httpx sets Content-Type per request for json= and files= bodies
+                response = await self.client.request(method, url, **kwargs)
+            except httpx.HTTPError as e:
+                if _should_retry_exception(method, e) and attempt < max_retries:
+                    self.stats.add("retried", path=path)
+                    await asyncio.sleep(self.retry_policy.delay(attempt))
+                    attempt += 1
+                    continue
+                raise _request_error(e)
+            metrics.observe_response(method, endpoint, response.status_code, time.monotonic() - started)
+            breaker.observe_latency(time.monotonic() - started)
+
+            if response.status_code in RETRIABLE_STATUS_CODES:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                delay = self.retry_policy.delay(attempt, retry_after)
+                if response.status_code == 429:
+                    self.stats.add("rate_limited", path=path)
+                    # hold back every request of this class, the retry then waits in the limiter
+                    limiter.pause(delay)
+                if _should_retry_status(method, response.status_code) and attempt < max_retries:
+                    self.stats.add("retried", path=path)
+                    if response.status_code != 429 or limiter.rate <= 0:
+                        await asyncio.sleep(delay)
+                    attempt += 1
+                    continue
+                if response.status_code == 429:
+                    raise _rate_limit_error(retry_after)
+
+            try:
+                # Check for other HTTP errors
+                response.raise_for_status()
+
+                # Check API-specific error codes
+                return _check_response_data(response.json())
+
+            except httpx.HTTPError as e:
+                raise _request_error(e)
+            except ValueError as e:
+                raise ViduRequestError(f"Invalid response: {str(e)}")
+
+    async def get(self, endpoint: str, **kwargs) -> Dict[str, Any]:
+        """Make a GET request."""
+        return await self._make_request("GET", endpoint, **kwargs)
+
+    async def post(self, endpoint: str, **kwargs) -> Dict[str, Any]:
+        """Make a POST request, streaming the body when the payload holds local image files."""
+        return await self._make_request("POST", endpoint, **request_kwargs(kwargs))
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        await self.client.aclose()
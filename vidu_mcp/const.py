@@ -1,4 +1,58 @@
 ENV_FASTMCP_LOG_LEVEL = "FASTMCP_LOG_LEVEL"
+ENV_VIDU_HTTP2 = "VIDU_HTTP2"
+ENV_VIDU_MAX_CONNECTIONS = "VIDU_MAX_CONNECTIONS"
+ENV_VIDU_KEEPALIVE = "VIDU_KEEPALIVE"
+ENV_VIDU_CONNECT_TIMEOUT = "VIDU_CONNECT_TIMEOUT"
+ENV_VIDU_READ_TIMEOUT = "VIDU_READ_TIMEOUT"
+ENV_VIDU_SUBMIT_RATE = "VIDU_SUBMIT_RATE"
+ENV_VIDU_STATUS_RATE = "VIDU_STATUS_RATE"
+ENV_VIDU_MAX_RETRIES = "VIDU_MAX_RETRIES"
+ENV_VIDU_BREAKER_FAILURES = "VIDU_BREAKER_FAILURES"
+ENV_VIDU_BREAKER_SLOW_CALL = "VIDU_BREAKER_SLOW_CALL"
+ENV_VIDU_BREAKER_RECOVERY = "VIDU_BREAKER_RECOVERY"
+ENV_VIDU_IMAGE_CACHE_BYTES = "VIDU_IMAGE_CACHE_BYTES"
+ENV_VIDU_IMAGE_CACHE_HASH = "VIDU_IMAGE_CACHE_HASH"
+ENV_VIDU_IMAGE_WORKERS = "VIDU_IMAGE_WORKERS"
+ENV_VIDU_IMAGE_PREPROCESS = "VIDU_IMAGE_PREPROCESS"
+ENV_VIDU_IMAGE_QUALITY = "VIDU_IMAGE_QUALITY"
+ENV_VIDU_STREAM_IMAGES = "VIDU_STREAM_IMAGES"
+ENV_VIDU_DEDUP = "VIDU_DEDUP"
+ENV_VIDU_DEDUP_DB = "VIDU_DEDUP_DB"
+ENV_VIDU_DEDUP_TTL = "VIDU_DEDUP_TTL"
+ENV_VIDU_DOWNLOAD_DIR = "VIDU_DOWNLOAD_DIR"
+ENV_VIDU_IMAGE_DIR = "VIDU_IMAGE_DIR"
+ENV_VIDU_JOURNAL_PATH = "VIDU_JOURNAL_PATH"
+ENV_VIDU_STATUS_CACHE_TTL = "VIDU_STATUS_CACHE_TTL"
+ENV_VIDU_API_POOL = "VIDU_API_POOL"
+ENV_VIDU_MAX_IN_FLIGHT = "VIDU_MAX_IN_FLIGHT"
+ENV_VIDU_TOTAL_MAX_IN_FLIGHT = "VIDU_TOTAL_MAX_IN_FLIGHT"
+ENV_VIDU_TASK_STORE = "VIDU_TASK_STORE"
+ENV_VIDU_CALLBACK_URL = "VIDU_CALLBACK_URL"
+ENV_VIDU_CALLBACK_SECRET = "VIDU_CALLBACK_SECRET"
+ENV_VIDU_CALLBACK_HOST = "VIDU_CALLBACK_HOST"
+ENV_VIDU_CALLBACK_PORT = "VIDU_CALLBACK_PORT"
+ENV_VIDU_CALLBACK_POLL_INTERVAL = "VIDU_CALLBACK_POLL_INTERVAL"
+# set by `vidu-mcp serve` for its worker processes
+ENV_VIDU_SERVE_TRANSPORT = "VIDU_SERVE_TRANSPORT"
+ENV_VIDU_SERVE_STATELESS = "VIDU_SERVE_STATELESS"
 
 ENV_VIDU_API_KEY = None
-ENV_VIDU_API_HOST = None
\ No newline at end of file
+ENV_VIDU_API_HOST = None
+
+# Task states after which a task will not change anymore
+TERMINAL_STATES = ("success", "failed")
+
+# Typical generation time per model in seconds, used to pace status polling
+MODEL_TYPICAL_DURATIONS = {
+    "viduq1": 60,
+    "viduq1-classic": 60,
+    "vidu2.0": 30,
+    "vidu1.5": 45,
+}
+DEFAULT_TYPICAL_DURATION = 60
+
+# Path the task callbacks of the Vidu API are received on
+CALLBACK_PATH = "/vidu/callback"
+
+# Maximum time a tool call waits for a video, in seconds
+DEFAULT_WAIT_TIMEOUT = 600
@@ -0,0 +1,154 @@
+"""Deduplication of identical generation requests."""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from vidu_mcp.body import FileImage
+
+logger = logging.getLogger("vidu-mcp")
+
+
+def _normalize(value: Any, by_content: bool) -> Any:
+    if isinstance(value, str) and value.startswith("data:"):
+        # inline images are compared by content, not by their (large) text
+        return "sha256:" + hashlib.sha256(value.encode("utf-8")).hexdigest()
+    if isinstance(value, FileImage):
+        if by_content:
+            # same key as the inlined data-URL of the file
+            return "sha256:" + value.digest()
+        # reading the whole file is only worth it to find identical requests
+        return f"file:{value.path}:{value.size}:{value.mtime_ns}"
+    if isinstance(value, dict):
+        return {key: _normalize(item, by_content) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item, by_content) for item in value]
+    return value
+
+
+def request_key(endpoint: str, payload: Dict[str, Any], by_content: bool = True) -> str:
+    """Return a stable hash identifying a generation request.
+
+    Hashing the content of large local images takes a while, call this off
+    the event loop.
+
+    Args:
+        endpoint: API endpoint path the payload is posted to
+        payload: Request payload
+        by_content: Whether streamed image files are identified by their content rather than path, size and mtime
+
+    Returns:
+        Hex digest of the normalized endpoint and payload
+    """
+    normalized = json.dumps(
+        {"endpoint": endpoint, "payload": _normalize(payload, by_content)},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class RequestDeduplicator:
+    """Collapse identical generation requests onto one paid task.
+
+    A request identical to one still in flight attaches to the existing
+    task_id instead of submitting again. Successful results are kept in a
+    local SQLite store and returned for identical requests until the TTL
+    expires.
+    """
+
+    def __init__(self, enabled: bool = False, db_path: Optional[str] = None, ttl: float = 3600.0):
+        """Initialize the deduplicator.
+
+        Args:
+            enabled: Whether requests are deduplicated at all
+            db_path: SQLite file for successful results, None keeps them in memory
+            ttl: Seconds a stored result is reused
+        """
+        self.enabled = enabled
+        self.db_path = db_path
+        self.ttl = ttl
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._task_keys: Dict[str, str] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a stored successful result for the request, if still fresh."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT task_id, video_url FROM results WHERE key = ? AND created_at >= ?",
+                (key, time.time() - self.ttl),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"task_id": row[0], "video_url": row[1]}
+
+    async def submit(self, key: str, submit: Callable[[Callable[[str], None]], Awaitable[str]]) -> str:
+        """Submit a request, or attach to an identical one already in flight.
+
+        Args:
+            key: Request key from request_key
+            submit: Coroutine factory that submits the request and returns its task_id. It is passed a
+                    function to call with the task_id before the task is tracked, as the task may
+                    finish before the factory returns
+
+        Returns:
+            The task_id of the new or existing task
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            logger.info("Attaching to identical in-flight request")
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            task_id = await submit(lambda task_id: self._task_keys.__setitem__(task_id, key))
+        except BaseException as e:
+            self._inflight.pop(key, None)
+            future.set_exception(e)
+            # mark retrieved, the caller re-raises it below
+            future.exception()
+            raise
+        future.set_result(task_id)
+        return task_id
+
+    def record(self, task_id: str, status_response: Optional[Dict[str, Any]], exception: Optional[Exception]) -> None:
+        """Tracker listener: release the in-flight entry and store successes."""
+        key = self._task_keys.pop(task_id, None)
+        if key is None:
+            return
+        self._inflight.pop(key, None)
+        if exception is not None or status_response.get("state") != "success":
+            return
+
+        video_url = (status_response.get("creations") or [{}])[0].get("url")
+        if not video_url:
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, task_id, video_url, created_at) VALUES (?, ?, ?, ?)",
+                (key, task_id, video_url, time.time()),
+            )
+            conn.execute("DELETE FROM results WHERE created_at < ?", (time.time() - self.ttl,))
+            conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.db_path:
+                os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path or ":memory:", check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, task_id TEXT, video_url TEXT, created_at REAL)"
+            )
+            self._conn.commit()
+        return self._conn
@@ -0,0 +1,193 @@
+"""Streaming, resumable download of generated videos."""
+import asyncio
+import logging
+import os
+import re
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+import httpx
+
+from vidu_mcp.exceptions import ViduRequestError
+
+logger = logging.getLogger("vidu-mcp")
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+
+
+class VideoDownloader:
+    """Download creations to local files with constant memory.
+
+    Data is streamed to a ``.part`` file next to the target in fixed-size
+    chunks. Interrupted transfers resume with HTTP Range requests, large files
+    are fetched as parallel ranged segments, and the target only appears,
+    through an atomic rename, once its size has been verified. Concurrent
+    downloads to the same target run one after the other, so a later one
+    finds the finished file instead of writing the same ``.part`` file.
+    Disk writes, fsync and joining segments run in worker threads, so a
+    download does not stall the event loop.
+    """
+
+    def __init__(
+            self,
+            chunk_size: int = 1024 * 1024,
+            segment_size: int = 16 * 1024 * 1024,
+            max_segments: int = 4,
+            max_attempts: int = 3,
+            timeout: float = 60.0,
+    ):
+        """Initialize the downloader.
+
+        Args:
+            chunk_size: Bytes read and written at a time
+            segment_size: Files at least twice this size are downloaded in parallel segments
+            max_segments: Maximum number of parallel segments per file
+            max_attempts: Attempts per file or segment before giving up
+            timeout: Seconds to wait for a connection or for data
+        """
+        self.chunk_size = chunk_size
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        self.max_attempts = max_attempts
+        self.client = httpx.AsyncClient(follow_redirects=True, timeout=timeout)
+        # target path -> lock and number of callers holding or waiting for it
+        self._locks: Dict[str, List] = {}
+
+    async def download(self, url: str, dest_dir: str, filename: str) -> str:
+        """Download a URL into a directory.
+
+        Args:
+            url: URL of the file
+            dest_dir: Directory to store the file in, created if missing
+            filename: Name of the file inside dest_dir
+
+        Returns:
+            Path of the downloaded file
+
+        Raises:
+            ViduRequestError: If the download fails or the size does not match
+        """
+        await asyncio.to_thread(os.makedirs, dest_dir, exist_ok=True)
+        path = os.path.join(dest_dir, filename)
+        key = os.path.abspath(path)
+        entry = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                return await self._download(url, path)
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[key]
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        await self.client.aclose()
+
+    async def _download(self, url: str, path: str) -> str:
+        part_path = f"{path}.part"
+
+        total, ranged = await self._probe(url)
+        if total is not None and os.path.exists(path) and os.path.getsize(path) == total:
+            return path
+
+        if ranged and total is not None and total >= 2 * self.segment_size and self.max_segments > 1:
+            await self._download_segments(url, part_path, total)
+        else:
+            await self._download_range(url, part_path, 0, total - 1 if ranged else None)
+
+        size = os.path.getsize(part_path)
+        if total is not None and size != total:
+            os.remove(part_path)
+            raise ViduRequestError(f"Downloaded size {size} does not match expected size {total} for {url}")
+
+        os.replace(part_path, path)
+        logger.info(f"Downloaded {size} bytes to {path}")
+        return path
+
+    async def _probe(self, url: str) -> Tuple[Optional[int], bool]:
+        # signed URLs are often only valid for GET, so probe with a one-byte range
+        async with self.client.stream("GET", url, headers={"Range": "bytes=0-0"}) as response:
+            response.raise_for_status()
+            if response.status_code == 206:
+                match = _CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+                if match:
+                    return int(match.group(3)), True
+            length = response.headers.get("Content-Length")
+            return (int(length) if length else None), False
+
+    async def _download_segments(self, url: str, part_path: str, total: int) -> None:
+        count = min(self.max_segments, -(-total // self.segment_size))
+        size = -(-total // count)
+        segments = [(index, index * size, min(total, (index + 1) * size) - 1) for index in range(count)]
+
+        await asyncio.gather(*(
+            self._download_range(url, f"{part_path}.{index}", start, end) for index, start, end in segments
+        ))
+
+        await asyncio.to_thread(self._join, part_path, [f"{part_path}.{index}" for index, _, _ in segments])
+
+    def _join(self, part_path: str, segment_paths: List[str]) -> None:
+        # join the segments in fixed-size chunks, then drop them
+        with open(part_path, "wb") as out:
+            for segment_path in segment_paths:
+                with open(segment_path, "rb") as segment:
+                    while chunk := segment.read(self.chunk_size):
+                        out.write(chunk)
+            out.flush()
+            os.fsync(out.fileno())
+        for segment_path in segment_paths:
+            os.remove(segment_path)
+
+    async def _download_range(self, url: str, path: str, start: int, end: Optional[int]) -> None:
+        # without a known end the server does not support ranges, so retries start over
+        resumable = end is not None
+        for attempt in range(self.max_attempts):
+            done = os.path.getsize(path) if resumable and os.path.exists(path) else 0
+            if resumable and start + done > end:
+                return
+            try:
+                await self._fetch_range(url, path, start + done, end, offset=done)
+                return
+            except (httpx.HTTPError, OSError) as e:
+                if attempt == self.max_attempts - 1:
+                    raise ViduRequestError(f"Download failed: {str(e)}")
+                logger.warning(f"Download interrupted, resuming: {str(e)}")
+                await asyncio.sleep(2 ** attempt)
+
+    async def _fetch_range(
+            self,
+            url: str,
+            path: str,
+            start: int,
+            end: Optional[int],
+            offset: int,
+    ) -> None:
+        headers = {}
+        if end is not None:
+            headers["Range"] = f"bytes={start}-{end}"
+
+        async with self.client.stream("GET", url, headers=headers) as response:
+            response.raise_for_status()
+            if headers and response.status_code != 206 and start > 0:
+                # range ignored, the body starts at byte 0
+                raise ViduRequestError(f"Server does not support resuming downloads for {url}")
+            f = await asyncio.to_thread(_open_at, path, offset)
+            try:
+                async for chunk in response.aiter_bytes(self.chunk_size):
+                    await asyncio.to_thread(f.write, chunk)
+                await asyncio.to_thread(_sync, f)
+            finally:
+                await asyncio.to_thread(f.close)
+
+
+def _open_at(path: str, offset: int) -> BinaryIO:
+    # drop whatever follows the resume offset, a torn chunk of an interrupted write
+    f = open(path, "r+b" if offset > 0 else "wb")
+    f.seek(offset)
+    f.truncate()
+    return f
+
+
+def _sync(f: BinaryIO) -> None:
+    f.flush()
+    os.fsync(f.fileno())
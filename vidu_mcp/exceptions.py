@@ -1,10 +1,27 @@
 class ViduAPIError(Exception):
     """Base exception for Vidu API errors."""
-    pass
+    # trace id reported by the Vidu API, if the error came from an API response
+    trace_id = None
+    # API error code or HTTP status code, if the error came from a response
+    code = None
 
 class ViduAuthError(ViduAPIError):
     """Authentication related errors."""
     pass
 class ViduRequestError(ViduAPIError):
     """Request related errors."""
-    pass
\ No newline at end of file
+    pass
+class ViduRateLimitError(ViduRequestError):
+    """Rate limited by the API after all retries."""
+    # seconds the API asked to wait, if it said so
+    retry_after = None
+class ViduValidationError(ViduRequestError):
+    """Parameters rejected locally, before calling the API."""
+    pass
+class ViduConnectionError(ViduRequestError):
+    """Could not connect to the API, so the request was never sent."""
+    pass
+class ViduCircuitOpenError(ViduConnectionError):
+    """The API kept failing, so the request was rejected locally without being sent."""
+    # seconds until the API is tried again
+    retry_after = None
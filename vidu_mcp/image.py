@@ -0,0 +1,147 @@
+"""Format detection and optional downscaling of local input images."""
+import io
+import logging
+import threading
+from typing import Optional, Tuple
+
+from vidu_mcp import metrics
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+    ImageOps = None
+
+logger = logging.getLogger("vidu-mcp")
+
+# Largest useful input size per output resolution, as (long edge, short edge)
+RESOLUTION_BOUNDS = {
+    "360p": (640, 360),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+}
+DEFAULT_RESOLUTION = "1080p"
+
+
+def detect_image_mime(data: bytes) -> str:
+    """Detect the MIME type of an image from its magic bytes.
+
+    Args:
+        data: Leading bytes of the image file
+
+    Returns:
+        The detected MIME type, ``image/jpeg`` when unknown
+    """
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if data.startswith(b"BM"):
+        return "image/bmp"
+    return "image/jpeg"
+
+
+class ImagePreprocessor:
+    """Downscale and re-encode local images before upload.
+
+    Images larger than the chosen output resolution can use are resized to
+    fit it, and opaque lossless images are re-encoded as JPEG. The result is
+    only used when it is smaller than the original. Requires Pillow; without
+    it images pass through unchanged.
+    """
+
+    def __init__(self, enabled: bool = False, quality: int = 90):
+        """Initialize the preprocessor.
+
+        Args:
+            enabled: Whether to resize and re-encode images
+            quality: JPEG quality used when re-encoding
+        """
+        self.enabled = enabled
+        self.quality = quality
+        self.processed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        """Whether images are actually rewritten."""
+        return self.enabled and Image is not None
+
+    def variant(self, resolution: Optional[str]) -> Optional[Tuple]:
+        """Return the cache key part describing how an image is rewritten."""
+        if not self.active:
+            return None
+        return resolution or DEFAULT_RESOLUTION, self.quality
+
+    def process(self, data: bytes, resolution: Optional[str] = None) -> Tuple[bytes, str]:
+        """Prepare image bytes for upload.
+
+        Args:
+            data: Raw image file content
+            resolution: Output resolution the image is used for
+
+        Returns:
+            The bytes to upload and their MIME type
+        """
+        mime = detect_image_mime(data)
+        if not self.active:
+            return data, mime
+
+        try:
+            output, output_mime = self._rewrite(data, mime, resolution or DEFAULT_RESOLUTION)
+        except Exception as e:
+            logger.warning(f"Image preprocessing skipped: {str(e)}")
+            return data, mime
+
+        if output is None or len(output) >= len(data):
+            output, output_mime = data, mime
+        with self._lock:
+            self.processed += 1
+            self.bytes_in += len(data)
+            self.bytes_out += len(output)
+        metrics.image_preprocessed.inc()
+        metrics.image_preprocess_bytes.inc(len(data), stage="input")
+        metrics.image_preprocess_bytes.inc(len(output), stage="output")
+        if len(output) < len(data):
+            logger.info(f"Image preprocessing saved {len(data) - len(output)} bytes ({len(data)} -> {len(output)})")
+
+        return output, output_mime
+
+    def stats(self) -> dict:
+        """Return how many images were processed and how many bytes were saved."""
+        with self._lock:
+            return {
+                "processed": self.processed,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "bytes_saved": self.bytes_in - self.bytes_out,
+            }
+
+    def _rewrite(self, data: bytes, mime: str, resolution: str) -> Tuple[Optional[bytes], str]:
+        long_edge, short_edge = RESOLUTION_BOUNDS.get(resolution, RESOLUTION_BOUNDS[DEFAULT_RESOLUTION])
+        with Image.open(io.BytesIO(data)) as img:
+            has_alpha = img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+            # phone photos are stored sideways with an orientation tag, which a re-encoded image loses
+            img = ImageOps.exif_transpose(img)
+            width, height = img.size
+            bound_w, bound_h = (long_edge, short_edge) if width >= height else (short_edge, long_edge)
+            scale = min(bound_w / width, bound_h / height, 1.0)
+            lossless = mime in ("image/png", "image/bmp", "image/gif")
+
+            # already small and compactly encoded, nothing to gain
+            if scale == 1.0 and not (lossless and not has_alpha):
+                return None, mime
+
+            if scale < 1.0:
+                img = img.resize((max(1, round(width * scale)), max(1, round(height * scale))), Image.LANCZOS)
+
+            buffer = io.BytesIO()
+            if has_alpha:
+                img.save(buffer, format="PNG", optimize=True)
+                return buffer.getvalue(), "image/png"
+            img.convert("RGB").save(buffer, format="JPEG", quality=self.quality, optimize=True)
+            return buffer.getvalue(), "image/jpeg"
@@ -0,0 +1,339 @@
+"""Append-only journal of submitted tasks."""
+import asyncio
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from vidu_mcp.const import TERMINAL_STATES
+
+try:
+    import fcntl
+except ImportError:  # Windows, a single server process per journal is assumed there
+    fcntl = None
+
+logger = logging.getLogger("vidu-mcp")
+
+# States written by the journal itself, on top of the upstream task states
+SUBMITTED = "submitted"
+ERROR = "error"
+
+_instance_id: Optional[str] = None
+
+
+def instance_id() -> str:
+    """Return the id of this server process, unique even when a later process gets the same PID."""
+    global _instance_id
+    # a forked child is another instance
+    if _instance_id is None or not _instance_id.startswith(f"{os.getpid()}-"):
+        _instance_id = f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
+    return _instance_id
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def owner_alive(owner: Any) -> bool:
+    """Whether the server process that owns an unfinished task is still running.
+
+    Args:
+        owner: An instance_id(), or the bare PID written by older versions, None if unknown
+    """
+    if owner is None:
+        return False
+    if owner == instance_id():
+        return True
+    try:
+        pid = int(str(owner).split("-", 1)[0])
+    except ValueError:
+        return False
+    if pid == os.getpid():
+        # an earlier process that ran under the same PID, as PID 1 in a restarted container
+        return False
+    return _pid_alive(pid)
+
+
+def _unfinished(entry: Dict[str, Any]) -> bool:
+    return entry["state"] not in TERMINAL_STATES and entry["state"] != ERROR
+
+
+def _read(path: str) -> Tuple[Dict[str, Dict[str, Any]], int, bool]:
+    # latest entry per task, number of lines, and whether a line is torn
+    entries: Dict[str, Dict[str, Any]] = {}
+    lines = 0
+    torn = False
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            lines += 1
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # a crash may leave the last line half written, compaction drops it
+                torn = True
+                continue
+            torn = not line.endswith("\n")
+            entries[entry["task_id"]] = entry
+    return entries, lines, torn
+
+
+def has_unfinished(path: str) -> bool:
+    """Cheaply check whether a journal file holds unfinished tasks no running process polls."""
+    if not os.path.exists(path):
+        return False
+    entries, _, _ = _read(path)
+    return any(_unfinished(entry) and not owner_alive(entry.get("owner")) for entry in entries.values())
+
+
+class TaskJournal:
+    """Record every submitted task in an append-only JSON lines file.
+
+    Each change of a task appends one line, the latest line of a task wins.
+    An in-memory index gives lookups by task_id, and the file is compacted
+    to one line per task once it holds too many superseded lines. Tasks that
+    are neither finished nor failed can be resumed after a restart.
+
+    Every stdio session runs its own server process on the same journal.
+    Unfinished tasks belong to the process that submitted them and are only
+    resumed by another process once their owner has exited. Appends hold a
+    shared lock and compaction an exclusive one, and compaction merges the
+    lines every process wrote, so no process drops the tasks of another.
+
+    The in-memory index is updated at once, while the file is written on a
+    thread of the journal, in order, so waiting for the lock of another
+    process or for the fsync of a compaction does not block the event loop.
+    """
+
+    def __init__(self, path: Optional[str], retention: float = 7 * 24 * 3600):
+        """Initialize the journal and load existing entries.
+
+        Args:
+            path: Journal file, None disables the journal
+            retention: Seconds finished tasks are kept when compacting
+        """
+        self.path = path
+        self.retention = retention
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lines = 0
+        self._torn = False
+        self._file = None
+        self._lock_file = None
+        # guards the index, the file is only written on the journal thread
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vidu-task-journal")
+        if path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                self._lock_file = open(f"{path}.lock", "a")
+                with self._file_lock(exclusive=True):
+                    if os.path.exists(path):
+                        self._entries, self._lines, self._torn = _read(path)
+                    self._file = open(path, "a", encoding="utf-8")
+                if self._torn or self._lines > 2 * len(self._entries):
+                    self._executor.submit(self._compact)
+            except OSError as e:
+                logger.warning(f"Task journal disabled, cannot open {path}: {str(e)}")
+                self.path = None
+                self._file = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether entries are persisted."""
+        return self._file is not None
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Return the latest entry of a task."""
+        with self._lock:
+            entry = self._entries.get(task_id)
+            return dict(entry) if entry else None
+
+    async def get_async(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Return the latest entry of a task, as the task store does without blocking."""
+        return self.get(task_id)
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Return the most recently updated entries, newest first."""
+        with self._lock:
+            entries = heapq.nlargest(limit, self._entries.values(), key=lambda entry: entry["updated_at"])
+            return [dict(entry) for entry in entries]
+
+    async def recent_async(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Return the most recently updated entries, as the task store does without blocking."""
+        return self.recent(limit)
+
+    def unfinished(self) -> List[Dict[str, Any]]:
+        """Claim and return unfinished tasks whose owning process has exited."""
+        return self._executor.submit(self._claim_unfinished).result()
+
+    async def unfinished_async(self) -> List[Dict[str, Any]]:
+        """Claim and return unfinished tasks of exited processes without blocking the event loop."""
+        return await asyncio.wrap_future(self._executor.submit(self._claim_unfinished))
+
+    def record_submitted(
+            self,
+            task_id: str,
+            endpoint: str,
+            payload_hash: str,
+            model: Optional[str] = None,
+            resolution: Optional[str] = None,
+            key_id: Optional[str] = None,
+            callback_nonce: Optional[str] = None,
+    ) -> None:
+        """Record a newly submitted task, owned by this process."""
+        now = time.time()
+        self._append({
+            "task_id": task_id,
+            "endpoint": endpoint,
+            "payload_hash": payload_hash,
+            "model": model,
+            "resolution": resolution,
+            "key_id": key_id,
+            "callback_nonce": callback_nonce,
+            "state": SUBMITTED,
+            "owner": instance_id(),
+            "created_at": now,
+            "updated_at": now,
+        })
+
+    def record(self, task_id: str, status_response: Optional[Dict[str, Any]], exception: Optional[Exception]) -> None:
+        """Tracker listener: record the final state of a task."""
+        with self._lock:
+            entry = self._entries.get(task_id)
+        # a final state never changes
+        if entry is None or entry["state"] in TERMINAL_STATES:
+            return
+
+        entry = dict(entry, updated_at=time.time())
+        if exception is not None:
+            entry.update(state=ERROR, error=str(exception))
+        else:
+            entry["state"] = status_response.get("state")
+            if entry["state"] == "success":
+                entry["video_url"] = (status_response.get("creations") or [{}])[0].get("url")
+            elif entry["state"] == "failed":
+                entry["err_code"] = status_response.get("err_code")
+        self._append(entry)
+
+    def compact(self) -> None:
+        """Rewrite the file with the latest entry of every retained task."""
+        if not self.enabled:
+            return
+        self._executor.submit(self._compact).result()
+
+    def flush(self) -> None:
+        """Wait until every queued line is written."""
+        self._executor.submit(lambda: None).result()
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool) -> Iterator[None]:
+        # coordinates the server processes sharing the journal; the data file is replaced on compaction, the lock file is not
+        if fcntl is None or self._lock_file is None:
+            yield
+            return
+        fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[entry["task_id"]] = entry
+        self._executor.submit(self._persist, entry)
+
+    def _persist(self, entry: Dict[str, Any]) -> None:
+        try:
+            with self._file_lock(exclusive=False):
+                self._write(entry)
+            if self._lines > max(1000, 2 * len(self._entries)):
+                self._compact()
+        except OSError as e:
+            # the task itself is tracked in memory, only its resumption after a restart is lost
+            logger.error(f"Cannot write task {entry['task_id']} to the task journal: {str(e)}")
+
+    def _claim_unfinished(self) -> List[Dict[str, Any]]:
+        if not self.enabled:
+            return []
+        claimed = []
+        with self._file_lock(exclusive=True):
+            # other processes appended since this one loaded the file
+            entries, _, _ = _read(self.path)
+            self._merge(entries)
+            for entry in entries.values():
+                if _unfinished(entry) and not owner_alive(entry.get("owner")):
+                    entry = dict(entry, owner=instance_id())
+                    with self._lock:
+                        self._entries[entry["task_id"]] = entry
+                    self._write(entry)
+                    claimed.append(dict(entry))
+        return claimed
+
+    def _merge(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        # entries read from the file, an entry of this process may be newer than its line
+        with self._lock:
+            for task_id, entry in entries.items():
+                current = self._entries.get(task_id)
+                if current is None or entry["updated_at"] >= current["updated_at"]:
+                    self._entries[task_id] = entry
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        # runs on the journal thread, with the file lock held
+        if os.fstat(self._file.fileno()).st_ino != self._inode():
+            # another process compacted the file, keep writing to the new one
+            self._file.close()
+            self._file = open(self.path, "a", encoding="utf-8")
+        # one write per line, so lines of concurrent processes do not interleave
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._lines += 1
+
+    def _inode(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return None
+
+    def _compact(self) -> None:
+        # runs on the journal thread
+        try:
+            with self._file_lock(exclusive=True):
+                # the file holds the lines of every process, this process only knows its own
+                entries, _, _ = _read(self.path) if os.path.exists(self.path) else ({}, 0, False)
+                self._merge(entries)
+                cutoff = time.time() - self.retention
+                with self._lock:
+                    self._entries = {
+                        task_id: entry for task_id, entry in self._entries.items()
+                        if entry["updated_at"] >= cutoff or _unfinished(entry)
+                    }
+                    retained = list(self._entries.values())
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    for entry in retained:
+                        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                if self._file is not None:
+                    self._file.close()
+                os.replace(tmp_path, self.path)
+                self._file = open(self.path, "a", encoding="utf-8")
+                self._lines = len(retained)
+                self._torn = False
+        except OSError as e:
+            logger.error(f"Cannot compact the task journal: {str(e)}")
@@ -0,0 +1,375 @@
+"""In-process metrics and optional tracing for Vidu API calls and tasks.
+
+Metrics are kept in a small registry and rendered in the OpenMetrics text
+format. When the optional ``opentelemetry-api`` package is installed, every
+API call also opens a span; otherwise tracing costs nothing.
+"""
+import math
+import re
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+REQUEST_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+GENERATION_BUCKETS = (10.0, 20.0, 30.0, 45.0, 60.0, 90.0, 120.0, 180.0, 300.0, 600.0, 1200.0, 3600.0)
+
+_TASK_PATH = re.compile(r"^/ent/v2/tasks/[^/]+/")
+
+
+def endpoint_label(endpoint: str) -> str:
+    """Return the endpoint path with task ids replaced, to bound label cardinality."""
+    return _TASK_PATH.sub("/ent/v2/tasks/{task_id}/", endpoint)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...], *extra: Tuple[str, str]) -> str:
+        return _format_labels(list(zip(self.labelnames, key)) + list(extra))
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [
+            f"# TYPE {self.name} {self.type}",
+            f"# HELP {self.name} {self.documentation}",
+            *self.samples(),
+        ]
+
+
+class Counter(_Metric):
+    """Monotonic counter, optionally carrying an exemplar per series."""
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._exemplars: Dict[Tuple[str, ...], Dict[str, str]] = {}
+
+    def inc(self, amount: float = 1.0, exemplar: Optional[Dict[str, str]] = None, **labels: str) -> None:
+        """Increase the series selected by ``labels``.
+
+        Args:
+            amount: Value to add
+            exemplar: Labels linking this increment to a trace, e.g. the upstream trace_id
+            **labels: Label values of the series
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+            if exemplar:
+                self._exemplars[key] = exemplar
+
+    def value(self, **labels: str) -> float:
+        """Return the current value of a series."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            lines = []
+            for key, value in sorted(self._values.items()):
+                line = f"{self.name}_total{self._labels(key)} {_format_value(value)}"
+                exemplar = self._exemplars.get(key)
+                if exemplar:
+                    line += f" # {_format_labels(list(exemplar.items()))} 1"
+                lines.append(line)
+            return lines
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Increase the series selected by ``labels``."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        """Decrease the series selected by ``labels``."""
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set the series selected by ``labels``."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels: str) -> float:
+        """Return the current value of a series."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            if not self._values and not self.labelnames:
+                return [f"{self.name} 0"]
+            return [f"{self.name}{self._labels(key)} {_format_value(value)}" for key, value in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed buckets."""
+    type = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+            buckets: Sequence[float] = REQUEST_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation in the series selected by ``labels``."""
+        key = self._key(labels)
+        with self._lock:
+            # per series: one count per bucket, then count and sum
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            lines = []
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{self._labels(key, ('le', _format_value(bound)))} {_format_value(count)}")
+                lines.append(f"{self.name}_count{self._labels(key)} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_sum{self._labels(key)} {_format_value(series[-1])}")
+            return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Create and register a counter."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Create and register a gauge."""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+            buckets: Sequence[float] = REQUEST_BUCKETS,
+    ) -> Histogram:
+        """Create and register a histogram."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Return all metrics in the OpenMetrics text format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+api_requests = registry.counter(
+    "vidu_api_requests", "HTTP responses received from the Vidu API, retries included",
+    ("endpoint", "method", "status"),
+)
+api_request_duration = registry.histogram(
+    "vidu_api_request_duration_seconds", "Latency of single HTTP requests to the Vidu API",
+    ("endpoint", "method"),
+)
+api_errors = registry.counter(
+    "vidu_api_errors", "API calls that failed after retries, by exception type",
+    ("endpoint", "method", "error_type"),
+)
+tasks_in_flight = registry.gauge(
+    "vidu_tasks_in_flight", "Submitted tasks that have not reached a final state",
+)
+task_generation_time = registry.histogram(
+    "vidu_task_generation_seconds", "Time from submit to final state of a task",
+    ("model", "resolution", "state"), buckets=GENERATION_BUCKETS,
+)
+pool_tasks_in_flight = registry.gauge(
+    "vidu_pool_tasks_in_flight", "Tasks in flight per API key of the pool",
+    ("key_id",),
+)
+pool_failovers = registry.counter(
+    "vidu_pool_failovers", "Submits moved to another API key, by the reason the key failed",
+    ("key_id", "reason"),
+)
+submit_in_flight = registry.gauge(
+    "vidu_submit_in_flight", "Tasks holding a slot of the submission scheduler",
+)
+submit_queue_depth = registry.gauge(
+    "vidu_submit_queue_depth", "Submits waiting for a free slot, by priority",
+    ("priority",),
+)
+submit_queue_wait = registry.histogram(
+    "vidu_submit_queue_wait_seconds", "Time a submit waited for a free slot",
+    ("priority",), buckets=(0.01, 0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0),
+)
+pool_key_disabled = registry.gauge(
+    "vidu_pool_key_disabled", "Whether an API key of the pool was rejected by the API and is no longer used",
+    ("key_id",),
+)
+pool_key_cooldown_until = registry.gauge(
+    "vidu_pool_key_cooldown_until_seconds", "Unix time until which a throttled or exhausted API key is skipped",
+    ("key_id",),
+)
+submit_max_in_flight = registry.gauge(
+    "vidu_submit_max_in_flight", "Slots of the submission scheduler, 0 for unlimited",
+)
+circuit_state = registry.gauge(
+    "vidu_circuit_state", "State of the circuit breaker per API key and request class, 0 closed, 1 half-open, 2 open",
+    ("key_id", "path"),
+)
+circuit_opened = registry.counter(
+    "vidu_circuit_opened", "Times a circuit breaker opened, by what opened it",
+    ("key_id", "path", "reason"),
+)
+circuit_rejected = registry.counter(
+    "vidu_circuit_rejected", "Requests rejected locally by an open circuit breaker",
+    ("key_id", "path"),
+)
+api_throttled = registry.counter(
+    "vidu_api_throttled", "Requests delayed by the local rate limiter, by request class",
+    ("path",),
+)
+api_rate_limited = registry.counter(
+    "vidu_api_rate_limited", "Responses with status 429 from the API, by request class",
+    ("path",),
+)
+api_retries = registry.counter(
+    "vidu_api_retries", "Retry attempts of API requests, by request class",
+    ("path",),
+)
+image_cache_lookups = registry.counter(
+    "vidu_image_cache_lookups", "Local image encodings, by whether the image cache answered them",
+    ("outcome",),
+)
+image_cache_bytes = registry.gauge(
+    "vidu_image_cache_bytes", "Size of the data-URLs held by the image cache",
+)
+image_preprocessed = registry.counter(
+    "vidu_image_preprocessed", "Images passed through the preprocessor",
+)
+image_preprocess_bytes = registry.counter(
+    "vidu_image_preprocess_bytes", "Image bytes before and after preprocessing, the difference is the upload saved",
+    ("stage",),
+)
+status_cache_lookups = registry.counter(
+    "vidu_status_cache_lookups", "Task status lookups, by whether the cache answered them",
+    ("outcome",),
+)
+callbacks_received = registry.counter(
+    "vidu_callbacks_received", "Task callbacks received, by whether they were accepted",
+    ("outcome",),
+)
+
+_tracer = None
+_tracer_loaded = False
+
+
+def _get_tracer():
+    global _tracer, _tracer_loaded
+    if not _tracer_loaded:
+        try:
+            from opentelemetry import trace
+            _tracer = trace.get_tracer("vidu-mcp")
+        except ImportError:
+            _tracer = None
+        _tracer_loaded = True
+    return _tracer
+
+
+def observe_response(method: str, endpoint: str, status_code: int, seconds: float) -> None:
+    """Record one HTTP response of an API call."""
+    label = endpoint_label(endpoint)
+    api_requests.inc(endpoint=label, method=method, status=str(status_code))
+    api_request_duration.observe(seconds, endpoint=label, method=method)
+    if _get_tracer() is not None:
+        from opentelemetry import trace
+        trace.get_current_span().set_attribute("http.response.status_code", status_code)
+
+
+@contextmanager
+def track_call(method: str, endpoint: str) -> Iterator[None]:
+    """Count failures of an API call and wrap it in a span when tracing is available.
+
+    The upstream trace_id of a failed call, if any, is attached to the span
+    and kept as exemplar of the error counter, so a spike in the metrics can
+    be correlated with the requests the Vidu API logged.
+    """
+    label = endpoint_label(endpoint)
+    tracer = _get_tracer()
+    span_context = tracer.start_as_current_span(
+        f"vidu {method} {label}",
+        attributes={"http.request.method": method, "url.path": endpoint},
+    ) if tracer is not None else nullcontext()
+    with span_context as span:
+        try:
+            yield
+        except Exception as e:
+            trace_id = getattr(e, "trace_id", None)
+            api_errors.inc(
+                exemplar={"trace_id": trace_id} if trace_id else None,
+                endpoint=label, method=method, error_type=type(e).__name__,
+            )
+            if span is not None and trace_id:
+                span.set_attribute("vidu.trace_id", trace_id)
+            raise
+
+
+def observe_task(model: Optional[str], resolution: Optional[str], state: str, seconds: float) -> None:
+    """Record the end-to-end generation time of a finished task."""
+    task_generation_time.observe(seconds, model=model or "unknown", resolution=resolution or "unknown", state=state)
@@ -0,0 +1,277 @@
+"""Pool of Vidu API keys and hosts with load-aware routing and failover."""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from vidu_mcp import metrics
+from vidu_mcp.exceptions import (
+    ViduAuthError,
+    ViduCircuitOpenError,
+    ViduConnectionError,
+    ViduRateLimitError,
+    ViduRequestError,
+)
+
+logger = logging.getLogger("vidu-mcp")
+
+_QUOTA_CODES = (402, 403)
+_QUOTA_WORDS = ("quota", "credit", "insufficient")
+
+
+def key_id_for(api_key: str) -> str:
+    """Return a stable identifier of an API key that is safe to log and persist."""
+    return "key-" + hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:8]
+
+
+def load_pool_config(value: str) -> List[Dict[str, Any]]:
+    """Parse the pool configuration, given as JSON or as the path of a JSON file.
+
+    The configuration is a list of objects with ``key`` and ``host`` and the
+    optional ``id``, ``max_in_flight``, ``submit_rate`` and ``status_rate``.
+
+    Raises:
+        ValueError: If the configuration is malformed
+    """
+    text = value
+    if not value.lstrip().startswith("["):
+        with open(value, encoding="utf-8") as f:
+            text = f.read()
+    entries = json.loads(text)
+    if not isinstance(entries, list) or not entries:
+        raise ValueError("VIDU_API_POOL must be a non-empty JSON list")
+    for entry in entries:
+        if not isinstance(entry, dict) or not entry.get("key") or not entry.get("host"):
+            raise ValueError("Every VIDU_API_POOL entry requires a key and a host")
+    return entries
+
+
+def _is_quota_error(e: ViduRequestError) -> bool:
+    return e.code in _QUOTA_CODES or any(word in str(e).lower() for word in _QUOTA_WORDS)
+
+
+@dataclass
+class PoolMember:
+    """One API key and host of the pool."""
+    key_id: str
+    client: Any
+    max_in_flight: int = 0
+    in_flight: int = 0
+    cooldown_until: float = 0.0
+    disabled: bool = False
+
+    def available(self, now: float) -> bool:
+        """Whether the member can take a new task right now."""
+        return (
+            not self.disabled
+            and self.cooldown_until <= now
+            and (self.max_in_flight <= 0 or self.in_flight < self.max_in_flight)
+        )
+
+
+class ClientPool:
+    """Route requests over several API clients, one per key and host.
+
+    New tasks go to the usable member with the fewest tasks in flight, where
+    a task counts until the tracker sees it finish. Members with a
+    concurrency limit take no more tasks once full, and submits wait until a
+    slot frees up. A submit that fails because of its key, such as an auth
+    error, an exhausted quota, throttling, an unreachable host or an open
+    circuit breaker, is sent to the next member; any other error is returned
+    as is, since the task may already exist. Status requests always use the
+    key that submitted the task.
+    """
+
+    def __init__(
+            self,
+            members: List[PoolMember],
+            cooldown: float = 30.0,
+            quota_cooldown: float = 600.0,
+    ):
+        """Initialize the pool.
+
+        Args:
+            members: Keys and their clients, in order of preference on ties
+            cooldown: Seconds a throttled member is skipped
+            quota_cooldown: Seconds a member with an exhausted quota is skipped
+
+        Raises:
+            ValueError: If the pool is empty or key ids are not unique
+        """
+        if not members:
+            raise ValueError("The API pool needs at least one key")
+        if len({member.key_id for member in members}) != len(members):
+            raise ValueError("API pool key ids must be unique")
+        self.members = members
+        self.cooldown = cooldown
+        self.quota_cooldown = quota_cooldown
+        self._by_id = {member.key_id: member for member in members}
+        self._tasks: Dict[str, PoolMember] = {}
+        self._wakeup = asyncio.Event()
+        for member in members:
+            metrics.pool_key_disabled.set(int(member.disabled), key_id=member.key_id)
+
+    def member(self, key_id: str) -> PoolMember:
+        """Return the member with the given key id.
+
+        Raises:
+            ViduAuthError: If no configured key has this id
+        """
+        member = self._by_id.get(key_id)
+        if member is None:
+            raise ViduAuthError(f"API key {key_id} is not configured, cannot access its tasks")
+        return member
+
+    def key_for(self, task_id: str) -> Optional[str]:
+        """Return the id of the key that submitted an in-flight task."""
+        member = self._tasks.get(task_id)
+        return member.key_id if member else None
+
+    async def submit(self, endpoint: str, **kwargs) -> Tuple[Dict[str, Any], str]:
+        """Submit a generation request, failing over between keys.
+
+        Args:
+            endpoint: API endpoint path
+            **kwargs: Additional arguments to pass to the client
+
+        Returns:
+            The API response data and the id of the key that accepted it
+
+        Raises:
+            ViduAPIError: The last error if no key accepted the request
+        """
+        tried: Set[str] = set()
+        last_error: Optional[Exception] = None
+        while True:
+            member = await self._acquire(tried, last_error)
+            try:
+                data = await member.client.post(endpoint, **kwargs)
+            except ViduAuthError as e:
+                member.disabled = True
+                metrics.pool_key_disabled.set(1, key_id=member.key_id)
+                self._failover(member, "auth", e, tried)
+                last_error = e
+                continue
+            except ViduRateLimitError as e:
+                self._cool_down(member, e.retry_after or self.cooldown)
+                self._failover(member, "throttled", e, tried)
+                last_error = e
+                continue
+            except ViduConnectionError as e:
+                # no cooldown, the circuit breaker of the key fails fast while its host is down,
+                # so a submit is never held back waiting for a dead host
+                self._failover(member, "circuit_open" if isinstance(e, ViduCircuitOpenError) else "unreachable", e, tried)
+                last_error = e
+                continue
+            except ViduRequestError as e:
+                if not _is_quota_error(e):
+                    self._release_slot(member)
+                    raise
+                self._cool_down(member, self.quota_cooldown)
+                self._failover(member, "quota", e, tried)
+                last_error = e
+                continue
+            except BaseException:
+                self._release_slot(member)
+                raise
+
+            task_id = data.get("task_id")
+            if task_id:
+                self._tasks[task_id] = member
+            else:
+                self._release_slot(member)
+            return data, member.key_id
+
+    async def get(self, endpoint: str, key_id: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """Make a GET request with the given key, or the least busy one.
+
+        Raises:
+            ViduAuthError: If key_id is not configured
+        """
+        if key_id is not None:
+            member = self.member(key_id)
+        else:
+            usable = [member for member in self.members if not member.disabled] or self.members
+            member = min(usable, key=lambda member: member.in_flight)
+        return await member.client.get(endpoint, **kwargs)
+
+    def adopt(self, task_id: str, key_id: Optional[str]) -> None:
+        """Count an already submitted task, e.g. one resumed from the journal."""
+        member = self._by_id.get(key_id) if key_id else None
+        if member is None or task_id in self._tasks:
+            return
+        member.in_flight += 1
+        self._tasks[task_id] = member
+        self._update_gauge(member)
+
+    def release(self, task_id: str, status_response: Optional[Dict[str, Any]], exception: Optional[Exception]) -> None:
+        """Tracker listener: free the slot of a finished task."""
+        member = self._tasks.pop(task_id, None)
+        if member is not None:
+            self._release_slot(member)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Return the state of every member."""
+        now = time.monotonic()
+        return [
+            {
+                "key_id": member.key_id,
+                "in_flight": member.in_flight,
+                "max_in_flight": member.max_in_flight,
+                "disabled": member.disabled,
+                "cooldown": max(member.cooldown_until - now, 0.0),
+            }
+            for member in self.members
+        ]
+
+    async def aclose(self) -> None:
+        """Close the pooled connections of every client."""
+        for member in self.members:
+            await member.client.aclose()
+
+    async def _acquire(self, tried: Set[str], last_error: Optional[Exception]) -> PoolMember:
+        while True:
+            candidates = [member for member in self.members if member.key_id not in tried and not member.disabled]
+            if not candidates:
+                raise last_error or ViduAuthError("No usable API key in the pool")
+
+            now = time.monotonic()
+            available = [member for member in candidates if member.available(now)]
+            if available:
+                member = min(available, key=lambda member: member.in_flight)
+                member.in_flight += 1
+                self._update_gauge(member)
+                return member
+
+            # wait for a finished task, or for the first cooldown to end
+            cooling = [member.cooldown_until - now for member in candidates if member.cooldown_until > now]
+            wakeup = self._wakeup
+            try:
+                await asyncio.wait_for(wakeup.wait(), min(cooling) if cooling else None)
+            except asyncio.TimeoutError:
+                pass
+
+    def _failover(self, member: PoolMember, reason: str, e: Exception, tried: Set[str]) -> None:
+        self._release_slot(member)
+        tried.add(member.key_id)
+        metrics.pool_failovers.inc(key_id=member.key_id, reason=reason)
+        logger.warning(f"API key {member.key_id} failed ({reason}), trying the next key: {str(e)}")
+
+    def _release_slot(self, member: PoolMember) -> None:
+        member.in_flight = max(member.in_flight - 1, 0)
+        self._update_gauge(member)
+        # wake every waiting submit, each checks again for a free member
+        wakeup, self._wakeup = self._wakeup, asyncio.Event()
+        wakeup.set()
+
+    @staticmethod
+    def _cool_down(member: PoolMember, seconds: float) -> None:
+        member.cooldown_until = time.monotonic() + seconds
+        metrics.pool_key_cooldown_until.set(time.time() + seconds, key_id=member.key_id)
+
+    @staticmethod
+    def _update_gauge(member: PoolMember) -> None:
+        metrics.pool_tasks_in_flight.set(member.in_flight, key_id=member.key_id)
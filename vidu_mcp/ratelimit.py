@@ -0,0 +1,140 @@
+"""Client-side rate limiting and retry policy for Vidu API requests."""
+import email.utils
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from vidu_mcp import metrics
+
+# Endpoint classes with separate rate limits
+SUBMIT = "submit"
+STATUS = "status"
+
+RETRIABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def endpoint_class(method: str) -> str:
+    """Return the rate limit class of a request: generation submits are POSTs."""
+    return SUBMIT if method.upper() == "POST" else STATUS
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date.
+
+    Args:
+        value: Raw header value
+
+    Returns:
+        Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+class TokenBucket:
+    """Thread-safe token bucket.
+
+    Callers reserve a token and are told how long to wait for it, which lets
+    the same bucket serve blocking and async code. A rate of 0 disables
+    limiting.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """Initialize the bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size, defaults to one second worth of tokens
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return the seconds to wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """Withhold tokens for a while, e.g. after the server asked to back off."""
+        if self.rate <= 0 or seconds <= 0:
+            return
+        with self._lock:
+            self._tokens = min(self._tokens, -seconds * self.rate)
+            self._updated_at = time.monotonic()
+
+
+@dataclass
+class RetryPolicy:
+    """Bounded exponential backoff with jitter."""
+    max_retries: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 30.0
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Return the seconds to wait before retry number ``attempt`` (0-based)."""
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        return min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+class RequestStats:
+    """Counters of throttled and retried requests, also exported as metrics."""
+
+    _METRICS = {
+        "throttled": metrics.api_throttled,
+        "rate_limited": metrics.api_rate_limited,
+        "retried": metrics.api_retries,
+    }
+
+    def __init__(self):
+        self.throttled = 0
+        self.rate_limited = 0
+        self.retried = 0
+        self._lock = threading.Lock()
+
+    def add(self, name: str, count: int = 1, path: str = STATUS) -> None:
+        """Increment a counter.
+
+        Args:
+            name: throttled, rate_limited or retried
+            count: Value to add
+            path: Request class, submit or status
+        """
+        with self._lock:
+            setattr(self, name, getattr(self, name) + count)
+        self._METRICS[name].inc(count, path=path)
+
+    def snapshot(self) -> dict:
+        """Return the current counter values.
+
+        throttled counts requests delayed by the local limiter, rate_limited
+        counts 429 responses from the API and retried counts retry attempts.
+        """
+        with self._lock:
+            return {
+                "throttled": self.throttled,
+                "rate_limited": self.rate_limited,
+                "retried": self.retried,
+            }
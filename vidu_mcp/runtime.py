@@ -0,0 +1,199 @@
+"""Process-wide state of the Vidu MCP server, built on first use.
+
+Nothing here is imported by ``vidu_mcp.server`` at module level, so the
+server can answer the MCP handshake before the HTTP clients, image
+libraries and local stores are loaded.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from vidu_mcp import util
+from vidu_mcp.breaker import CircuitBreaker
+from vidu_mcp.callbacks import CallbackReceiver
+from vidu_mcp.client import AsyncViduAPIClient
+from vidu_mcp.const import *
+from vidu_mcp.dedup import RequestDeduplicator
+from vidu_mcp.download import VideoDownloader
+from vidu_mcp.journal import TaskJournal
+from vidu_mcp.pool import ClientPool, PoolMember, key_id_for, load_pool_config
+from vidu_mcp.ratelimit import STATUS, SUBMIT, RetryPolicy
+from vidu_mcp.scheduler import SubmissionScheduler
+from vidu_mcp.status import TaskStatusCache
+from vidu_mcp.store import TaskStore
+from vidu_mcp.tracker import TaskTracker
+
+logger = logging.getLogger("vidu-mcp")
+
+
+def _env_flag(name: str, default: str = "") -> bool:
+    return (os.getenv(name) or default).lower() in ("1", "true", "yes")
+
+
+def default_journal_path() -> str:
+    """Return the task journal location, honoring VIDU_JOURNAL_PATH."""
+    return os.getenv(ENV_VIDU_JOURNAL_PATH) or os.path.join(os.path.expanduser("~"), ".cache", "vidu-mcp", "tasks.jsonl")
+
+
+class Runtime:
+    """API client, task tracker and local stores shared by all tool calls."""
+
+    def __init__(self):
+        """Read the configuration from the environment and build the components.
+
+        Raises:
+            ValueError: If neither VIDU_API_POOL nor VIDU_API_KEY and VIDU_API_HOST are set,
+                        or the pool configuration is invalid
+        """
+        load_dotenv()
+        pool_config = os.getenv(ENV_VIDU_API_POOL)
+        if pool_config:
+            entries = load_pool_config(pool_config)
+        else:
+            api_key = ENV_VIDU_API_KEY
+            if api_key is None:
+                api_key = os.environ.get("VIDU_API_KEY")
+            api_host = ENV_VIDU_API_HOST
+            if api_host is None:
+                api_host = os.environ.get("VIDU_API_HOST")
+
+            if not api_key:
+                raise ValueError("VIDU_API_KEY environment variable is required")
+            if not api_host:
+                raise ValueError("VIDU_API_HOST environment variable is required")
+            entries = [{"key": api_key, "host": api_host}]
+
+        util.image_cache.max_bytes = int(os.getenv(ENV_VIDU_IMAGE_CACHE_BYTES) or util.image_cache.max_bytes)
+        util.image_cache.hash_content = _env_flag(ENV_VIDU_IMAGE_CACHE_HASH)
+        util.image_workers = int(os.getenv(ENV_VIDU_IMAGE_WORKERS) or util.image_workers)
+        util.image_cache.preprocessor.enabled = _env_flag(ENV_VIDU_IMAGE_PREPROCESS)
+        util.image_cache.preprocessor.quality = int(os.getenv(ENV_VIDU_IMAGE_QUALITY) or util.image_cache.preprocessor.quality)
+        self.stream_images = _env_flag(ENV_VIDU_STREAM_IMAGES, "true")
+
+        max_in_flight = int(os.getenv(ENV_VIDU_MAX_IN_FLIGHT) or 0)
+        members = []
+        for entry in entries:
+            key_id = entry.get("id") or key_id_for(entry["key"])
+            members.append(PoolMember(
+                key_id=key_id,
+                client=self._build_client(entry, key_id),
+                max_in_flight=int(entry.get("max_in_flight", max_in_flight)),
+            ))
+        self.api_client = ClientPool(members)
+        self.task_tracker = TaskTracker(
+            self.api_client,
+            callback_interval=float(os.getenv(ENV_VIDU_CALLBACK_POLL_INTERVAL) or 120),
+        )
+        self.task_tracker.add_listener(self.api_client.release)
+        self.deduplicator = RequestDeduplicator(
+            enabled=_env_flag(ENV_VIDU_DEDUP),
+            db_path=os.getenv(ENV_VIDU_DEDUP_DB) or os.path.join(os.path.expanduser("~"), ".cache", "vidu-mcp", "results.sqlite3"),
+            ttl=float(os.getenv(ENV_VIDU_DEDUP_TTL) or 3600),
+        )
+        self.task_tracker.add_listener(self.deduplicator.record)
+        self.video_downloader = VideoDownloader()
+        # worker processes of one deployment share a SQLite store instead of the journal file
+        store_path = os.getenv(ENV_VIDU_TASK_STORE)
+        self.task_journal = TaskStore(store_path) if store_path else TaskJournal(default_journal_path())
+        self.task_tracker.add_listener(self.task_journal.record)
+        if isinstance(self.task_journal, TaskStore):
+            # a callback may reach another worker, which records it in the store
+            self.task_tracker.store = self.task_journal
+        # with a shared store the task limit holds across the worker processes, otherwise per process
+        self.scheduler = SubmissionScheduler(
+            int(os.getenv(ENV_VIDU_TOTAL_MAX_IN_FLIGHT) or 0),
+            shared=self.task_journal if isinstance(self.task_journal, TaskStore) else None,
+        )
+        self.task_tracker.add_listener(self.scheduler.release)
+        self.status_cache = TaskStatusCache(
+            self.api_client,
+            self.task_journal,
+            self.key_for,
+            ttl=float(os.getenv(ENV_VIDU_STATUS_CACHE_TTL) or 5),
+        )
+        self.task_tracker.add_update_listener(self.status_cache.update)
+        self.callback_receiver: Optional[CallbackReceiver] = None
+        callback_url = os.getenv(ENV_VIDU_CALLBACK_URL)
+        if callback_url:
+            self.callback_receiver = CallbackReceiver(
+                self.task_tracker,
+                self.task_journal,
+                callback_url,
+                secret=os.getenv(ENV_VIDU_CALLBACK_SECRET),
+                host=os.getenv(ENV_VIDU_CALLBACK_HOST) or "127.0.0.1",
+                port=int(os.getenv(ENV_VIDU_CALLBACK_PORT) or 8766),
+                # under `vidu-mcp serve` the callbacks are routed by the MCP HTTP app
+                embedded=os.getenv(ENV_VIDU_SERVE_TRANSPORT) is None,
+            )
+            self.task_tracker.add_listener(self.callback_receiver.forget)
+
+    @staticmethod
+    def _build_client(entry: dict, key_id: str) -> AsyncViduAPIClient:
+        # rate limits and circuit breakers apply per key, a pool entry may override the rates
+        breakers = {
+            path: CircuitBreaker(
+                key_id,
+                path,
+                failure_threshold=int(os.getenv(ENV_VIDU_BREAKER_FAILURES) or 5),
+                slow_call_threshold=float(os.getenv(ENV_VIDU_BREAKER_SLOW_CALL) or 30),
+                recovery_time=float(os.getenv(ENV_VIDU_BREAKER_RECOVERY) or 30),
+            )
+            for path in (SUBMIT, STATUS)
+        }
+        return AsyncViduAPIClient(
+            entry["key"],
+            entry["host"],
+            max_connections=int(os.getenv(ENV_VIDU_MAX_CONNECTIONS) or 100),
+            keep_alive=_env_flag(ENV_VIDU_KEEPALIVE, "true"),
+            connect_timeout=float(os.getenv(ENV_VIDU_CONNECT_TIMEOUT) or 10),
+            read_timeout=float(os.getenv(ENV_VIDU_READ_TIMEOUT) or 60),
+            http2=_env_flag(ENV_VIDU_HTTP2),
+            submit_rate=float(entry.get("submit_rate", os.getenv(ENV_VIDU_SUBMIT_RATE) or 0)),
+            status_rate=float(entry.get("status_rate", os.getenv(ENV_VIDU_STATUS_RATE) or 0)),
+            retry_policy=RetryPolicy(max_retries=int(os.getenv(ENV_VIDU_MAX_RETRIES) or 3)),
+            breakers=breakers,
+        )
+
+    async def key_for(self, task_id: str) -> Optional[str]:
+        """Return the id of the pool key that submitted a task, if known."""
+        key_id = self.api_client.key_for(task_id)
+        if key_id is None:
+            entry = await self.task_journal.get_async(task_id)
+            key_id = entry.get("key_id") if entry else None
+        return key_id
+
+    async def prepare_images(self, images: list[str], resolution: Optional[str] = None) -> list:
+        """Turn local image paths into data-URLs, or into files streamed on submit, off the event loop."""
+        return await util.del_input_images_async(images, resolution, self.stream_images)
+
+    async def resume_unfinished(self) -> int:
+        """Poll the unfinished tasks of the journal again, return how many."""
+        unfinished = await self.task_journal.unfinished_async()
+        for entry in unfinished:
+            # keep the original submit time, so task age and generation time stay correct
+            age = max(time.time() - entry["created_at"], 0.0)
+            self.api_client.adopt(entry["task_id"], entry.get("key_id"))
+            self.scheduler.adopt(entry["task_id"])
+            self.task_tracker.track(
+                entry["task_id"], entry.get("model"), entry.get("resolution"),
+                submitted_at=time.monotonic() - age, key_id=entry.get("key_id"),
+            )
+        return len(unfinished)
+
+
+_runtime: Optional[Runtime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime() -> Runtime:
+    """Return the shared runtime, building it on the first call."""
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                _runtime = Runtime()
+    return _runtime
@@ -0,0 +1,241 @@
+"""Submission scheduler capping the tasks in flight across the whole account."""
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from vidu_mcp import metrics
+from vidu_mcp.exceptions import ViduValidationError
+
+logger = logging.getLogger("vidu-mcp")
+
+# served strictly in this order
+PRIORITIES = ("high", "normal", "low")
+
+
+class SubmissionScheduler:
+    """Hold submits in a local queue while the account is at its task limit.
+
+    A slot is taken before a generation request is sent and kept until the
+    tracker sees the task finish, so at most ``max_in_flight`` tasks run
+    upstream at once and the API never has to reject one for concurrency.
+    Waiting submits are served by priority; within a priority, clients take
+    turns, so one client queueing many tasks cannot delay every other
+    client until its backlog is through.
+
+    Without ``shared`` the limit holds for this process only. With the task
+    store the worker processes of a deployment share, every slot is also
+    taken in the store, so the limit holds across all of them; submits
+    waiting for a slot another process holds check the store again every
+    ``poll_interval`` seconds. Slots are taken in the store off the event
+    loop, by one dispatcher at a time.
+    """
+
+    def __init__(self, max_in_flight: int = 0, shared=None, poll_interval: float = 1.0):
+        """Initialize the scheduler.
+
+        Args:
+            max_in_flight: Maximum unfinished tasks of the account, 0 for unlimited
+            shared: Task store whose slots are shared with other processes, None to only count local tasks
+            poll_interval: Seconds between checks of the shared store while submits wait
+        """
+        self.max_in_flight = max_in_flight
+        metrics.submit_max_in_flight.set(max_in_flight)
+        self.shared = shared if max_in_flight > 0 else None
+        self.poll_interval = poll_interval
+        self.in_flight = 0
+        # task_id -> slot id in the shared store, None without one
+        self._tasks: Dict[str, Optional[str]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._dispatch_again = False
+        # priority -> client -> waiting submits, in arrival order
+        self._queues: Dict[str, "OrderedDict[str, Deque[asyncio.Future]]"] = {
+            priority: OrderedDict() for priority in PRIORITIES
+        }
+
+    @property
+    def queued(self) -> int:
+        """Number of submits waiting for a slot."""
+        return sum(len(waiters) for queue in self._queues.values() for waiters in queue.values())
+
+    async def acquire(self, client: str, priority: str = "normal") -> Optional[str]:
+        """Wait for a free slot, then take it.
+
+        Args:
+            client: Identity of the caller, clients of one priority take turns
+            priority: One of PRIORITIES
+
+        Returns:
+            The slot id in the shared store, for bind or abort; None without a shared store
+
+        Raises:
+            ViduValidationError: If the priority is unknown
+        """
+        if priority not in PRIORITIES:
+            raise ViduValidationError(f"priority {priority} is not supported, accepted: {', '.join(PRIORITIES)}")
+
+        started = time.monotonic()
+        if self._has_capacity() and not self.queued:
+            granted, slot = await self._reserve()
+            if granted:
+                self._take()
+                metrics.submit_queue_wait.observe(0.0, priority=priority)
+                return slot
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues[priority].setdefault(client, deque()).append(future)
+        metrics.submit_queue_depth.inc(priority=priority)
+        if self.shared is not None:
+            self._check_later()
+        try:
+            slot = await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # the slot was granted as the caller gave up
+                self.abort(future.result())
+            else:
+                self._remove(priority, client, future)
+            raise
+        metrics.submit_queue_wait.observe(time.monotonic() - started, priority=priority)
+        return slot
+
+    def bind(self, task_id: str, slot: Optional[str] = None) -> None:
+        """Keep the slot taken by ``acquire`` until the task finishes."""
+        self._tasks[task_id] = slot
+        if slot is not None:
+            self.shared.bind_slot(slot, task_id)
+
+    def abort(self, slot: Optional[str] = None) -> None:
+        """Free the slot of a submit that created no task."""
+        if slot is not None:
+            self.shared.release_slot(slot)
+        self._free()
+
+    def adopt(self, task_id: str) -> None:
+        """Count an already submitted task, e.g. one resumed from the journal.
+
+        Its unfinished entry in the shared store already holds a slot there.
+        """
+        if task_id in self._tasks:
+            return
+        self._take()
+        self._tasks[task_id] = None
+
+    def release(self, task_id: str, status_response: Optional[Dict[str, Any]], exception: Optional[Exception]) -> None:
+        """Tracker listener: free the slot of a finished task."""
+        if task_id in self._tasks:
+            slot = self._tasks.pop(task_id)
+            if slot is not None:
+                self.shared.release_slot(slot)
+            self._free()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the usage and queue lengths."""
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "shared": self.shared is not None,
+            "queued": {
+                priority: sum(len(waiters) for waiters in queue.values()) for priority, queue in self._queues.items()
+            },
+        }
+
+    def _has_capacity(self) -> bool:
+        return self.max_in_flight <= 0 or self.in_flight < self.max_in_flight
+
+    def _take(self) -> None:
+        self.in_flight += 1
+        metrics.submit_in_flight.set(self.in_flight)
+
+    def _free(self) -> None:
+        self.in_flight = max(self.in_flight - 1, 0)
+        metrics.submit_in_flight.set(self.in_flight)
+        self._dispatch()
+
+    async def _reserve(self) -> Tuple[bool, Optional[str]]:
+        # whether a slot is free in the shared store too, and its id there
+        if self.shared is None:
+            return True, None
+        reserving = asyncio.ensure_future(self.shared.reserve_slot_async(self.max_in_flight))
+        try:
+            slot = await asyncio.shield(reserving)
+        except asyncio.CancelledError:
+            # the store may still take the slot, give it back then
+            reserving.add_done_callback(self._release_reserved)
+            raise
+        return slot is not None, slot
+
+    def _release_reserved(self, reserving: asyncio.Future) -> None:
+        if not reserving.cancelled() and reserving.exception() is None and reserving.result() is not None:
+            self.shared.release_slot(reserving.result())
+
+    def _check_later(self) -> None:
+        # another process may free a slot without this one noticing
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.poll_interval, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+        if self.queued:
+            self._check_later()
+
+    def _dispatch(self) -> None:
+        if self.shared is None:
+            while self.queued and self._has_capacity():
+                waiter = self._next_waiter()
+                if waiter is None:
+                    return
+                self._grant(waiter, None)
+            return
+        if self._dispatcher is not None and not self._dispatcher.done():
+            # a slot may have been freed after the running dispatcher found none
+            self._dispatch_again = True
+            return
+        self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch_shared())
+
+    async def _dispatch_shared(self) -> None:
+        self._dispatch_again = True
+        while self._dispatch_again:
+            self._dispatch_again = False
+            while self.queued and self._has_capacity():
+                granted, slot = await self._reserve()
+                if not granted:
+                    break
+                waiter = self._next_waiter()
+                if waiter is None:
+                    self.shared.release_slot(slot)
+                    return
+                self._grant(waiter, slot)
+
+    def _grant(self, waiter: Tuple[str, asyncio.Future], slot: Optional[str]) -> None:
+        priority, future = waiter
+        metrics.submit_queue_depth.dec(priority=priority)
+        self._take()
+        future.set_result(slot)
+
+    def _next_waiter(self) -> Optional[Tuple[str, asyncio.Future]]:
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            while queue:
+                client, waiters = next(iter(queue.items()))
+                future = waiters.popleft()
+                # the client goes to the back of the line, or leaves it once served
+                if waiters:
+                    queue.move_to_end(client)
+                else:
+                    del queue[client]
+                if not future.done():
+                    return priority, future
+        return None
+
+    def _remove(self, priority: str, client: str, future: asyncio.Future) -> None:
+        waiters = self._queues[priority].get(client)
+        if waiters is None or future not in waiters:
+            return
+        waiters.remove(future)
+        if not waiters:
+            del self._queues[priority][client]
+        metrics.submit_queue_depth.dec(priority=priority)
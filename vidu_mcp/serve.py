@@ -0,0 +1,80 @@
+"""HTTP transport of the Vidu MCP server, ``vidu-mcp serve``.
+
+Runs the server over streamable HTTP or SSE with uvicorn. With several
+worker processes, MCP sessions are stateless, so any worker can answer any
+request, and the workers share a SQLite task store, so a task submitted by
+one worker can be looked up and collected through another.
+"""
+import argparse
+import logging
+import os
+import secrets
+from typing import List, Optional
+
+from vidu_mcp.const import (
+    ENV_VIDU_CALLBACK_SECRET,
+    ENV_VIDU_CALLBACK_URL,
+    ENV_VIDU_SERVE_STATELESS,
+    ENV_VIDU_SERVE_TRANSPORT,
+    ENV_VIDU_TASK_STORE,
+)
+
+logger = logging.getLogger("vidu-mcp")
+
+TRANSPORTS = ("streamable-http", "sse")
+
+
+def default_store_path() -> str:
+    """Return the default location of the shared task store."""
+    return os.path.join(os.path.expanduser("~"), ".cache", "vidu-mcp", "tasks.sqlite3")
+
+
+def create_app():
+    """Build the ASGI app of one worker, used as uvicorn app factory."""
+    from vidu_mcp.server import mcp
+
+    mcp.settings.stateless_http = os.getenv(ENV_VIDU_SERVE_STATELESS) == "true"
+    if os.getenv(ENV_VIDU_SERVE_TRANSPORT) == "sse":
+        return mcp.sse_app()
+    return mcp.streamable_http_app()
+
+
+def serve(argv: Optional[List[str]] = None) -> None:
+    """Parse the ``serve`` arguments and run uvicorn.
+
+    Args:
+        argv: Command line arguments after ``serve``
+    """
+    parser = argparse.ArgumentParser(prog="vidu-mcp serve", description="Run the Vidu MCP server over HTTP")
+    parser.add_argument("--transport", choices=TRANSPORTS, default="streamable-http")
+    parser.add_argument("--host", default=os.getenv("FASTMCP_HOST") or "127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("FASTMCP_PORT") or 8000))
+    parser.add_argument("--workers", type=int, default=1, help="worker processes, requires streamable-http when above 1")
+    parser.add_argument("--stateless", action="store_true", help="handle every request without an MCP session")
+    parser.add_argument("--task-store", default=os.getenv(ENV_VIDU_TASK_STORE) or default_store_path(),
+                        help="SQLite file shared by the workers")
+    args = parser.parse_args(argv)
+
+    if args.workers > 1 and args.transport == "sse":
+        # an SSE session lives in the worker that opened it, but its messages may reach any worker
+        parser.error("--workers above 1 requires --transport streamable-http")
+
+    # the settings travel to the worker processes through the environment
+    os.environ[ENV_VIDU_SERVE_TRANSPORT] = args.transport
+    os.environ[ENV_VIDU_SERVE_STATELESS] = "true" if args.stateless or args.workers > 1 else "false"
+    os.environ[ENV_VIDU_TASK_STORE] = args.task_store
+    if os.getenv(ENV_VIDU_CALLBACK_URL) and not os.getenv(ENV_VIDU_CALLBACK_SECRET):
+        # any worker may receive the callback of a URL another worker signed
+        os.environ[ENV_VIDU_CALLBACK_SECRET] = secrets.token_hex(32)
+
+    import uvicorn
+
+    logger.info(f"Serving Vidu MCP over {args.transport} on {args.host}:{args.port} with {args.workers} workers")
+    uvicorn.run(
+        "vidu_mcp.serve:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level=(os.getenv("FASTMCP_LOG_LEVEL") or "warning").lower(),
+    )
@@ -8,84 +8,136 @@ Any tool that makes an API call is clearly marked with a cost warning. Please fo
 
 Note: Tools without cost warnings are free to use as they only read existing data.
 """
-import requests
-import time
+import asyncio
+import httpx
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from dotenv import load_dotenv
 import json
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 import logging
+import os
 import sys
+from typing import Callable
 
-from vidu_mcp.client import ViduAPIClient
-from vidu_mcp.exceptions import ViduAPIError
+from vidu_mcp import metrics
+from vidu_mcp.exceptions import ViduAPIError, ViduRequestError
 from vidu_mcp.const import *
-from vidu_mcp.util import *
+from vidu_mcp.validation import describe_duration, describe_model, describe_resolution, validate_request
 
+# only cheap setup runs at import, the API client and local stores are built on the first tool call
 load_dotenv()
-api_key = ENV_VIDU_API_KEY
-if api_key is None:
-    api_key = os.environ.get("VIDU_API_KEY")
-api_host = ENV_VIDU_API_HOST
-if api_host is None:
-    api_host = os.environ.get("VIDU_API_HOST")
 fastmcp_log_level = os.getenv(ENV_FASTMCP_LOG_LEVEL) or "WARNING"
 
-if not api_key:
-    raise ValueError("VIDU_API_KEY environment variable is required")
-if not api_host:
-    raise ValueError("VIDU_API_HOST environment variable is required")
-
 logging.basicConfig(level=logging.INFO, stream=sys.stderr,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("vidu-mcp")
+# httpx logs every request at INFO, which floods stderr while polling
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def get_runtime():
+    # imported here, so the HTTP clients and local stores load on first use
+    from vidu_mcp.runtime import get_runtime
+    return get_runtime()
+
+
+_resumed = False
+
+
+def has_unfinished_tasks() -> bool:
+    store_path = os.getenv(ENV_VIDU_TASK_STORE)
+    if store_path:
+        from vidu_mcp.store import has_orphaned
+        return has_orphaned(store_path)
+
+    from vidu_mcp.journal import has_unfinished
+    from vidu_mcp.runtime import default_journal_path
+    return has_unfinished(default_journal_path())
 
-mcp = FastMCP("Vidu", log_level=fastmcp_log_level)
-api_client = ViduAPIClient(api_key, api_host)
+
+@asynccontextmanager
+async def lifespan(server):
+    global _resumed
+
+    # paid tasks submitted before a restart are still polled, so their results can be collected;
+    # stateless HTTP runs the lifespan for every request, so this only happens once per process
+    if not _resumed:
+        _resumed = True
+        if await asyncio.to_thread(has_unfinished_tasks):
+            try:
+                resumed = await get_runtime().resume_unfinished()
+                if resumed:
+                    logger.info(f"Resumed polling {resumed} unfinished tasks from the task journal")
+            except ValueError as e:
+                logger.error(f"Cannot resume unfinished tasks: {str(e)}")
+    yield {}
+
+
+mcp = FastMCP("Vidu", log_level=fastmcp_log_level, lifespan=lifespan)
+
+# client of the generate_batch call whose jobs are being submitted
+batch_client: ContextVar[str] = ContextVar("batch_client", default="local")
+
+# continuation indent of the generated duration and resolution lines in the tool descriptions
+DURATION_INDENT = " " * 34
+RESOLUTION_INDENT = " " * 36
 
 
 @mcp.tool(
-    description="""Generate a video from a prompt.
+    description=f"""Generate a video from a prompt.
 
     COST WARNING: This tool makes an API call to Vidu which may incur costs. Only use when explicitly requested by the user.
     
      Args:
-        model (str, required): The model to use. Values range ["viduq1","vidu1.5"], with "viduq1" being the default.
+        model (str, required): {describe_model("text2video")}
         prompt (str, required): A textual description for video generation, with a maximum length of 1500 characters
         style (str, optional): The style of output video. Defaults to general, Accepted values: general anime
-        duration (int, optional): Video duration. Default values vary by model:
-                                  - viduq1: default 5s, available: 5
-                                  - vidu1.5: default 4s, available: 4, 8
+        duration (int, optional): {describe_duration("text2video", DURATION_INDENT)}
         seed (int, optional): Random seed
                               - Defaults to a random seed number
                               - Manually set values will override the default random seed
         aspect_ratio (str, optional): The aspect ratio of the output video. Values range ["1:1", "16:9","9:16"], with "16:9" being the default.
-        resolution (str, optional): Resolution. Default values vary by model & duration:
-                                    - viduq1 (5s): default 1080p, available: 1080p
-                                    - vidu1.5 (4s): default 360p, available: 360p, 720p, 1080p
-                                    - vidu1.5 (8s): default 720p, available: 720p
+        resolution (str, optional): {describe_resolution("text2video", RESOLUTION_INDENT)}
         movement_amplitude (str, optional): The movement amplitude of objects in the frame.Defaults to auto, accepted value: auto small medium large
         bgm (bool, optional): Whether to add background music to the generated video.
                               - Default: false. Acceptable values: true, false.
                               - When true, the system will automatically add a suitable BGM.
                               - Only when the final generated video duration is 4 seconds is adding BGM supported.
+        wait (bool, optional): Whether to wait for the video to finish.
+                               - Default: true, the call returns once the video is ready.
+                               - When false, the call returns the task_id right after submission;
+                                 use get_task_status or wait_for_task to collect the result later.
+        download_dir (str, optional): Local directory to download the finished video to.
+                                      - Defaults to the VIDU_DOWNLOAD_DIR environment variable; the video is not downloaded when both are empty.
+                                      - When set, the result also contains local_path.
+        priority (str, optional): Submission priority while the server is at its task limit.
+                                  - Defaults to normal, accepted: high normal low
     Returns:
-        task_id and video_url
+        task_id and video_url, or task_id only when wait is false
     """
 )
-def generate_text_to_video(
+async def generate_text_to_video(
         model: str = "viduq1",
         prompt: str = "",
         style: str = "general",
-        duration: int = 5,
+        duration: int | None = None,
         seed: int = 0,
         aspect_ratio: str = "16:9",
-        resolution: str = "1080p",
+        resolution: str | None = None,
         movement_amplitude: str = "auto",
         bgm: bool = False,
+        wait: bool = True,
+        download_dir: str = "",
+        priority: str = "normal",
+        ctx: Context = None,
 ) -> str:
     try:
-        if not prompt:
-            raise ViduRequestError("Prompt is required")
+        params = validate_request(
+            "text2video", model=model, prompt=prompt, style=style, duration=duration, aspect_ratio=aspect_ratio,
+            resolution=resolution, movement_amplitude=movement_amplitude, bgm=bgm,
+        )
+        model, duration, resolution = params["model"], params["duration"], params["resolution"]
 
         # step1: submit video generation task
         payload = {
@@ -100,17 +152,13 @@ def generate_text_to_video(
             "bgm": bgm,
         }
 
-        response_data = api_client.post("/ent/v2/text2video", json=payload)
-        task_id = response_data.get("task_id")
-        if not task_id:
-            raise ViduRequestError("Failed to get task_id from response")
-
-        return query_video(task_id=task_id)
+        return await run_task("/ent/v2/text2video", payload, model=model, wait=wait, download_dir=download_dir,
+                              priority=priority, ctx=ctx)
 
     except ViduAPIError as e:
         logger.error(f"Parameter validation error: {str(e)}")
         return f"Error: {str(e)}"
-    except (IOError, requests.RequestException) as e:
+    except (IOError, httpx.HTTPError) as e:
         logger.error(f"Parameter validation error: {str(e)}")
         return f"Error: {str(e)}"
     except Exception as e:
@@ -119,48 +167,59 @@ def generate_text_to_video(
 
 
 @mcp.tool(
-    description="""Generate a video from a pic and prompt.
+    description=f"""Generate a video from a pic and prompt.
 
     COST WARNING: This tool makes an API call to Vidu which may incur costs. Only use when explicitly requested by the user.
     
     Args:
         image (str, required): An image to be used as the start frame of the generated video
-        model (str, required): The model to use. Values range ["viduq1","vidu1.5","vidu2.0"], with "viduq1" being the default.
+        model (str, required): {describe_model("img2video")}
         prompt (str, optional): A textual description for video generation, with a maximum length of 1500 characters
-        duration (int, optional): Video duration. Default values vary by model:
-                                  - viduq1: default 5s, available: 5
-                                  - vidu2.0 and vidu1.5: default 4s, available: 4, 8
+        duration (int, optional): {describe_duration("img2video", DURATION_INDENT)}
         seed (int, optional): Random seed
                               - Defaults to a random seed number
                               - Manually set values will override the default random seed
-        resolution (str, optional): Resolution. Default values vary by model & duration:
-                                    - viduq1 (5s): default 1080p, available: 1080p
-                                    - vidu2.0 and vidu1.5 (4s): default 360p, options: 360p, 720p, 1080p
-                                    - vidu2.0 and vidu1.5 (8s): default 720p, options: 720p
+        resolution (str, optional): {describe_resolution("img2video", RESOLUTION_INDENT)}
         movement_amplitude (str, optional): The movement amplitude of objects in the frame.Defaults to auto, accepted value: auto small medium large
         bgm (bool, optional): Whether to add background music to the generated video.
                               - Default: false. Acceptable values: true, false.
                               - When true, the system will automatically add a suitable BGM.
                               - Only when the final generated video duration is 4 seconds is adding BGM supported.
+        wait (bool, optional): Whether to wait for the video to finish.
+                               - Default: true, the call returns once the video is ready.
+                               - When false, the call returns the task_id right after submission;
+                                 use get_task_status or wait_for_task to collect the result later.
+        download_dir (str, optional): Local directory to download the finished video to.
+                                      - Defaults to the VIDU_DOWNLOAD_DIR environment variable; the video is not downloaded when both are empty.
+                                      - When set, the result also contains local_path.
+        priority (str, optional): Submission priority while the server is at its task limit.
+                                  - Defaults to normal, accepted: high normal low
     Returns:
-        task_id and video_url
+        task_id and video_url, or task_id only when wait is false
     """
 )
-def generate_img_to_video(
+async def generate_img_to_video(
         image: str,
         model: str = "viduq1",
         prompt: str = "",
-        duration: int = 5,
+        duration: int | None = None,
         seed: int = 0,
-        resolution: str = "1080p",
+        resolution: str | None = None,
         movement_amplitude: str = "auto",
         bgm: bool = False,
+        wait: bool = True,
+        download_dir: str = "",
+        priority: str = "normal",
+        ctx: Context = None,
 ) -> str:
     try:
-        if not image:
-            raise ViduRequestError("image is required")
+        params = validate_request(
+            "img2video", images=[image] if image else [], model=model, prompt=prompt, duration=duration,
+            resolution=resolution, movement_amplitude=movement_amplitude, bgm=bgm,
+        )
+        model, duration, resolution = params["model"], params["duration"], params["resolution"]
 
-        image = del_input_image(image)
+        image = (await get_runtime().prepare_images([image], resolution))[0]
 
         # step1: submit video generation task
         payload = {
@@ -174,17 +233,13 @@ def generate_img_to_video(
             "bgm": bgm,
         }
 
-        response_data = api_client.post("/ent/v2/img2video", json=payload)
-        task_id = response_data.get("task_id")
-        if not task_id:
-            raise ViduRequestError("Failed to get task_id from response")
-
-        return query_video(task_id=task_id)
+        return await run_task("/ent/v2/img2video", payload, model=model, wait=wait, download_dir=download_dir,
+                              priority=priority, ctx=ctx)
 
     except ViduAPIError as e:
         logger.error(f"Parameter validation error: {str(e)}")
         return f"Error: {str(e)}"
-    except (IOError, requests.RequestException) as e:
+    except (IOError, httpx.HTTPError) as e:
         logger.error(f"Parameter validation error: {str(e)}")
         return f"Error: {str(e)}"
     except Exception as e:
@@ -193,7 +248,7 @@ def generate_img_to_video(
 
 
 @mcp.tool(
-    description="""Generate a video from a pic and prompt.
+    description=f"""Generate a video from a pic and prompt.
 
     COST WARNING: This tool makes an API call to Vidu which may incur costs. Only use when explicitly requested by the user.
     
@@ -202,46 +257,54 @@ def generate_img_to_video(
                                      For fields that accept images:
                                      -Accepts 1 to 3 images.
         prompt (str, required): A textual description for video generation, with a maximum length of 1500 characters
-        model (str, required): The model to use. Values range ["vidu1.5","vidu2.0"], with "vidu2.0" being the default.
-        duration (int, optional): Video duration parameter, with default values depending on the model:
-                                  - vidu2.0: Default is 4 seconds, available option: 4
-                                  - vidu1.5: Default is 4 seconds, available options: 4, 8
+        model (str, required): {describe_model("reference2video")}
+        duration (int, optional): {describe_duration("reference2video", DURATION_INDENT)}
         seed (int, optional): Random seed
                               - Defaults to a random seed number
                               - Manually set values will override the default random seed
         aspect_ratio (str, optional): The aspect ratio of the output video. Defaults to 16:9, accepted: 16:9 9:16 1:1
-        resolution (str, optional): The resolution of the output video
-                                    Defaults to 360p , accepted value: 360p 720p 1080p
-                                    - Model vidu1.5 duration 4 accepted: 360p 720p 1080p
-                                    - Model vidu1.5 duration 8accepted: 720p
-                                    - Model vidu2.0 duration 4 accepted: 360p 720p
+        resolution (str, optional): {describe_resolution("reference2video", RESOLUTION_INDENT)}
         movement_amplitude (str, optional): The movement amplitude of objects in the frame.Defaults to auto, accepted value: auto small medium large
         bgm (bool, optional): Whether to add background music to the generated video.
                               - Default: false. Acceptable values: true, false.
                               - When true, the system will automatically add a suitable BGM.
                               - Only when the final generated video duration is 4 seconds is adding BGM supported.
+        wait (bool, optional): Whether to wait for the video to finish.
+                               - Default: true, the call returns once the video is ready.
+                               - When false, the call returns the task_id right after submission;
+                                 use get_task_status or wait_for_task to collect the result later.
+        download_dir (str, optional): Local directory to download the finished video to.
+                                      - Defaults to the VIDU_DOWNLOAD_DIR environment variable; the video is not downloaded when both are empty.
+                                      - When set, the result also contains local_path.
+        priority (str, optional): Submission priority while the server is at its task limit.
+                                  - Defaults to normal, accepted: high normal low
     Returns:
-        task_id and video_url
+        task_id and video_url, or task_id only when wait is false
     """
 )
-def generate_reference2video_to_video(
+async def generate_reference2video_to_video(
         images: list[str],
         prompt: str,
         model: str = "vidu2.0",
-        duration: int = 4,
+        duration: int | None = None,
         seed: int = 0,
         aspect_ratio: str = "16:9",
-        resolution: str = "720p",
+        resolution: str | None = None,
         movement_amplitude: str = "auto",
         bgm: bool = False,
+        wait: bool = True,
+        download_dir: str = "",
+        priority: str = "normal",
+        ctx: Context = None,
 ) -> str:
     try:
-        if not images:
-            raise ViduRequestError("images is required")
-        if not prompt:
-            raise ViduRequestError("prompt is required")
+        params = validate_request(
+            "reference2video", images=images, prompt=prompt, model=model, duration=duration,
+            aspect_ratio=aspect_ratio, resolution=resolution, movement_amplitude=movement_amplitude, bgm=bgm,
+        )
+        model, duration, resolution = params["model"], params["duration"], params["resolution"]
 
-        input_images = del_input_images(images)
+        input_images = await get_runtime().prepare_images(images, resolution)
 
         # step1: submit video generation task
         payload = {
@@ -256,17 +319,13 @@ def generate_reference2video_to_video(
             "bgm": bgm,
         }
 
-        response_data = api_client.post("/ent/v2/reference2video", json=payload)
-        task_id = response_data.get("task_id")
-        if not task_id:
-            raise ViduRequestError("Failed to get task_id from response")
-
-        return query_video(task_id=task_id)
+        return await run_task("/ent/v2/reference2video", payload, model=model, wait=wait, download_dir=download_dir,
+                              priority=priority, ctx=ctx)
 
     except ViduAPIError as e:
         logger.error(f"Parameter validation error: {str(e)}")
         return f"Error: {str(e)}"
-    except (IOError, requests.RequestException) as e:
+    except (IOError, httpx.HTTPError) as e:
         logger.error(f"Parameter validation error: {str(e)}")
         return f"Error: {str(e)}"
     except Exception as e:
@@ -275,47 +334,58 @@ def generate_reference2video_to_video(
 
 
 @mcp.tool(
-    description="""Generate a video from a pic and prompt.
+    description=f"""Generate a video from a pic and prompt.
 
     COST WARNING: This tool makes an API call to Vidu which may incur costs. Only use when explicitly requested by the user.
     Args:
         images (str list, required): Two images: first is start frame, second is end frame.
-        model (str, required): The model to use. Values range ["vidu1.5","vidu2.0","viduq1-classic","viduq1"], with "viduq1" being the default.
+        model (str, required): {describe_model("start-end2video")}
         prompt (str, optional): A textual description for video generation, with a maximum length of 1500 characters
-        duration (int, optional): Video duration. Default values vary by model:
-                                  - viduq1 and viduq1-classic: default 5s, available: 5
-                                  - vidu2.0 and vidu1.5: default 4s, available: 4, 8
+        duration (int, optional): {describe_duration("start-end2video", DURATION_INDENT)}
         seed (int, optional): Random seed
                               - Defaults to a random seed number
                               - Manually set values will override the default random seed
-        resolution (str, optional): Resolution (based on model & duration):
-                                    - viduq1 and viduq1-classic(5s): default 1080p, options: 1080p
-                                    - vidu2.0 and vidu1.5 (4s): default 360p, options: 360p, 720p, 1080p
-                                    - vidu2.0 and vidu1.5 (8s): default 720p, options: 720p
+        resolution (str, optional): {describe_resolution("start-end2video", RESOLUTION_INDENT)}
         movement_amplitude (str, optional): The movement amplitude of objects in the frame.Defaults to auto, accepted value: auto small medium large
         bgm (bool, optional): Whether to add background music to the generated video.
                               - Default: false. Acceptable values: true, false.
                               - When true, the system will automatically add a suitable BGM.
                               - Only when the final generated video duration is 4 seconds is adding BGM supported.
+        wait (bool, optional): Whether to wait for the video to finish.
+                               - Default: true, the call returns once the video is ready.
+                               - When false, the call returns the task_id right after submission;
+                                 use get_task_status or wait_for_task to collect the result later.
+        download_dir (str, optional): Local directory to download the finished video to.
+                                      - Defaults to the VIDU_DOWNLOAD_DIR environment variable; the video is not downloaded when both are empty.
+                                      - When set, the result also contains local_path.
+        priority (str, optional): Submission priority while the server is at its task limit.
+                                  - Defaults to normal, accepted: high normal low
     Returns:
-        task_id and video_url
+        task_id and video_url, or task_id only when wait is false
     """
 )
-def generate_startend2video_to_video(
+async def generate_startend2video_to_video(
         images: list[str],
         model: str = "viduq1",
         prompt: str = "",
-        duration: int = 5,
+        duration: int | None = None,
         seed: int = 0,
-        resolution: str = "1080p",
+        resolution: str | None = None,
         movement_amplitude: str = "auto",
         bgm: bool = False,
+        wait: bool = True,
+        download_dir: str = "",
+        priority: str = "normal",
+        ctx: Context = None,
 ) -> str:
     try:
-        if not images:
-            raise ViduRequestError("images is required")
+        params = validate_request(
+            "start-end2video", images=images, model=model, prompt=prompt, duration=duration,
+            resolution=resolution, movement_amplitude=movement_amplitude, bgm=bgm,
+        )
+        model, duration, resolution = params["model"], params["duration"], params["resolution"]
 
-        input_images = del_input_images(images)
+        input_images = await get_runtime().prepare_images(images, resolution)
 
         # step1: submit video generation task
         payload = {
@@ -329,17 +399,13 @@ def generate_startend2video_to_video(
             "bgm": bgm,
         }
 
-        response_data = api_client.post("/ent/v2/start-end2video", json=payload)
-        task_id = response_data.get("task_id")
-        if not task_id:
-            raise ViduRequestError("Failed to get task_id from response")
-
-        return query_video(task_id=task_id)
+        return await run_task("/ent/v2/start-end2video", payload, model=model, wait=wait, download_dir=download_dir,
+                              priority=priority, ctx=ctx)
 
     except ViduAPIError as e:
         logger.error(f"Parameter validation error: {str(e)}")
         return f"Error: {str(e)}"
-    except (IOError, requests.RequestException) as e:
+    except (IOError, httpx.HTTPError) as e:
         logger.error(f"Parameter validation error: {str(e)}")
         return f"Error: {str(e)}"
     except Exception as e:
@@ -369,11 +435,20 @@ def generate_startend2video_to_video(
                               - Default: false. Acceptable values: true, false.
                               - When true, the system will automatically add a suitable BGM.
                               - Only when the final generated video duration is 4 seconds is adding BGM supported.
+        wait (bool, optional): Whether to wait for the video to finish.
+                               - Default: true, the call returns once the video is ready.
+                               - When false, the call returns the task_id right after submission;
+                                 use get_task_status or wait_for_task to collect the result later.
+        download_dir (str, optional): Local directory to download the finished video to.
+                                      - Defaults to the VIDU_DOWNLOAD_DIR environment variable; the video is not downloaded when both are empty.
+                                      - When set, the result also contains local_path.
+        priority (str, optional): Submission priority while the server is at its task limit.
+                                  - Defaults to normal, accepted: high normal low
     Returns:
-        task_id and video_url
+        task_id and video_url, or task_id only when wait is false
     """
 )
-def generate_template_to_video(
+async def generate_template_to_video(
         template: str,
         images: list[str],
         prompt: str = "",
@@ -382,14 +457,17 @@ def generate_template_to_video(
         area: str = "auto",
         beast: str = "auto",
         bgm: bool = False,
+        wait: bool = True,
+        download_dir: str = "",
+        priority: str = "normal",
+        ctx: Context = None,
 ) -> str:
     try:
         if not template:
             raise ViduRequestError("template is required")
-        if not images:
-            raise ViduRequestError("images is required")
+        validate_request("template2video", template=template, images=images, prompt=prompt, area=area, beast=beast)
 
-        input_images = del_input_images(images)
+        input_images = await get_runtime().prepare_images(images)
 
         # step1: submit video generation task
         payload = {
@@ -400,22 +478,18 @@ def generate_template_to_video(
             "aspect_ratio": aspect_ratio,
             "bgm": bgm,
         }
-        if template is "exotic_princess":
+        if template == "exotic_princess":
             payload["area"] = area
-        if template is "beast_companion":
+        if template == "beast_companion":
             payload["beast"] = beast
 
-        response_data = api_client.post("/ent/v2/template2video", json=payload)
-        task_id = response_data.get("task_id")
-        if not task_id:
-            raise ViduRequestError("Failed to get task_id from response")
-
-        return query_video(task_id=task_id)
+        return await run_task("/ent/v2/template2video", payload, model=None, wait=wait, download_dir=download_dir,
+                              priority=priority, ctx=ctx)
 
     except ViduAPIError as e:
         logger.error(f"Parameter validation error: {str(e)}")
         return f"Error: {str(e)}"
-    except (IOError, requests.RequestException) as e:
+    except (IOError, httpx.HTTPError) as e:
         logger.error(f"Parameter validation error: {str(e)}")
         return f"Error: {str(e)}"
     except Exception as e:
@@ -423,31 +497,431 @@ def generate_template_to_video(
         return f"Error generating video: {str(e)}"
 
 
-def query_video(
-        task_id: int,
+@mcp.tool(
+    description="""Generate several videos in one call.
+
+    COST WARNING: This tool makes API calls to Vidu which may incur costs for every job. Only use when explicitly requested by the user.
+
+    Args:
+        jobs (object list, required): The videos to generate. Each job is an object with:
+                                      - type (str, required): One of text2video, img2video, reference2video, start-end2video, template2video
+                                      - the arguments of the matching generate tool (generate_text_to_video, generate_img_to_video,
+                                        generate_reference2video_to_video, generate_startend2video_to_video, generate_template_to_video)
+        concurrency (int, optional): Maximum number of jobs being submitted at the same time. Defaults to 4.
+        priority (str, optional): Submission priority of jobs that set none, while the server is at its task limit.
+                                  - Defaults to low, accepted: high normal low
+        download_dir (str, optional): Local directory to download finished videos to, unless a job sets its own download_dir.
+        wait (bool, optional): Whether to wait for every video to finish.
+                               - Default: true, the call returns once all jobs succeeded or failed.
+                               - When false, the call returns the task_ids right after submission;
+                                 use get_task_status or wait_for_task to collect the results later.
+    Returns:
+        A summary with the task_id and video_url or error of every job, in input order
+    """
+)
+async def generate_batch(
+        jobs: list[dict],
+        concurrency: int = 4,
+        wait: bool = True,
+        download_dir: str = "",
+        priority: str = "low",
+        ctx: Context = None,
 ) -> str:
     try:
-        creation_url = None
-        max_retries = 30  # 10 minutes total (30 * 20 seconds)
-        retry_interval = 20  # seconds
+        if not jobs:
+            raise ViduRequestError("jobs is required")
+
+        # the jobs run without ctx, they queue as the client of this call
+        batch_client.set(client_key(ctx))
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        finished = 0
+
+        async def run_job(index: int, job: dict) -> dict:
+            outcome = {"index": index, "type": job.get("type") if isinstance(job, dict) else None}
+            try:
+                params = dict(job)
+                tool = BATCH_JOB_TOOLS.get(params.pop("type", None))
+                if tool is None:
+                    raise ViduRequestError(f"type must be one of {', '.join(BATCH_JOB_TOOLS)}")
+                params.pop("wait", None)
+                params.setdefault("priority", priority)
+
+                # submissions are capped, the tracker then polls all jobs together
+                async with semaphore:
+                    submitted = await tool(**params, wait=False)
+                if submitted.startswith("Error"):
+                    raise ViduRequestError(submitted.removeprefix("Error: "))
+                result = json.loads(submitted)
+                if wait and result.get("status") != "success":
+                    completed = await query_video(
+                        task_id=result["task_id"],
+                        model=params.get("model"),
+                        download_dir=params.get("download_dir") or download_dir,
+                    )
+                    if completed.startswith("Error"):
+                        raise ViduRequestError(completed.removeprefix("Error: "))
+                    result = json.loads(completed)
+                outcome.update(result)
+            except Exception as e:
+                outcome.update({"status": "failed", "error": str(e)})
+
+            nonlocal finished
+            finished += 1
+            if ctx is not None:
+                try:
+                    await ctx.report_progress(
+                        finished,
+                        total=len(jobs),
+                        message=f"Job {index} {outcome['status']}, {finished}/{len(jobs)} done",
+                    )
+                except Exception as e:
+                    logger.debug(f"Progress notification failed: {str(e)}")
+            return outcome
+
+        results = await asyncio.gather(*(run_job(index, job) for index, job in enumerate(jobs)))
+        summary = {
+            "total": len(results),
+            "succeeded": sum(1 for result in results if result.get("status") == "success"),
+            "failed": sum(1 for result in results if result.get("status") == "failed"),
+            "results": results,
+        }
 
-        for attempt in range(max_retries):
-            status_response = api_client.get(f"/ent/v2/tasks/{task_id}/creations")
-            status = status_response.get("state")
+        return json.dumps(summary, indent=2, ensure_ascii=False)
+
+    except ViduAPIError as e:
+        logger.error(f"Batch generation error: {str(e)}")
+        return f"Error: {str(e)}"
+    except Exception as e:
+        logger.error(f"Batch generation error: {str(e)}")
+        return f"Error generating videos: {str(e)}"
+
+
+BATCH_JOB_TOOLS = {
+    "text2video": generate_text_to_video,
+    "img2video": generate_img_to_video,
+    "reference2video": generate_reference2video_to_video,
+    "start-end2video": generate_startend2video_to_video,
+    "template2video": generate_template_to_video,
+}
+
+
+async def run_task(
+        endpoint: str,
+        payload: dict,
+        model: str | None = None,
+        wait: bool = True,
+        download_dir: str = "",
+        priority: str = "normal",
+        ctx: Context = None,
+) -> str:
+    from vidu_mcp.dedup import request_key
+    from vidu_mcp.util import resolve_download_dir
+
+    # refuse a download_dir that is not allowed before the video is paid for
+    resolve_download_dir(download_dir)
+    deduplicator = get_runtime().deduplicator
+    # seed 0 asks for a random seed, so an identical request is meant to give another video
+    deduplicate = deduplicator.enabled and bool(payload.get("seed"))
+    # hashing inline images and, for deduplication, the content of streamed files blocks for a while
+    key = await asyncio.to_thread(request_key, endpoint, payload, deduplicate)
+    client = client_key(ctx)
+    if not deduplicate:
+        task_id = await submit_task(endpoint, payload, model, key, client, priority)
+    else:
+        stored = deduplicator.lookup(key)
+        if stored:
+            result = {
+                "task_id": stored["task_id"],
+                "status": "success",
+                "video_url": stored["video_url"],
+                "cached": True,
+            }
+            await download_result(result, download_dir)
+            return json.dumps(result, indent=2, ensure_ascii=False)
+        task_id = await deduplicator.submit(
+            key, lambda bind: submit_task(endpoint, payload, model, key, client, priority, on_task_id=bind)
+        )
+
+    if not wait:
+        return submitted_result(task_id)
+
+    return await query_video(task_id=task_id, model=model, download_dir=download_dir, ctx=ctx)
+
+
+async def submit_task(
+        endpoint: str,
+        payload: dict,
+        model: str | None = None,
+        payload_hash: str = "",
+        client: str = "local",
+        priority: str = "normal",
+        on_task_id: Callable[[str], None] | None = None,
+) -> str:
+    runtime = get_runtime()
+    callback = await runtime.callback_receiver.new_callback() if runtime.callback_receiver else None
+    if callback is not None:
+        # the payload hash was taken before, so the per-task URL does not defeat deduplication
+        payload = dict(payload, callback_url=callback[0])
+
+    # waits in the local queue while the account is at its task limit
+    slot = await runtime.scheduler.acquire(client, priority)
+    try:
+        response_data, key_id = await runtime.api_client.submit(endpoint, json=payload)
+        task_id = response_data.get("task_id")
+        if not task_id:
+            raise ViduRequestError("Failed to get task_id from response")
+    except BaseException:
+        runtime.scheduler.abort(slot)
+        raise
+    runtime.scheduler.bind(task_id, slot)
+    if on_task_id is not None:
+        # before the task is tracked, an early callback may finish it below
+        on_task_id(task_id)
+
+    resolution = payload.get("resolution")
+    nonce = callback[1] if callback is not None else None
+    # track every submitted task first, so its completion is observed and its slots freed
+    # even if nobody waits or the journal cannot be written
+    runtime.task_tracker.track(task_id, model, resolution, key_id=key_id, callback=callback is not None)
+    runtime.task_journal.record_submitted(task_id, endpoint, payload_hash, model, resolution, key_id, nonce)
+    if callback is not None:
+        # may finish the task right away, with a callback that arrived before the submit returned
+        runtime.callback_receiver.submitted(task_id, nonce)
+    return task_id
+
+
+def client_key(
+        ctx: Context = None,
+) -> str:
+    # clients of one priority take turns in the submission queue
+    if ctx is None:
+        return batch_client.get()
+    try:
+        if ctx.client_id:
+            return ctx.client_id
+        request = ctx.request_context.request
+    except (AttributeError, ValueError):
+        return batch_client.get()
+    if request is not None:
+        # HTTP: the MCP session, or the remote address when running stateless
+        session_id = request.headers.get("mcp-session-id")
+        if session_id:
+            return session_id
+        if request.client is not None:
+            return request.client.host
+    return f"session-{id(ctx.session)}"
+
+
+def submitted_result(
+        task_id: str,
+) -> str:
+    result = {
+        "task_id": task_id,
+        "status": "submitted",
+    }
 
-            if status == "failed":
-                raise ViduRequestError(f"Video generation failed for task_id: {task_id}")
-            elif status == "success":
-                creation_url = status_response.get("creations", [{}])[0].get("url")
-                if creation_url:
-                    break
-                raise ViduRequestError(f"Missing creation_url in success response for task_id: {task_id}")
+    return json.dumps(result, indent=2, ensure_ascii=False)
 
-            # Still processing, wait and retry
-            time.sleep(retry_interval)
 
+@mcp.tool(
+    description="""Get the current status of a video generation task.
+
+    This tool only reads the state of an existing task and does not incur generation costs.
+
+    Args:
+        task_id (str, required): The task_id returned by a generate tool
+    Returns:
+        task_id, status (created, queueing, processing, success or failed) and video_url once successful
+    """
+)
+async def get_task_status(
+        task_id: str,
+) -> str:
+    try:
+        if not task_id:
+            raise ViduRequestError("task_id is required")
+
+        status_response = await get_runtime().status_cache.get(task_id)
+        return task_status_result(task_id, status_response)
+
+    except ViduAPIError as e:
+        logger.error(f"Task status error: {str(e)}")
+        return f"Error: {str(e)}"
+    except (IOError, httpx.HTTPError) as e:
+        logger.error(f"Task status error: {str(e)}")
+        return f"Error: {str(e)}"
+    except Exception as e:
+        logger.error(f"Task status error: {str(e)}")
+        return f"Error getting task status: {str(e)}"
+
+
+def task_status_result(
+        task_id: str,
+        status_response: dict,
+) -> str:
+    result = {
+        "task_id": task_id,
+        "status": status_response.get("state"),
+    }
+    if result["status"] == "success":
+        result["video_url"] = (status_response.get("creations") or [{}])[0].get("url")
+    elif result["status"] == "failed":
+        result["err_code"] = status_response.get("err_code")
+
+    return json.dumps(result, indent=2, ensure_ascii=False)
+
+
+@mcp.tool(
+    description="""Wait for a video generation task to finish and return its result.
+
+    This tool only reads the state of an existing task and does not incur generation costs.
+
+    Args:
+        task_id (str, required): The task_id returned by a generate tool called with wait set to false
+        download_dir (str, optional): Local directory to download the finished video to.
+                                      - Defaults to the VIDU_DOWNLOAD_DIR environment variable; the video is not downloaded when both are empty.
+                                      - When set, the result also contains local_path.
+    Returns:
+        task_id and video_url
+    """
+)
+async def wait_for_task(
+        task_id: str,
+        download_dir: str = "",
+        ctx: Context = None,
+) -> str:
+    if not task_id:
+        return "Error: task_id is required"
+
+    return await query_video(task_id=task_id, download_dir=download_dir, ctx=ctx)
+
+
+@mcp.resource(
+    "vidu://metrics",
+    name="metrics",
+    description="API request latency, status codes and errors, tasks in flight and generation time, in the OpenMetrics text format",
+    mime_type="application/openmetrics-text",
+)
+def get_metrics() -> str:
+    return metrics.registry.render()
+
+
+@mcp.resource(
+    "vidu://tasks/{task_id}",
+    name="task",
+    description="Status of a video generation task: status (created, queueing, processing, success or failed), "
+                "video_url once successful. Finished tasks are answered locally, others at most every few seconds",
+    mime_type="application/json",
+)
+async def get_task_resource(task_id: str) -> str:
+    return task_status_result(task_id, await get_runtime().status_cache.get(task_id))
+
+
+@mcp.resource(
+    "vidu://tasks",
+    name="tasks",
+    description="The 50 most recently updated tasks of the task journal with their last known status, "
+                "read without contacting the Vidu API",
+    mime_type="application/json",
+)
+async def list_tasks() -> str:
+    return json.dumps({"tasks": await get_runtime().status_cache.recent()}, indent=2, ensure_ascii=False)
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request):
+    # only served by the HTTP transports, the metrics are those of the worker answering
+    from starlette.responses import PlainTextResponse
+    return PlainTextResponse(
+        metrics.registry.render(),
+        media_type="application/openmetrics-text; version=1.0.0; charset=utf-8",
+    )
+
+
+@mcp.custom_route(CALLBACK_PATH, methods=["POST"])
+async def callback_endpoint(request):
+    # task callbacks under `vidu-mcp serve`, stdio mode runs its own receiver
+    receiver = get_runtime().callback_receiver
+    if receiver is None:
+        from starlette.responses import JSONResponse
+        return JSONResponse({"error": "task callbacks are not enabled"}, status_code=404)
+    return await receiver.handle(request)
+
+
+@mcp.custom_route("/healthz", methods=["GET"])
+async def health_endpoint(request):
+    from starlette.responses import PlainTextResponse
+    return PlainTextResponse("ok")
+
+
+async def report_task_progress(
+        ctx: Context,
+        update: dict,
+) -> None:
+    # elapsed time always grows, so it doubles as the progress value
+    await ctx.report_progress(
+        update["elapsed"],
+        message=f"Task {update['task_id']} {update['state']}, {update['elapsed']:.0f}s elapsed",
+    )
+
+
+async def download_result(
+        result: dict,
+        download_dir: str = "",
+) -> None:
+    from vidu_mcp.util import resolve_download_dir
+
+    try:
+        download_dir = resolve_download_dir(download_dir)
+    except ViduAPIError as e:
+        result["download_error"] = str(e)
+        return
+    if not download_dir:
+        return
+
+    url_path = result["video_url"].split("?", 1)[0]
+    extension = os.path.splitext(url_path)[1] or ".mp4"
+    try:
+        result["local_path"] = await get_runtime().video_downloader.download(
+            result["video_url"], download_dir, f"{result['task_id']}{extension}"
+        )
+    except (ViduAPIError, IOError, httpx.HTTPError) as e:
+        # the video still exists remotely, so keep the result usable
+        logger.error(f"Video download error: {str(e)}")
+        result["download_error"] = str(e)
+
+
+async def query_video(
+        task_id: str,
+        model: str | None = None,
+        download_dir: str = "",
+        ctx: Context = None,
+) -> str:
+    try:
+        on_update = None
+        if ctx is not None:
+            on_update = lambda update: report_task_progress(ctx, update)
+
+        runtime = get_runtime()
+        entry = await runtime.task_journal.get_async(task_id)
+        if entry and entry["state"] in TERMINAL_STATES:
+            # finished already, possibly in another worker
+            status_response = {"state": entry["state"], "creations": [{"url": entry.get("video_url")}]}
+        else:
+            # the shared tracker polls every pending task on one adaptive schedule
+            key_id = await runtime.key_for(task_id)
+            status_response = await runtime.task_tracker.wait(
+                task_id, model=model, timeout=DEFAULT_WAIT_TIMEOUT, on_update=on_update, key_id=key_id
+            )
+        status = status_response.get("state")
+
+        if status == "failed":
+            raise ViduRequestError(f"Video generation failed for task_id: {task_id}")
+
+        creation_url = (status_response.get("creations") or [{}])[0].get("url")
         if not creation_url:
-            raise ViduRequestError(f"Failed to get creation_url for task_id: {task_id}")
+            raise ViduRequestError(f"Missing creation_url in success response for task_id: {task_id}")
 
         # Build result object
         result = {
@@ -455,13 +929,14 @@ def query_video(
             "status": "success",
             "video_url": creation_url,
         }
+        await download_result(result, download_dir)
 
         return json.dumps(result, indent=2, ensure_ascii=False)
 
     except ViduAPIError as e:
         logger.error(f"Parameter validation error: {str(e)}")
         return f"Error: {str(e)}"
-    except (IOError, requests.RequestException) as e:
+    except (IOError, httpx.HTTPError) as e:
         logger.error(f"Parameter validation error: {str(e)}")
         return f"Error: {str(e)}"
     except Exception as e:
@@ -470,8 +945,13 @@ def query_video(
 
 
 def main():
+    """Run the Vidu MCP server: over stdio by default, over HTTP with ``vidu-mcp serve``."""
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        from vidu_mcp.serve import serve
+        serve(sys.argv[2:])
+        return
+
     print("Starting Vidu MCP server")
-    """Run the Vidu MCP server"""
     mcp.run()
 
 
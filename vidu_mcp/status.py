@@ -0,0 +1,140 @@
+"""In-process cache of task statuses behind get_task_status and the task resources."""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from vidu_mcp import metrics
+from vidu_mcp.const import TERMINAL_STATES
+
+
+class TaskStatusCache:
+    """Answer repeated status lookups without asking the Vidu API again.
+
+    Final states never change, so success and failure are kept until the
+    cache is full and they are the least recently read. Other states are
+    kept for ``ttl`` seconds. The tracker feeds every status it polls or
+    receives by callback into the cache, so tasks this process is waiting
+    for are answered locally, and concurrent misses for one task share a
+    single status request.
+    """
+
+    def __init__(
+            self,
+            api_client,
+            journal,
+            key_for: Callable[[str], Awaitable[Optional[str]]],
+            ttl: float = 5.0,
+            max_entries: int = 10000,
+    ):
+        """Initialize the cache.
+
+        Args:
+            api_client: Client pool used for status requests
+            journal: Task journal or store, answers for finished tasks of other processes
+            key_for: Returns the pool key that submitted a task, status requests must use it
+            ttl: Seconds a state that is not final is reused, 0 to always ask the API
+            max_entries: Number of tasks kept
+        """
+        self.api_client = api_client
+        self.journal = journal
+        self.key_for = key_for
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # task_id -> (expiry as time.monotonic(), None for final states; status response)
+        self._entries: "OrderedDict[str, Tuple[Optional[float], Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def get(self, task_id: str) -> Dict[str, Any]:
+        """Return the status response of a task, from the cache when possible.
+
+        Raises:
+            ViduRequestError: If the status request fails
+        """
+        cached = self._lookup(task_id)
+        if cached is not None:
+            metrics.status_cache_lookups.inc(outcome="hit")
+            return cached
+
+        fetch = self._inflight.get(task_id)
+        if fetch is not None:
+            metrics.status_cache_lookups.inc(outcome="coalesced")
+        else:
+            metrics.status_cache_lookups.inc(outcome="miss")
+            fetch = asyncio.get_running_loop().create_task(self._fetch(task_id))
+            self._inflight[task_id] = fetch
+            fetch.add_done_callback(lambda done: self._fetched(task_id, done))
+        # shield so a cancelled reader does not fail the others
+        return await asyncio.shield(fetch)
+
+    def update(self, task_id: str, status_response: Dict[str, Any]) -> None:
+        """Tracker update listener: store a status polled or received by callback."""
+        current = self._entries.get(task_id)
+        if current is not None and current[0] is None:
+            # a late non-final status must not replace a final one
+            return
+        if status_response.get("state") in TERMINAL_STATES:
+            expires_at = None
+        elif self.ttl > 0:
+            expires_at = time.monotonic() + self.ttl
+        else:
+            return
+        self._entries[task_id] = (expires_at, status_response)
+        self._entries.move_to_end(task_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Return the most recently updated tasks of the journal with their latest known state."""
+        tasks = []
+        for entry in await self.journal.recent_async(limit):
+            cached = self._entries.get(entry["task_id"])
+            status_response = cached[1] if cached is not None else None
+            task = {
+                "task_id": entry["task_id"],
+                "model": entry.get("model"),
+                "status": status_response.get("state") if status_response else entry["state"],
+                "created_at": entry.get("created_at"),
+            }
+            if task["status"] == "success":
+                task["video_url"] = (
+                    (status_response.get("creations") or [{}])[0].get("url") if status_response
+                    else entry.get("video_url")
+                )
+            elif task["status"] == "failed":
+                task["err_code"] = status_response.get("err_code") if status_response else entry.get("err_code")
+            elif entry.get("error"):
+                task["error"] = entry["error"]
+            tasks.append(task)
+        return tasks
+
+    def _lookup(self, task_id: str) -> Optional[Dict[str, Any]]:
+        cached = self._entries.get(task_id)
+        if cached is None:
+            return None
+        expires_at, status_response = cached
+        if expires_at is not None and expires_at <= time.monotonic():
+            return None
+        self._entries.move_to_end(task_id)
+        return status_response
+
+    async def _fetch(self, task_id: str) -> Dict[str, Any]:
+        # finished tasks are answered from the journal, also for tasks another worker submitted
+        entry = await self.journal.get_async(task_id)
+        if entry and entry["state"] in TERMINAL_STATES:
+            status_response = {"state": entry["state"], "err_code": entry.get("err_code"),
+                               "creations": [{"url": entry.get("video_url")}]}
+        else:
+            # a task is only visible to the key that submitted it
+            status_response = await self.api_client.get(
+                f"/ent/v2/tasks/{task_id}/creations", key_id=await self.key_for(task_id)
+            )
+        self.update(task_id, status_response)
+        return status_response
+
+    def _fetched(self, task_id: str, fetch: asyncio.Task) -> None:
+        if self._inflight.get(task_id) is fetch:
+            del self._inflight[task_id]
+        # mark retrieved, readers that gave up would leave the error unretrieved
+        if not fetch.cancelled():
+            fetch.exception()
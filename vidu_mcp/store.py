@@ -0,0 +1,298 @@
+"""SQLite task store shared by several server processes."""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from vidu_mcp.const import TERMINAL_STATES
+from vidu_mcp.journal import ERROR, SUBMITTED, instance_id, owner_alive
+
+logger = logging.getLogger("vidu-mcp")
+
+_FINAL_STATES = TERMINAL_STATES + (ERROR,)
+
+
+def has_orphaned(path: str) -> bool:
+    """Cheaply check whether a store holds unfinished tasks of exited processes."""
+    if not os.path.exists(path):
+        return False
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute(
+            "SELECT owner FROM tasks WHERE state NOT IN (?, ?, ?)", _FINAL_STATES
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+    return any(not owner_alive(owner) for owner, in rows)
+
+
+class TaskStore:
+    """Record submitted tasks in a SQLite file that several processes share.
+
+    A drop-in replacement for the task journal when the server runs as
+    several worker processes: every worker sees the tasks the others
+    submitted, so any of them can answer for a task and knows the pool key
+    it belongs to. Each unfinished task is owned by the process polling it;
+    tasks of processes that exited are taken over by the next process that
+    resumes unfinished tasks.
+
+    Another worker holding the SQLite write lock can block a statement for
+    seconds, so every statement runs on a thread of the store, in order.
+    Writes are queued without waiting; from the event loop, read with the
+    ``_async`` methods, which see every write queued before them.
+    """
+
+    def __init__(self, path: Optional[str], retention: float = 7 * 24 * 3600):
+        """Initialize the store.
+
+        Args:
+            path: SQLite file, None disables the store
+            retention: Seconds finished tasks are kept when compacting
+        """
+        self.path = path
+        self.retention = retention
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vidu-task-store")
+        if path:
+            self._run(self._open, path)
+        self.compact()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether entries are persisted."""
+        return self._conn is not None
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Return the latest entry of a task, whichever process submitted it."""
+        return self._run(self._get, task_id).result()
+
+    async def get_async(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Return the latest entry of a task without blocking the event loop."""
+        return await asyncio.wrap_future(self._run(self._get, task_id))
+
+    def unfinished(self) -> List[Dict[str, Any]]:
+        """Claim and return unfinished tasks whose owning process has exited."""
+        return self._run(self._claim_unfinished).result()
+
+    async def unfinished_async(self) -> List[Dict[str, Any]]:
+        """Claim and return unfinished tasks of exited processes without blocking the event loop."""
+        return await asyncio.wrap_future(self._run(self._claim_unfinished))
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Return the most recently updated entries of all processes, newest first."""
+        return self._run(self._recent, limit).result()
+
+    async def recent_async(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Return the most recently updated entries without blocking the event loop."""
+        return await asyncio.wrap_future(self._run(self._recent, limit))
+
+    def reserve_slot(self, limit: int) -> Optional[str]:
+        """Take one of ``limit`` slots shared by every process, if one is free.
+
+        Unfinished tasks hold a slot, and so do submits in flight of any
+        process, until their task is recorded here.
+
+        Returns:
+            The id of the slot, None if all are taken
+        """
+        return self._run(self._reserve_slot, limit).result()
+
+    async def reserve_slot_async(self, limit: int) -> Optional[str]:
+        """Take a shared slot like reserve_slot, without blocking the event loop."""
+        return await asyncio.wrap_future(self._run(self._reserve_slot, limit))
+
+    def bind_slot(self, slot_id: str, task_id: str) -> None:
+        """Hand a slot over to the task submitted with it; its task row holds it from then on."""
+        self._run(self._execute_slots, "UPDATE slots SET task_id = ? WHERE slot_id = ?", (task_id, slot_id))
+
+    def release_slot(self, slot_id: str) -> None:
+        """Free a slot whose submit created no task."""
+        self._run(self._execute_slots, "DELETE FROM slots WHERE slot_id = ?", (slot_id,))
+
+    def record_submitted(
+            self,
+            task_id: str,
+            endpoint: str,
+            payload_hash: str,
+            model: Optional[str] = None,
+            resolution: Optional[str] = None,
+            key_id: Optional[str] = None,
+            callback_nonce: Optional[str] = None,
+    ) -> None:
+        """Record a newly submitted task, owned by this process."""
+        now = time.time()
+        self._run(self._write, {
+            "task_id": task_id,
+            "endpoint": endpoint,
+            "payload_hash": payload_hash,
+            "model": model,
+            "resolution": resolution,
+            "key_id": key_id,
+            "callback_nonce": callback_nonce,
+            "state": SUBMITTED,
+            "created_at": now,
+            "updated_at": now,
+        })
+
+    def record(self, task_id: str, status_response: Optional[Dict[str, Any]], exception: Optional[Exception]) -> None:
+        """Tracker listener: record the final state of a task."""
+        self._run(self._record, task_id, status_response, exception)
+
+    def compact(self) -> None:
+        """Delete finished tasks older than the retention period."""
+        self._run(self._compact)
+
+    def flush(self) -> None:
+        """Wait until every queued write is done."""
+        self._run(lambda: None).result()
+
+    def _run(self, function: Callable, *args: Any) -> Future:
+        return self._executor.submit(function, *args)
+
+    def _open(self, path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+            # WAL lets readers in other workers proceed while one worker writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                "task_id TEXT PRIMARY KEY, entry TEXT, state TEXT, owner TEXT, updated_at REAL)"
+            )
+            # slots of the submission scheduler taken by submits that have no task row yet
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS slots (slot_id TEXT PRIMARY KEY, task_id TEXT, owner TEXT)"
+            )
+            conn.commit()
+            self._conn = conn
+        except sqlite3.Error as e:
+            logger.warning(f"Task store disabled, cannot open {path}: {str(e)}")
+            self.path = None
+
+    def _get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT entry FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _claim_unfinished(self) -> List[Dict[str, Any]]:
+        if not self.enabled:
+            return []
+        claimed = []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task_id, entry, owner FROM tasks WHERE state NOT IN (?, ?, ?)", _FINAL_STATES
+            ).fetchall()
+            for task_id, entry, owner in rows:
+                if owner_alive(owner):
+                    continue
+                # only one process wins the claim of an orphaned task
+                cursor = self._conn.execute(
+                    "UPDATE tasks SET owner = ? WHERE task_id = ? AND owner IS ?", (instance_id(), task_id, owner)
+                )
+                if cursor.rowcount:
+                    claimed.append(json.loads(entry))
+            self._conn.commit()
+        return claimed
+
+    def _recent(self, limit: int) -> List[Dict[str, Any]]:
+        if not self.enabled:
+            return []
+        with self._lock:
+            rows = self._conn.execute("SELECT entry FROM tasks ORDER BY updated_at DESC LIMIT ?", (limit,)).fetchall()
+        return [json.loads(entry) for entry, in rows]
+
+    def _reserve_slot(self, limit: int) -> Optional[str]:
+        if not self.enabled:
+            return str(uuid.uuid4())
+        with self._lock:
+            try:
+                # the write lock makes counting and taking one step across processes
+                self._conn.execute("BEGIN IMMEDIATE")
+                owners = self._conn.execute("SELECT DISTINCT owner FROM slots").fetchall()
+                for owner, in owners:
+                    if not owner_alive(owner):
+                        self._conn.execute("DELETE FROM slots WHERE owner IS ?", (owner,))
+                self._conn.execute("DELETE FROM slots WHERE task_id IN (SELECT task_id FROM tasks)")
+                used = self._conn.execute(
+                    "SELECT (SELECT COUNT(*) FROM tasks WHERE state NOT IN (?, ?, ?)) + (SELECT COUNT(*) FROM slots)",
+                    _FINAL_STATES,
+                ).fetchone()[0]
+                if used >= limit:
+                    self._conn.commit()
+                    return None
+                slot_id = str(uuid.uuid4())
+                self._conn.execute(
+                    "INSERT INTO slots (slot_id, task_id, owner) VALUES (?, NULL, ?)", (slot_id, instance_id())
+                )
+                self._conn.commit()
+                return slot_id
+            except sqlite3.Error as e:
+                self._conn.rollback()
+                logger.error(f"Cannot reserve a submission slot in the task store: {str(e)}")
+                # an unusable store must not stop submits
+                return str(uuid.uuid4())
+
+    def _execute_slots(self, statement: str, parameters: tuple) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            try:
+                self._conn.execute(statement, parameters)
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Cannot update the submission slots in the task store: {str(e)}")
+
+    def _record(self, task_id: str, status_response: Optional[Dict[str, Any]], exception: Optional[Exception]) -> None:
+        entry = self._get(task_id)
+        # a final state never changes, another worker may have recorded it from a callback
+        if entry is None or entry["state"] in TERMINAL_STATES:
+            return
+
+        entry["updated_at"] = time.time()
+        if exception is not None:
+            entry.update(state=ERROR, error=str(exception))
+        else:
+            entry["state"] = status_response.get("state")
+            if entry["state"] == "success":
+                entry["video_url"] = (status_response.get("creations") or [{}])[0].get("url")
+            elif entry["state"] == "failed":
+                entry["err_code"] = status_response.get("err_code")
+        self._write(entry)
+
+    def _compact(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "DELETE FROM tasks WHERE state IN (?, ?, ?) AND updated_at < ?",
+                    (*_FINAL_STATES, time.time() - self.retention),
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Cannot compact the task store: {str(e)}")
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO tasks (task_id, entry, state, owner, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (entry["task_id"], json.dumps(entry, ensure_ascii=False), entry["state"], instance_id(),
+                     entry["updated_at"]),
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Cannot write task {entry['task_id']} to the task store: {str(e)}")
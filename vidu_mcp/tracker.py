@@ -0,0 +1,393 @@
+"""Shared background poller for in-flight Vidu tasks."""
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from vidu_mcp import metrics
+from vidu_mcp.breaker import is_outage
+from vidu_mcp.const import DEFAULT_TYPICAL_DURATION, MODEL_TYPICAL_DURATIONS, TERMINAL_STATES
+from vidu_mcp.exceptions import ViduAuthError, ViduCircuitOpenError, ViduRateLimitError, ViduRequestError
+
+logger = logging.getLogger("vidu-mcp")
+
+
+@dataclass
+class TrackedTask:
+    """Polling state of a single task."""
+    task_id: str
+    model: Optional[str]
+    future: asyncio.Future
+    resolution: Optional[str] = None
+    key_id: Optional[str] = None
+    callback: bool = False
+    submitted_at: float = field(default_factory=time.monotonic)
+    next_poll_at: float = 0.0
+    # for callback tasks checked in the shared store, when the API is asked next
+    api_poll_at: float = 0.0
+    polls: int = 0
+    errors: int = 0
+    state: Optional[str] = None
+    watchers: List[asyncio.Queue] = field(default_factory=list)
+
+
+class TaskTracker:
+    """Owns every pending task_id and polls them all from one loop.
+
+    Each task is first checked shortly after submission to catch early
+    failures. After that the interval starts at a tenth of the model's
+    typical generation time and grows exponentially with jitter, so quick
+    videos are picked up fast while slow ones cost few requests. Waiters
+    share one future per task. Every poll runs on its own, so a slow status
+    request delays only its own task, and a task is never polled twice at
+    once.
+    Tasks whose completion is pushed by a callback are only polled at the
+    much longer fallback interval, in case the callback never arrives. With
+    several workers a callback may reach another worker, which writes it to
+    the shared store, so such tasks are looked up in the store in between.
+    """
+
+    def __init__(
+            self,
+            api_client,
+            min_interval: float = 2.0,
+            max_interval: float = 30.0,
+            backoff: float = 1.5,
+            jitter: float = 0.2,
+            max_concurrency: int = 20,
+            max_errors: int = 3,
+            max_age: float = 3600.0,
+            callback_interval: float = 120.0,
+            store=None,
+            store_interval: float = 2.0,
+    ):
+        """Initialize the tracker.
+
+        Args:
+            api_client: Client pool used for status requests
+            min_interval: Delay before the first status check, in seconds
+            max_interval: Upper bound for the polling interval, in seconds
+            backoff: Growth factor applied to the interval after each poll
+            jitter: Random spread applied to each interval, as a fraction
+            max_concurrency: Maximum status requests in flight at once
+            max_errors: Consecutive request errors before a task is failed, outages and rate limits do not count
+            max_age: Seconds after which a task is given up on
+            callback_interval: Polling interval of tasks that report completion by callback, in seconds
+            store: Task store shared with other workers, which record the callbacks they receive there
+            store_interval: Interval at which callback tasks are looked up in the store, in seconds
+        """
+        self.api_client = api_client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.max_concurrency = max_concurrency
+        self.max_errors = max_errors
+        self.max_age = max_age
+        self.callback_interval = callback_interval
+        self.store = store
+        self.store_interval = store_interval
+        self._tasks: Dict[str, TrackedTask] = {}
+        self._listeners: List[Callable] = []
+        self._update_listeners: List[Callable] = []
+        self._polling: Dict[str, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._runner: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of tasks still being polled."""
+        return len(self._tasks)
+
+    def add_listener(self, listener: Callable) -> None:
+        """Register a callback run when a task finishes.
+
+        The callback receives the task_id, the final status response (None on
+        error) and the exception (None on success).
+        """
+        self._listeners.append(listener)
+
+    def add_update_listener(self, listener: Callable) -> None:
+        """Register a callback run with every status a poll or callback returns.
+
+        The callback receives the task_id and the status response.
+        """
+        self._update_listeners.append(listener)
+
+    def track(
+            self,
+            task_id: str,
+            model: Optional[str] = None,
+            resolution: Optional[str] = None,
+            submitted_at: Optional[float] = None,
+            key_id: Optional[str] = None,
+            callback: bool = False,
+    ) -> asyncio.Future:
+        """Start polling a task, or return the future of an already tracked one.
+
+        Args:
+            task_id: The Vidu task id
+            model: Model name, used to tune the polling schedule
+            resolution: Requested resolution, used to label generation time metrics
+            submitted_at: time.monotonic() value of the submit, defaults to now
+            key_id: Pool key that submitted the task, status requests must use it
+            callback: Whether the API pushes the completion of the task to the callback receiver
+
+        Returns:
+            Future resolved with the final status response of the task
+        """
+        task = self._tasks.get(task_id)
+        if task is None:
+            loop = asyncio.get_running_loop()
+            task = TrackedTask(task_id=task_id, model=model, future=loop.create_future(),
+                               resolution=resolution, key_id=key_id, callback=callback)
+            if submitted_at is not None:
+                task.submitted_at = submitted_at
+            task.next_poll_at = time.monotonic() + (self.callback_interval if callback else self.min_interval)
+            if callback and self.store is not None:
+                task.api_poll_at = task.next_poll_at
+                task.next_poll_at = time.monotonic() + self.store_interval
+            self._tasks[task_id] = task
+            metrics.tasks_in_flight.inc()
+            self._ensure_runner()
+            self._wakeup.set()
+        return task.future
+
+    def resolve(self, task_id: str, status_response: Dict[str, Any]) -> bool:
+        """Apply a status pushed by a callback, as if a poll had returned it.
+
+        Returns:
+            Whether the task is tracked here
+        """
+        task = self._tasks.get(task_id)
+        if task is None:
+            return False
+        self._apply(task, status_response)
+        return True
+
+    async def wait(
+            self,
+            task_id: str,
+            model: Optional[str] = None,
+            timeout: Optional[float] = None,
+            on_update: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+            key_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Wait until a task reaches a terminal state.
+
+        Args:
+            task_id: The Vidu task id
+            model: Model name, used to tune the polling schedule
+            timeout: Maximum seconds to wait; the task keeps being polled afterwards
+            on_update: Coroutine called after every status check with the task_id,
+                       upstream state, elapsed seconds and number of polls
+            key_id: Pool key that submitted the task
+
+        Returns:
+            The final status response of the task
+
+        Raises:
+            ViduRequestError: If the task cannot be polled or the wait times out
+        """
+        future = self.track(task_id, model, key_id=key_id)
+        if on_update is None:
+            try:
+                # shield so a timed out waiter does not cancel the shared future
+                return await asyncio.wait_for(asyncio.shield(future), timeout)
+            except asyncio.TimeoutError:
+                raise ViduRequestError(f"Failed to get creation_url for task_id: {task_id}")
+
+        task = self._tasks.get(task_id)
+        updates: asyncio.Queue = asyncio.Queue()
+        if task is not None:
+            task.watchers.append(updates)
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        try:
+            while not future.done():
+                remaining = None if deadline is None else deadline - loop.time()
+                if remaining is not None and remaining <= 0:
+                    raise ViduRequestError(f"Failed to get creation_url for task_id: {task_id}")
+                getter = asyncio.ensure_future(updates.get())
+                await asyncio.wait({future, getter}, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    await self._notify(on_update, getter.result())
+                else:
+                    getter.cancel()
+            while not updates.empty():
+                await self._notify(on_update, updates.get_nowait())
+            return future.result()
+        finally:
+            if task is not None and updates in task.watchers:
+                task.watchers.remove(updates)
+
+    @staticmethod
+    async def _notify(on_update: Callable, update: Dict[str, Any]) -> None:
+        try:
+            await on_update(update)
+        except Exception as e:
+            # a waiter that cannot be notified still gets its result
+            logger.debug(f"Task update callback failed: {str(e)}")
+
+    def _ensure_runner(self) -> None:
+        if self._runner is None or self._runner.done():
+            self._wakeup = asyncio.Event()
+            if self._semaphore is None:
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._runner = asyncio.get_running_loop().create_task(self._run())
+
+    def _next_interval(self, task: TrackedTask) -> float:
+        if task.callback:
+            return self.callback_interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+        typical = MODEL_TYPICAL_DURATIONS.get(task.model, DEFAULT_TYPICAL_DURATION)
+        base = max(self.min_interval, typical / 10)
+        interval = min(self.max_interval, base * self.backoff ** max(task.polls - 1, 0))
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._tasks:
+            now = time.monotonic()
+            for task in self._tasks.values():
+                if task.next_poll_at <= now and task.task_id not in self._polling:
+                    self._polling[task.task_id] = loop.create_task(self._poll_task(task))
+
+            # tasks with a poll in flight are rescheduled when it returns, which wakes the loop
+            waiting = [task.next_poll_at for task in self._tasks.values() if task.task_id not in self._polling]
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), max(min(waiting) - now, 0) if waiting else None)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll_task(self, task: TrackedTask) -> None:
+        try:
+            await self._poll(task, self._semaphore)
+        except Exception as e:
+            logger.error(f"Status check crashed for task_id {task.task_id}: {str(e)}")
+            if self._tracked(task):
+                task.next_poll_at = time.monotonic() + self._next_interval(task)
+        finally:
+            if self._polling.get(task.task_id) is asyncio.current_task():
+                del self._polling[task.task_id]
+            self._wakeup.set()
+
+    async def _poll(self, task: TrackedTask, semaphore: asyncio.Semaphore) -> None:
+        if not task.callback or self.store is None:
+            await self._poll_api(task, semaphore)
+            return
+        if await self._check_store(task):
+            return
+        await self._poll_api(task, semaphore)
+        if self._tracked(task):
+            # the API keeps its own schedule, the store is checked in between
+            task.api_poll_at = task.next_poll_at
+            task.next_poll_at = min(task.api_poll_at, time.monotonic() + self.store_interval)
+
+    async def _poll_api(self, task: TrackedTask, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            try:
+                status_response = await self.api_client.get(f"/ent/v2/tasks/{task.task_id}/creations", key_id=task.key_id)
+            except ViduAuthError as e:
+                if self._tracked(task):
+                    self._finish(task, exception=e)
+                return
+            except ViduCircuitOpenError as e:
+                # the API is down, not the task: check again once the breaker probes
+                if self._tracked(task):
+                    task.next_poll_at = time.monotonic() + max(e.retry_after or 0.0, self._next_interval(task))
+                return
+            except ViduRequestError as e:
+                if not self._tracked(task):
+                    return
+                if isinstance(e, ViduRateLimitError) or is_outage(e):
+                    # the task was paid for and keeps running upstream, only errors about the request count
+                    logger.warning(f"Status check failed for task_id {task.task_id}, retrying: {str(e)}")
+                    task.next_poll_at = time.monotonic() + self._next_interval(task)
+                    return
+                task.errors += 1
+                logger.warning(f"Status check failed for task_id {task.task_id}: {str(e)}")
+                if task.errors >= self.max_errors:
+                    self._finish(task, exception=e)
+                    return
+                task.next_poll_at = time.monotonic() + self._next_interval(task)
+                return
+
+        if not self._tracked(task):
+            return
+        task.polls += 1
+        task.errors = 0
+        if self._apply(task, status_response):
+            return
+        if time.monotonic() - task.submitted_at > self.max_age:
+            self._finish(task, exception=ViduRequestError(f"Gave up polling task_id: {task.task_id}"))
+        else:
+            task.next_poll_at = time.monotonic() + self._next_interval(task)
+
+    async def _check_store(self, task: TrackedTask) -> bool:
+        # whether the task finished or is not due at the API yet
+        entry = await self.store.get_async(task.task_id)
+        if not self._tracked(task):
+            return True
+        if entry and entry["state"] in TERMINAL_STATES:
+            # another worker received the callback
+            self._apply(task, {"state": entry["state"], "err_code": entry.get("err_code"),
+                               "creations": [{"url": entry.get("video_url")}]})
+            return True
+        now = time.monotonic()
+        if now < task.api_poll_at:
+            task.next_poll_at = min(now + self.store_interval, task.api_poll_at)
+            return True
+        return False
+
+    def _tracked(self, task: TrackedTask) -> bool:
+        # False once a callback finished the task while its status request was in flight
+        return self._tasks.get(task.task_id) is task
+
+    def _apply(self, task: TrackedTask, status_response: Dict[str, Any]) -> bool:
+        # notify the watchers of a status and finish the task once it is final
+        task.state = status_response.get("state")
+        update = {
+            "task_id": task.task_id,
+            "state": task.state,
+            "elapsed": time.monotonic() - task.submitted_at,
+            "polls": task.polls,
+        }
+        for watcher in task.watchers:
+            watcher.put_nowait(update)
+        for listener in self._update_listeners:
+            try:
+                listener(task.task_id, status_response)
+            except Exception as e:
+                logger.error(f"Task update listener failed for task_id {task.task_id}: {str(e)}")
+        if task.state in TERMINAL_STATES:
+            self._finish(task, result=status_response)
+            return True
+        return False
+
+    def _finish(
+            self,
+            task: TrackedTask,
+            result: Optional[Dict[str, Any]] = None,
+            exception: Optional[Exception] = None,
+    ) -> None:
+        if self._tasks.pop(task.task_id, None) is not None:
+            metrics.tasks_in_flight.dec()
+            state = "error" if exception is not None else result.get("state")
+            metrics.observe_task(task.model, task.resolution, state, time.monotonic() - task.submitted_at)
+        for listener in self._listeners:
+            try:
+                listener(task.task_id, result, exception)
+            except Exception as e:
+                logger.error(f"Task listener failed for task_id {task.task_id}: {str(e)}")
+        if task.future.done():
+            return
+        if exception is not None:
+            task.future.set_exception(exception)
+            # mark retrieved so unawaited failures are not reported as never retrieved
+            task.future.exception()
+        else:
+            task.future.set_result(result)
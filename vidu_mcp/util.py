@@ -1,30 +1,310 @@
 import os
+import asyncio
 import base64
-from vidu_mcp.exceptions import ViduRequestError
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
+from vidu_mcp import metrics
+from vidu_mcp.body import FileImage
+from vidu_mcp.const import ENV_VIDU_DOWNLOAD_DIR, ENV_VIDU_IMAGE_DIR, ENV_VIDU_SERVE_TRANSPORT
+from vidu_mcp.exceptions import ViduRequestError, ViduValidationError
+from vidu_mcp.image import ImagePreprocessor
+
+
+class ImageCache:
+    """LRU cache of data-URLs for local image files.
+
+    Entries are keyed by absolute path, size and mtime, so an edited file is
+    re-encoded on its next use. With ``hash_content`` enabled, entries are
+    keyed by the SHA-256 of the file instead, and copies of the same image
+    under different paths share one entry. Images are passed through the
+    preprocessor before encoding, and its settings are part of the key.
+    Images streamed while the request is uploaded are not encoded ahead of
+    time; for those the cache keeps the inspected FileImage, with its digest
+    once computed, under the same path, size and mtime key.
+    """
+
+    def __init__(
+            self,
+            max_bytes: int = 256 * 1024 * 1024,
+            hash_content: bool = False,
+            preprocessor: Optional[ImagePreprocessor] = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_bytes: Total size budget of cached data-URLs, 0 disables caching
+            hash_content: Key entries by file content instead of file identity
+            preprocessor: Resizes and re-encodes images before they are cached
+        """
+        self.max_bytes = max_bytes
+        self.hash_content = hash_content
+        self.preprocessor = preprocessor or ImagePreprocessor()
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._digests: OrderedDict = OrderedDict()
+        self._files: OrderedDict = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get_or_load(self, path: str, resolution: Optional[str] = None) -> str:
+        """Return the data-URL of a local image, encoding it on a cache miss.
+
+        Args:
+            path: Path of an existing local image file
+            resolution: Output resolution the image is prepared for
+
+        Returns:
+            The image as a base64 data-URL
+        """
+        stat = os.stat(path)
+        variant = self.preprocessor.variant(resolution)
+        file_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns, variant)
+
+        with self._lock:
+            key = self._digests.get(file_key, file_key) if self.hash_content else file_key
+            data_url = self._entries.get(key)
+            if data_url is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                metrics.image_cache_lookups.inc(outcome="hit")
+                return data_url
+
+        with open(path, "rb") as f:
+            image_data = f.read()
+
+        if self.hash_content:
+            key = ("sha256", hashlib.sha256(image_data).hexdigest(), variant)
+            with self._lock:
+                self._remember_digest(file_key, key)
+                data_url = self._entries.get(key)
+                if data_url is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    metrics.image_cache_lookups.inc(outcome="hit")
+                    return data_url
+
+        image_data, mime = self.preprocessor.process(image_data, resolution)
+        data_url = f"data:{mime};base64,{base64.b64encode(image_data).decode('utf-8')}"
+        with self._lock:
+            self.misses += 1
+            self._store(key, data_url)
+        metrics.image_cache_lookups.inc(outcome="miss")
+
+        return data_url
+
+    def get_file(self, path: str) -> FileImage:
+        """Return a local image to stream, inspecting the file on a cache miss.
+
+        Args:
+            path: Path of an existing local image file
+
+        Returns:
+            The image as a FileImage, shared by every request for the same file version
+        """
+        stat = os.stat(path)
+        file_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            file_image = self._files.get(file_key)
+            if file_image is not None:
+                self._files.move_to_end(file_key)
+                self.hits += 1
+        if file_image is not None:
+            metrics.image_cache_lookups.inc(outcome="hit")
+            return file_image
+
+        file_image = FileImage(path)
+        with self._lock:
+            self.misses += 1
+            if self.max_bytes > 0:
+                self._files[(file_image.path, file_image.size, file_image.mtime_ns)] = file_image
+                while len(self._files) > 4096:
+                    self._files.popitem(last=False)
+        metrics.image_cache_lookups.inc(outcome="miss")
+
+        return file_image
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current usage."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "files": len(self._files),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+            self._digests.clear()
+            self._files.clear()
+            self._size = 0
+        metrics.image_cache_bytes.set(0)
+
+    def _remember_digest(self, file_key: tuple, key: tuple) -> None:
+        self._digests[file_key] = key
+        self._digests.move_to_end(file_key)
+        while len(self._digests) > 4096:
+            self._digests.popitem(last=False)
+
+    def _store(self, key: tuple, data_url: str) -> None:
+        size = len(data_url)
+        if size > self.max_bytes or key in self._entries:
+            return
+        self._entries[key] = data_url
+        self._size += size
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+        metrics.image_cache_bytes.set(self._size)
+
+
+image_cache = ImageCache()
+
+# bounded pool shared by every multi-image tool call
+image_workers = 8
+_image_executor = None
+_image_executor_lock = threading.Lock()
+
+
+def _get_image_executor() -> ThreadPoolExecutor:
+    global _image_executor
+    with _image_executor_lock:
+        if _image_executor is None:
+            _image_executor = ThreadPoolExecutor(max_workers=image_workers, thread_name_prefix="vidu-image")
+        return _image_executor
+
+
+def _raise_image_errors(images: list[str], results: list) -> list[str]:
+    errors = [
+        f"image {index + 1} ({str(image)[:80]}): {str(result)}"
+        for index, (image, result) in enumerate(zip(images, results))
+        if isinstance(result, Exception)
+    ]
+    if errors:
+        raise ViduRequestError("Failed to prepare images: " + "; ".join(errors))
+
+    return results
+
+
+def serving_http() -> bool:
+    """Whether this process is a worker of ``vidu-mcp serve``, where tool arguments come from remote clients."""
+    return os.getenv(ENV_VIDU_SERVE_TRANSPORT) is not None
+
+
+def confine_path(path: str, root: str) -> str:
+    """Resolve a path given by a client inside a configured root directory.
+
+    Args:
+        path: Absolute path, or path relative to the root
+        root: Directory the path must stay in
+
+    Returns:
+        The resolved absolute path
+
+    Raises:
+        ViduValidationError: If the path leaves the root, also through symlinks
+    """
+    root = os.path.realpath(os.path.expanduser(root))
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise ViduValidationError(f"path is outside the allowed directory: {path}")
+    return resolved
+
+
+def resolve_download_dir(download_dir: str = "") -> Optional[str]:
+    """Return the directory to download a video to, None to not download it.
+
+    Under ``vidu-mcp serve`` a download_dir given by a client is confined to
+    VIDU_DOWNLOAD_DIR, and refused when it is not set.
+
+    Raises:
+        ViduValidationError: If download_dir is not allowed
+    """
+    root = os.getenv(ENV_VIDU_DOWNLOAD_DIR)
+    if not download_dir:
+        return root or None
+    if not serving_http():
+        return download_dir
+    if not root:
+        raise ViduValidationError(f"download_dir is disabled, set {ENV_VIDU_DOWNLOAD_DIR} to allow downloads below it")
+    return confine_path(download_dir, root)
+
+
+def resolve_local_image(image: str) -> str:
+    """Return the path of a local image file a client may read.
+
+    Under ``vidu-mcp serve`` local paths are confined to VIDU_IMAGE_DIR, and
+    refused when it is not set.
+
+    Raises:
+        ViduValidationError: If the path is not allowed
+    """
+    if not serving_http():
+        return image
+    root = os.getenv(ENV_VIDU_IMAGE_DIR)
+    if not root:
+        raise ViduValidationError(f"local image paths are disabled, set {ENV_VIDU_IMAGE_DIR} to allow images below it")
+    return confine_path(image, root)
 
 
 def del_input_images(
         images: list[str],
+        resolution: Optional[str] = None,
 ) -> list[str]:
-    input_images = []
-    for image in images:
-        image = del_input_image(image)
-        input_images.append(image)
+    if len(images) <= 1:
+        return [del_input_image(image, resolution) for image in images]
 
-    return input_images
+    # read and encode concurrently, keeping input order and every failure
+    futures = [_get_image_executor().submit(del_input_image, image, resolution) for image in images]
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            results.append(e)
+
+    return _raise_image_errors(images, results)
+
+
+async def del_input_images_async(
+        images: list[str],
+        resolution: Optional[str] = None,
+        stream: bool = False,
+) -> list[Union[str, FileImage]]:
+    loop = asyncio.get_running_loop()
+    executor = _get_image_executor()
+    results = await asyncio.gather(
+        *(loop.run_in_executor(executor, del_input_image, image, resolution, stream) for image in images),
+        return_exceptions=True,
+    )
+
+    return _raise_image_errors(images, list(results))
 
 
 def del_input_image(
-        image: str
-) -> str:
+        image: str,
+        resolution: Optional[str] = None,
+        stream: bool = False,
+) -> Union[str, FileImage]:
     if not isinstance(image, str):
         raise ViduRequestError(f"image must be a string, got {type(image)}")
     if not image.startswith(("http://", "https://", "data:")):
         # if local image, convert to dataurl
+        image = resolve_local_image(image)
         if not os.path.exists(image):
             raise ViduRequestError(f"image does not exist: {image}")
-        with open(image, "rb") as f:
-            image_data = f.read()
-            image = f"data:image/jpeg;base64,{base64.b64encode(image_data).decode('utf-8')}"
+        if stream and not image_cache.preprocessor.active:
+            # encoded while the request is sent, see vidu_mcp.body
+            return image_cache.get_file(image)
+        image = image_cache.get_or_load(image, resolution)
 
     return image
@@ -0,0 +1,201 @@
+"""Local validation of generation parameters.
+
+Every generation endpoint is described by a table of its models, and for
+each model the durations and, per duration, the resolutions it supports.
+The same table resolves model-specific defaults, rejects invalid
+combinations before a request is sent, and writes the matching parts of the
+tool descriptions.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from vidu_mcp.exceptions import ViduValidationError
+
+MAX_PROMPT_LENGTH = 1500
+MOVEMENT_AMPLITUDES = ("auto", "small", "medium", "large")
+BGM_DURATION = 4
+
+
+@dataclass(frozen=True)
+class DurationSpec:
+    """Resolutions available at one duration, the first one is the default."""
+    resolutions: Tuple[str, ...]
+
+    @property
+    def default_resolution(self) -> str:
+        return self.resolutions[0]
+
+
+@dataclass(frozen=True)
+class EndpointSpec:
+    """Parameters accepted by one generation endpoint."""
+    path: str
+    # model -> duration -> resolutions; the first model and duration are the defaults
+    models: Dict[str, Dict[int, DurationSpec]] = field(default_factory=dict)
+    min_images: int = 0
+    # None accepts any number of images
+    max_images: Optional[int] = 0
+    prompt_required: bool = False
+    aspect_ratios: Tuple[str, ...] = ()
+    styles: Tuple[str, ...] = ()
+    # options only some templates accept: name -> (template, accepted values)
+    template_options: Dict[str, Tuple[str, Tuple[str, ...]]] = field(default_factory=dict)
+
+    @property
+    def default_model(self) -> Optional[str]:
+        return next(iter(self.models), None)
+
+
+_Q1 = {5: DurationSpec(("1080p",))}
+_LEGACY = {4: DurationSpec(("360p", "720p", "1080p")), 8: DurationSpec(("720p",))}
+
+ENDPOINTS: Dict[str, EndpointSpec] = {
+    "text2video": EndpointSpec(
+        path="/ent/v2/text2video",
+        models={"viduq1": _Q1, "vidu1.5": _LEGACY},
+        prompt_required=True,
+        aspect_ratios=("16:9", "1:1", "9:16"),
+        styles=("general", "anime"),
+    ),
+    "img2video": EndpointSpec(
+        path="/ent/v2/img2video",
+        models={"viduq1": _Q1, "vidu2.0": _LEGACY, "vidu1.5": _LEGACY},
+        min_images=1,
+        max_images=1,
+    ),
+    "reference2video": EndpointSpec(
+        path="/ent/v2/reference2video",
+        models={"vidu2.0": {4: DurationSpec(("720p", "360p"))}, "vidu1.5": _LEGACY},
+        min_images=1,
+        max_images=3,
+        prompt_required=True,
+        aspect_ratios=("16:9", "9:16", "1:1"),
+    ),
+    "start-end2video": EndpointSpec(
+        path="/ent/v2/start-end2video",
+        models={"viduq1": _Q1, "viduq1-classic": _Q1, "vidu2.0": _LEGACY, "vidu1.5": _LEGACY},
+        min_images=2,
+        max_images=2,
+    ),
+    "template2video": EndpointSpec(
+        path="/ent/v2/template2video",
+        min_images=1,
+        max_images=None,
+        template_options={
+            "area": ("exotic_princess", (
+                "auto", "denmark", "uk", "africa", "china", "mexico", "switzerland",
+                "russia", "italy", "korea", "thailand", "india", "japan",
+            )),
+            "beast": ("beast_companion", ("auto", "bear", "tiger", "elk", "snake", "lion", "wolf")),
+        },
+    ),
+}
+
+
+def _choices(values) -> str:
+    return ", ".join(str(value) for value in values)
+
+
+def validate_request(name: str, **params: Any) -> Dict[str, Any]:
+    """Check generation parameters and fill in model-specific defaults.
+
+    Args:
+        name: Endpoint name, a key of ENDPOINTS
+        **params: Tool arguments; None for model, duration or resolution selects the default
+
+    Returns:
+        The parameters with model, duration and resolution resolved
+
+    Raises:
+        ViduValidationError: If a parameter or a combination is not supported
+    """
+    spec = ENDPOINTS[name]
+    resolved = dict(params)
+
+    prompt = params.get("prompt") or ""
+    if spec.prompt_required and not prompt:
+        raise ViduValidationError("prompt is required")
+    if len(prompt) > MAX_PROMPT_LENGTH:
+        raise ViduValidationError(f"prompt is {len(prompt)} characters long, the maximum is {MAX_PROMPT_LENGTH}")
+
+    if "images" in params:
+        count = len(params["images"] or [])
+        if count == 0:
+            raise ViduValidationError("images is required")
+        if count < spec.min_images or (spec.max_images is not None and count > spec.max_images):
+            expected = spec.min_images if spec.min_images == spec.max_images else f"{spec.min_images} to {spec.max_images}"
+            raise ViduValidationError(f"{name} accepts {expected} images, got {count}")
+
+    if spec.models:
+        model = params.get("model") or spec.default_model
+        durations = spec.models.get(model)
+        if durations is None:
+            raise ViduValidationError(f"model {model} is not supported by {name}, accepted: {_choices(spec.models)}")
+
+        duration = params.get("duration") or next(iter(durations))
+        duration_spec = durations.get(duration)
+        if duration_spec is None:
+            raise ViduValidationError(f"duration {duration}s is not supported by {model}, accepted: {_choices(durations)}")
+
+        resolution = params.get("resolution") or duration_spec.default_resolution
+        if resolution not in duration_spec.resolutions:
+            raise ViduValidationError(
+                f"resolution {resolution} is not supported by {model} at {duration}s, "
+                f"accepted: {_choices(duration_spec.resolutions)}"
+            )
+        resolved.update(model=model, duration=duration, resolution=resolution)
+
+        if params.get("bgm") and duration != BGM_DURATION:
+            raise ViduValidationError(f"bgm is only supported for {BGM_DURATION}s videos, got {duration}s")
+
+    if spec.aspect_ratios and params.get("aspect_ratio") and params["aspect_ratio"] not in spec.aspect_ratios:
+        raise ViduValidationError(f"aspect_ratio {params['aspect_ratio']} is not supported, accepted: {_choices(spec.aspect_ratios)}")
+    if spec.styles and params.get("style") and params["style"] not in spec.styles:
+        raise ViduValidationError(f"style {params['style']} is not supported, accepted: {_choices(spec.styles)}")
+    if params.get("movement_amplitude") and params["movement_amplitude"] not in MOVEMENT_AMPLITUDES:
+        raise ViduValidationError(
+            f"movement_amplitude {params['movement_amplitude']} is not supported, accepted: {_choices(MOVEMENT_AMPLITUDES)}"
+        )
+    for option, (template, values) in spec.template_options.items():
+        value = params.get(option)
+        if value and value != "auto" and params.get("template") != template:
+            raise ViduValidationError(f"{option} is only supported by template {template}")
+        if value and value not in values:
+            raise ViduValidationError(f"{option} {value} is not supported, accepted: {_choices(values)}")
+
+    return resolved
+
+
+def _group_models(spec: EndpointSpec):
+    # models with identical capabilities are described together, e.g. "vidu2.0 and vidu1.5"
+    groups: Dict[int, Tuple[list, Dict[int, DurationSpec]]] = {}
+    for model, durations in spec.models.items():
+        groups.setdefault(id(durations), ([], durations))[0].append(model)
+    return [(" and ".join(models), durations) for models, durations in groups.values()]
+
+
+def describe_model(name: str) -> str:
+    """Describe the model parameter of an endpoint."""
+    spec = ENDPOINTS[name]
+    models = ",".join(f'"{model}"' for model in spec.models)
+    return f'The model to use. Values range [{models}], with "{spec.default_model}" being the default.'
+
+
+def describe_duration(name: str, indent: str) -> str:
+    """Describe the duration parameter of an endpoint, one line per model group."""
+    lines = ["Video duration. Default values vary by model:"]
+    for models, durations in _group_models(ENDPOINTS[name]):
+        lines.append(f"- {models}: default {next(iter(durations))}s, available: {_choices(durations)}")
+    return f"\n{indent}".join(lines)
+
+
+def describe_resolution(name: str, indent: str) -> str:
+    """Describe the resolution parameter of an endpoint, one line per model group and duration."""
+    lines = ["Resolution. Default values vary by model & duration:"]
+    for models, durations in _group_models(ENDPOINTS[name]):
+        for duration, duration_spec in durations.items():
+            lines.append(
+                f"- {models} ({duration}s): default {duration_spec.default_resolution}, "
+                f"available: {_choices(duration_spec.resolutions)}"
+            )
+    return f"\n{indent}".join(lines)